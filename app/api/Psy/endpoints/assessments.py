@@ -1,11 +1,15 @@
 import json
 import os
 import io
+import time
 import requests
 from fastapi import APIRouter 
 from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.utils.http_constants import HTTP_STATUS, HTTP_CODE
 from app.utils.response_helper import make_response
+from app.utils import metrics
+from app.utils.timing import stage
 from app.Models.users import User
 from app.Models.pdfbody import PdfBody
 from dotenv import load_dotenv
@@ -15,17 +19,31 @@ router=APIRouter(prefix="/assessments")
 
 CLIENT_ID = os.getenv("PSY_ENDRO_CLIENT_ID")
 CLIENT_SECRET = os.getenv("PSY_ENDRO_CLIENT_SECRET_KEY")
+PSYPACK_BASE_URL = settings.PSYPACK_BASE_URL.rstrip("/")
+
+
+def _psypack(method, endpoint, url, **kwargs):
+    """One PsyPack call, timed as the "psypack" stage and in the PsyPack latency metric."""
+    started = time.perf_counter()
+    status = "error"
+    try:
+        with stage("psypack"):
+            response = requests.request(method, url, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        metrics.PSYPACK_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, status=status)
 
 #1. Get available assessments list
 @router.get("/list")
 def get_assessments():
     try:
-        psypack_url = "https://asia-south1-psypack-deploy.cloudfunctions.net/api/get-assessments"
+        psypack_url = f"{PSYPACK_BASE_URL}/get-assessments"
         headers = {
             "clientId": CLIENT_ID,
             "clientSecret": CLIENT_SECRET
         }
-        response = requests.get(psypack_url, headers=headers)
+        response = _psypack("GET", "get-assessments", psypack_url, headers=headers)
         data = response.json()
         assessments = data.get("assessments", [])
         return make_response(
@@ -46,7 +64,7 @@ def get_assessments():
 @router.post("/initiate")
 def initiate_assessment(assessment_id: str,user: User):
     try:
-        psypack_url = "https://asia-south1-psypack-deploy.cloudfunctions.net/api/initiate-assessment"
+        psypack_url = f"{PSYPACK_BASE_URL}/initiate-assessment"
         headers = {
             "clientId": CLIENT_ID,
             "clientSecret": CLIENT_SECRET,
@@ -64,7 +82,7 @@ def initiate_assessment(assessment_id: str,user: User):
             "redirectUrl": "psypack.com",
             "initiationType": 2
         }
-        response = requests.post(psypack_url, headers=headers, json=body)
+        response = _psypack("POST", "initiate-assessment", psypack_url, headers=headers, json=body)
         data = response.json()
         return make_response(
             HTTP_STATUS["OK"],
@@ -90,8 +108,8 @@ def get_assessment_status(user_assessment_id: str):
             "clientId": CLIENT_ID,
             "clientSecret": CLIENT_SECRET
         }
-        psypack_url = f"https://asia-south1-psypack-deploy.cloudfunctions.net/api/assessment-status/{user_assessment_id}"
-        response = requests.get(psypack_url, headers=headers)
+        psypack_url = f"{PSYPACK_BASE_URL}/assessment-status/{user_assessment_id}"
+        response = _psypack("GET", "assessment-status", psypack_url, headers=headers)
         data = response.json()
         return make_response(
             HTTP_STATUS["OK"],
@@ -116,7 +134,7 @@ def generate_report(report_id: str, body: PdfBody):
     """
 
     try:
-        url = f"https://asia-south1-psypack-deploy.cloudfunctions.net/api/report/{report_id}/pdf"
+        url = f"{PSYPACK_BASE_URL}/report/{report_id}/pdf"
 
         headers = {
             "clientid": CLIENT_ID,
@@ -131,7 +149,7 @@ def generate_report(report_id: str, body: PdfBody):
         }
 
         # Send request to PsyPack
-        response = requests.post(url, headers=headers, json=payload)
+        response = _psypack("POST", "report-pdf", url, headers=headers, json=payload)
 
         # If PsyPack returns an error
         if response.status_code != 200:
@@ -1,52 +1,62 @@
+import asyncio
 import json
-from fastapi import APIRouter
-from app.schemas.models import IntakeParameters, questions
-from app.services.ai_service import generate_report
-from app.services.pdf_service import generate_personality_pdf_safe
+import os
+import re
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from app.core.config import settings
+from app.schemas.models import CohortRequest, IntakeParameters, questions
+from app.services import benchmarks, bulk_reports, cohort_report, report_store, content_store, render_pool, score_archive
+from app.services.branding import TenantError, get_tenant, list_tenants
+from app.services.report_preview import preview_report, render_preview_html
+from app.services.report_templates import TemplateError, get_template, list_templates
+from app.services.idempotency import request_key, run_once
+from app.services.report_pipeline import is_complete, render_and_store, render_once, stored_report
 from app.utils.http_constants import HTTP_STATUS, HTTP_CODE
 from app.utils.response_helper import make_response
+from app.utils.file_response import conditional_file_response
 
 router = APIRouter()
 
+# "pdf" renders the PDF before answering; "html" / "json" answer with a preview
+# and leave the PDF to the background or the first download (PREVIEW_PDF)
+OUTPUT_FORMATS = ("pdf", "html", "json")
+
+_background = set()
+
+
 @router.post("/")
-def create_report(params: IntakeParameters, questionList: questions):
+async def create_report(
+    params: IntakeParameters,
+    questionList: questions,
+    output: str = "pdf",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     try:
-        report_data = generate_report(params, questionList).strip()
-        with open("new_response_data.json", "w") as f:
-            json.dump(report_data, f)
-        # If the model returned an error dict -> return error
-        if isinstance(report_data, dict) and "error" in report_data:
-            return make_response(
-                HTTP_STATUS["INTERNAL_SERVER_ERROR"],
-                HTTP_CODE["ERROR"],
-                report_data["error"]
-            )
+        get_template(questionList.template)
+        get_tenant(questionList.tenant)
+    except (TemplateError, TenantError) as e:
+        return make_response(HTTP_STATUS["BAD_REQUEST"], HTTP_CODE["VALIDATION"], str(e))
+    if output not in OUTPUT_FORMATS:
+        return make_response(
+            HTTP_STATUS["BAD_REQUEST"],
+            HTTP_CODE["VALIDATION"],
+            f"output must be one of {', '.join(OUTPUT_FORMATS)}"
+        )
+
+    try:
+        # Retries of the same request share one LLM call / render / upload
+        key = request_key(params, questionList, idempotency_key)
+        if output != "pdf":
+            record = await run_once(f"{key}:record", lambda: stored_report(params, questionList, key))
+            if not is_complete(record) and settings.PREVIEW_PDF == "async":
+                _render_in_background(record)
+            return _preview_response(record, output)
+
+        response_data = await run_once(key, lambda: _create_report(params, questionList, key))
 
-        # ✓ Normalize output from AI model
-        if isinstance(report_data, (dict, list)):
-            report_cleaned = report_data
-        else:
-            try:
-                report_cleaned = json.loads(report_data)
-            except Exception:
-                # If not valid JSON → fallback wrapper
-                report_cleaned = {"report": str(report_data)}
-
-        # ✓ Generate PDF File
-        outname = f"{params.Name.replace(' ', '_')}_Personality_Report.pdf"
-        reportFile = generate_personality_pdf_safe(
-            filename=outname,
-            data=report_cleaned,
-            person_name=params.Name,
-            generated_by="Endorphin AI"
-        )
-
-        # Safety log
-        print(f"[OK] Generated PDF → {reportFile}")
-        response_data = {
-            "report_path": reportFile,
-            "report_name": outname
-            }
         # ✓ Return the generated PDF
         return make_response(
             status_code=HTTP_STATUS["OK"],
@@ -61,3 +71,333 @@ def create_report(params: IntakeParameters, questionList: questions):
             HTTP_CODE["ERROR"],
             str(e)
         )
+
+
+async def _create_report(params: IntakeParameters, questionList: questions, key: str):
+    record = await run_once(f"{key}:record", lambda: stored_report(params, questionList, key))
+
+    # ✓ Completed duplicate -> answer from the store
+    if is_complete(record):
+        print(f"[OK] Idempotent replay → {_report_path(record)}")
+        return _response_data(record)
+
+    # ✓ Generate PDF File (a stored report whose upload failed skips straight to here)
+    record = await render_once(record)
+
+    # Safety log
+    print(f"[OK] Generated PDF → {_report_path(record)}")
+    return _response_data(record)
+
+
+def _render_in_background(record):
+    async def task():
+        try:
+            await render_once(record)
+        except Exception as e:
+            print(f"[PREVIEW ERROR] Background PDF render of {record['report_id']} failed: {e}")
+
+    pending = asyncio.get_running_loop().create_task(task())
+    _background.add(pending)
+    pending.add_done_callback(_background.discard)
+
+
+def _preview_response(record, output):
+    preview = preview_report(
+        record["report"],
+        record["person_name"],
+        record.get("generated_by"),
+        template_id=record.get("template"),
+        tenant_id=record.get("tenant"),
+    )
+    if output == "html":
+        return HTMLResponse(render_preview_html(preview, pdf_url=_response_data(record)["pdf_path"]))
+    return make_response(
+        status_code=HTTP_STATUS["OK"],
+        code=HTTP_CODE["OK"],
+        message="Report preview",
+        data=dict(_response_data(record), preview=preview)
+    )
+
+
+def _report_path(record):
+    # External URL once replicated, otherwise the local download route
+    if record.get("uploaded_url"):
+        return record["uploaded_url"]
+    if record.get("pdf_sha256"):
+        return f"/report/{record['pdf_sha256']}"
+    return None
+
+
+def _response_data(record):
+    return {
+        "report_path": _report_path(record),
+        "report_name": record["report_name"],
+        "report_id": record["report_id"],
+        "user_id": record["user_id"],
+        "template": record.get("template"),
+        "tenant": record.get("tenant"),
+        "download_path": f"/report/{record['pdf_sha256']}" if record.get("pdf_sha256") else None,
+        "preview_path": f"/report/{record['user_id']}/{record['report_id']}/preview",
+        "pdf_path": f"/report/{record['user_id']}/{record['report_id']}/pdf",
+    }
+
+
+@router.get("/templates")
+async def report_templates():
+    """Report templates that can be requested through the `template` field."""
+    return make_response(
+        status_code=HTTP_STATUS["OK"],
+        code=HTTP_CODE["OK"],
+        message="Report templates",
+        data=list_templates()
+    )
+
+
+@router.get("/tenants")
+async def report_tenants():
+    """Branding profiles that can be requested through the `tenant` field."""
+    return make_response(
+        status_code=HTTP_STATUS["OK"],
+        code=HTTP_CODE["OK"],
+        message="Report tenants",
+        data=list_tenants()
+    )
+
+
+@router.get("/benchmarks")
+async def report_benchmarks():
+    """Per-trait population statistics behind the comparison chart's benchmark."""
+    return make_response(
+        status_code=HTTP_STATUS["OK"],
+        code=HTTP_CODE["OK"],
+        message="Report benchmarks",
+        data=benchmarks.benchmark_stats()
+    )
+
+
+@router.get("/cohort")
+async def report_cohort(
+    tenant: Optional[str] = None,
+    template: Optional[str] = None,
+    user_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    traits: Optional[str] = None,
+    group_by: Optional[str] = None,
+):
+    """
+    Score statistics (count, mean, std, percentiles, histogram) over the
+    archived reports matching the filters; `traits` is a comma-separated list
+    of column names or substrings, `group_by` one of tenant / template / user / month.
+    """
+    try:
+        stats = await asyncio.to_thread(
+            score_archive.cohort_stats,
+            tenant=tenant,
+            template=template,
+            user=report_store.make_user_id(user_id) if user_id else None,
+            since=since,
+            until=until,
+            traits=[t.strip() for t in traits.split(",") if t.strip()] if traits else None,
+            group_by=group_by,
+        )
+    except ValueError as e:
+        return make_response(HTTP_STATUS["BAD_REQUEST"], HTTP_CODE["VALIDATION"], str(e))
+    return make_response(
+        status_code=HTTP_STATUS["OK"],
+        code=HTTP_CODE["OK"],
+        message="Report cohort",
+        data=stats
+    )
+
+
+@router.post("/cohort")
+async def create_cohort_report(cohort: CohortRequest):
+    """
+    Team report for many members (stored reports or score vectors): aggregate
+    statistics and cohort charts in one PDF, without any LLM call.
+    """
+    if len(cohort.members) > settings.COHORT_MAX_MEMBERS:
+        return make_response(
+            HTTP_STATUS["BAD_REQUEST"],
+            HTTP_CODE["VALIDATION"],
+            f"A cohort report takes at most {settings.COHORT_MAX_MEMBERS} members"
+        )
+    try:
+        template = get_template(cohort.template)
+        tenant = get_tenant(cohort.tenant)
+        members = await asyncio.to_thread(
+            cohort_report.resolve_members,
+            [member.model_dump() for member in cohort.members],
+            template.id,
+        )
+    except (TemplateError, TenantError, cohort_report.CohortError) as e:
+        return make_response(HTTP_STATUS["BAD_REQUEST"], HTTP_CODE["VALIDATION"], str(e))
+
+    try:
+        pdf_bytes = await render_pool.run(
+            cohort_report.generate_cohort_pdf,
+            members,
+            cohort.name,
+            cohort.generated_by or tenant.generated_by,
+            template.id,
+            tenant.id,
+        )
+        pdf_sha256 = await asyncio.to_thread(content_store.put_bytes, pdf_bytes)
+    except Exception as e:
+        print(f"[COHORT ERROR] {e}")
+        return make_response(
+            HTTP_STATUS["INTERNAL_SERVER_ERROR"],
+            HTTP_CODE["ERROR"],
+            "Cohort report generation failed",
+            data={"error": str(e)}
+        )
+    print(f"[COHORT] {cohort.name}: {len(members)} members, {len(pdf_bytes)} bytes")
+    return make_response(
+        status_code=HTTP_STATUS["OK"],
+        code=HTTP_CODE["OK"],
+        message="Cohort report generated successfully",
+        data={
+            "name": cohort.name,
+            "members": len(members),
+            "template": template.id,
+            "tenant": tenant.id,
+            "download_path": f"/report/{pdf_sha256}",
+        }
+    )
+
+
+@router.post("/bulk")
+async def create_bulk_reports(request: Request, batch_id: Optional[str] = None, render: bool = True):
+    """
+    Generate many reports from a JSONL body (one POST /report/ body per line,
+    plus an optional "id"). Streams one JSONL result per item as it finishes.
+    With `batch_id`, progress is checkpointed and resubmitting the same batch
+    after a failure skips the items already done.
+    """
+    try:
+        lines = (await request.body()).decode("utf-8").splitlines()
+    except UnicodeDecodeError:
+        return make_response(HTTP_STATUS["BAD_REQUEST"], HTTP_CODE["VALIDATION"], "The batch must be UTF-8 encoded JSONL")
+    count = sum(1 for line in lines if line.strip())
+    if count > settings.BULK_MAX_ITEMS:
+        return make_response(
+            HTTP_STATUS["BAD_REQUEST"],
+            HTTP_CODE["VALIDATION"],
+            f"A bulk request takes at most {settings.BULK_MAX_ITEMS} items (got {count})"
+        )
+    checkpoint = None
+    if batch_id:
+        if not re.fullmatch(r"[A-Za-z0-9._-]{1,100}", batch_id) or batch_id.startswith("."):
+            return make_response(HTTP_STATUS["BAD_REQUEST"], HTTP_CODE["VALIDATION"], "Invalid batch_id")
+        # "_" directories in the report store are indexes, never user ids
+        checkpoint_dir = os.path.join(settings.REPORT_STORE_DIR, "_bulk")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        checkpoint = os.path.join(checkpoint_dir, f"{batch_id}.jsonl")
+
+    async def results():
+        ok = failed = 0
+        async for result in bulk_reports.run_batch(lines, checkpoint=checkpoint, render=render):
+            if result["status"] == "ok":
+                ok += 1
+            else:
+                failed += 1
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        print(f"[BULK] Batch {batch_id or '-'}: {ok} ok, {failed} failed")
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.get("/{pdf_sha256}")
+def download_report(pdf_sha256: str, request: Request):
+    """Serve a rendered report from the local content store (ETag / If-None-Match / Range)."""
+    path = content_store.get_path(pdf_sha256)
+    if path is None:
+        return make_response(
+            HTTP_STATUS["NOT_FOUND"],
+            HTTP_CODE["DATA_NOT_FOUND"],
+            "Report not found"
+        )
+    return conditional_file_response(
+        request,
+        path,
+        etag=pdf_sha256,
+        media_type="application/pdf",
+        filename=f"{pdf_sha256[:12]}_Personality_Report.pdf",
+    )
+
+
+@router.get("/{user_id}/{report_id}/preview")
+async def report_preview(user_id: str, report_id: str, output: str = "html"):
+    """HTML (or JSON) preview of a stored report; no LLM call and no PDF render."""
+    if output not in ("html", "json"):
+        return make_response(
+            HTTP_STATUS["BAD_REQUEST"], HTTP_CODE["VALIDATION"], "output must be one of html, json"
+        )
+    record = await asyncio.to_thread(report_store.get_report, user_id, report_id)
+    if record is None:
+        return make_response(
+            HTTP_STATUS["NOT_FOUND"],
+            HTTP_CODE["DATA_NOT_FOUND"],
+            "Report not found"
+        )
+    return _preview_response(record, output)
+
+
+@router.get("/{user_id}/{report_id}/pdf")
+async def report_pdf(user_id: str, report_id: str, request: Request):
+    """Download a stored report's PDF, rendering it first if no rendered copy exists yet."""
+    try:
+        record = await asyncio.to_thread(report_store.get_report, user_id, report_id)
+        if record is None:
+            return make_response(
+                HTTP_STATUS["NOT_FOUND"],
+                HTTP_CODE["DATA_NOT_FOUND"],
+                "Report not found"
+            )
+        path = content_store.get_path(record.get("pdf_sha256"))
+        if path is None and record.get("uploaded_url"):
+            return RedirectResponse(record["uploaded_url"])
+        if path is None:
+            record.setdefault("report_name", f"{record['user_id']}_Personality_Report.pdf")
+            record.setdefault("generated_by", None)
+            record = await render_once(record)
+    except Exception as e:
+        return make_response(
+            HTTP_STATUS["INTERNAL_SERVER_ERROR"],
+            HTTP_CODE["ERROR"],
+            str(e)
+        )
+    return download_report(record["pdf_sha256"], request)
+
+
+@router.post("/{user_id}/{report_id}/re-render")
+async def rerender_report(user_id: str, report_id: str):
+    """Rebuild the PDF from stored report JSON (no LLM call) and re-upload it."""
+    try:
+        record = await asyncio.to_thread(report_store.get_report, user_id, report_id)
+        if record is None:
+            return make_response(
+                HTTP_STATUS["NOT_FOUND"],
+                HTTP_CODE["DATA_NOT_FOUND"],
+                "Report not found"
+            )
+
+        record.setdefault("report_name", f"{record['user_id']}_Personality_Report.pdf")
+        record.setdefault("generated_by", None)
+        record = await render_and_store(record)
+
+        print(f"[OK] Re-rendered PDF → {_report_path(record)}")
+        return make_response(
+            status_code=HTTP_STATUS["OK"],
+            code=HTTP_CODE["OK"],
+            message="Report re-rendered successfully",
+            data=_response_data(record)
+        )
+
+    except Exception as e:
+        return make_response(
+            HTTP_STATUS["INTERNAL_SERVER_ERROR"],
+            HTTP_CODE["ERROR"],
+            str(e)
+        )
@@ -0,0 +1,113 @@
+"""
+Offline bulk report generation.
+
+    python -m app.cli.bulk batch.jsonl -o results.jsonl
+
+Reads one POST /report/ body per line (see app/services/bulk_reports.py),
+generates and renders every report with the same pipeline as the API, and
+writes one JSONL result per item. Progress is checkpointed next to the input
+(<input>.checkpoint.jsonl): after a crash, run the same command again and
+finished items are skipped. --base-url points the LLM calls at any
+OpenAI-compatible server, e.g. app.cli.standin (OPEN_AI_API must still be
+set; use any value the stand-in accepts). PDFs are rendered in a pool of
+--render-workers processes, one per CPU by default.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli.bulk", description="Generate reports from a JSONL batch.")
+    parser.add_argument("input", help="JSONL file, one report request per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="JSONL results file (default: stdout)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <input>.checkpoint.jsonl)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="do not record or resume progress")
+    parser.add_argument("--concurrency", type=int, help="items in flight (default: BULK_CONCURRENCY)")
+    parser.add_argument("--no-render", action="store_true", help="only generate and store the reports, no PDFs")
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="render processes, 0 renders in threads (default: the CPU count; overrides RENDER_POOL_SIZE)",
+    )
+    parser.add_argument("--base-url", help="OpenAI-compatible API base URL (OPENAI_BASE_URL)")
+    parser.add_argument("--model", help="model name (OPENAI_MODEL)")
+    parser.add_argument("--rpm", type=float, help="LLM requests per minute (LLM_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--llm-concurrency", type=int, help="LLM calls in flight (LLM_MAX_CONCURRENCY)")
+    return parser.parse_args(argv)
+
+
+def _apply_overrides(args):
+    # Settings are read when app modules are first imported, so set them first
+    overrides = {
+        "OPENAI_BASE_URL": args.base_url,
+        "OPENAI_MODEL": args.model,
+        "LLM_REQUESTS_PER_MINUTE": args.rpm,
+        "LLM_MAX_CONCURRENCY": args.llm_concurrency,
+        "RENDER_POOL_SIZE": 0 if args.no_render else args.render_workers,
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+
+async def run(args, out):
+    from app.core.config import settings
+    from app.services import benchmarks, bulk_reports, render_pool
+    from app.services.storage_service import close_client
+
+    if settings.REPORT_REPLICATION == "async":
+        # Background uploads would be cut off when the command exits
+        settings.REPORT_REPLICATION = "sync"
+
+    checkpoint = None
+    if not args.no_checkpoint:
+        checkpoint = args.checkpoint or (None if args.input == "-" else f"{args.input}.checkpoint.jsonl")
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    counts = {"ok": 0, "error": 0, "resumed": 0}
+    started = time.perf_counter()
+    render_pool.start()
+    try:
+        async for result in bulk_reports.run_batch(
+            source, checkpoint=checkpoint, concurrency=args.concurrency, render=not args.no_render
+        ):
+            counts[result["status"]] += 1
+            counts["resumed"] += bool(result.get("resumed"))
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            print(f"[BULK] {result['id']}: {result['status']} {result.get('error', '')}".rstrip())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        await asyncio.to_thread(render_pool.shutdown)
+        await asyncio.to_thread(benchmarks.shutdown)
+        await close_client()
+    print(
+        f"[BULK] Done in {time.perf_counter() - started:.1f}s: {counts['ok']} ok "
+        f"({counts['resumed']} resumed), {counts['error']} failed"
+    )
+    return counts
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    _apply_overrides(args)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        # The services log to stdout; keep it free for the results
+        with contextlib.redirect_stdout(sys.stderr):
+            counts = asyncio.run(run(args, out))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Re-render stored report JSON into PDFs on a process pool.
+
+    python -m app.cli.rerender report_store --workers 4 --out rendered/
+    python -m app.cli.rerender manifest.txt --content-addressed pdfs/
+    python -m app.cli.rerender report_store --update-records
+
+Inputs are directories (searched recursively for *.json; "_" index
+directories are skipped), single .json files, or manifests listing one
+path per line (relative to the manifest). A file may be a report_store
+record (its template, tenant, name and "generated by" are kept) or raw model
+output such as new_response_data.json.
+
+Every file is rendered with generate_personality_pdf in a worker process.
+The summary gives throughput, per-stage timings (load, brand, charts, story,
+build, write and one chart_<kind> per chart type; see app/utils/timing.py)
+and every failure. Outputs go to
+--out (<user_id>/<report_id>.pdf, or <file name>.pdf) and/or a
+content-addressed directory (<sha[:2]>/<sha>.pdf, the content store layout).
+--update-records stores the PDFs through the content store and points each
+record at its new PDF and size (dropping its now stale upload URL), so a
+template change reaches the whole archive; the PDF a record pointed at before
+is removed. A server that is already running counts the new files against
+CONTENT_STORE_MAX_BYTES, but only starts expiring them after its next
+restart (the startup sweep).
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+STAGES = ("load", "brand", "charts", "story", "build", "write")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli.rerender", description="Re-render stored report JSON into PDFs.")
+    parser.add_argument("inputs", nargs="+", help="directories, .json files or manifests (one path per line)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (0 = render in this process)")
+    parser.add_argument("--out", help="write <user_id>/<report_id>.pdf (or <file name>.pdf) here")
+    parser.add_argument("--content-addressed", help="write <sha[:2]>/<sha>.pdf here")
+    parser.add_argument("--update-records", action="store_true", help="store PDFs in CONTENT_STORE_DIR and update report_store records")
+    parser.add_argument("--results", help="write one JSONL result per file here")
+    return parser.parse_args(argv)
+
+
+# ---------------------------
+# Inputs
+# ---------------------------
+def _walk(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(("_", ".")))
+        for name in sorted(files):
+            if name.endswith(".json"):
+                yield os.path.join(root, name)
+
+
+def collect_paths(inputs):
+    """Report JSON paths named by the inputs, in order, without duplicates."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(_walk(item))
+        elif item.endswith(".json"):
+            paths.append(item)
+        else:
+            base = os.path.dirname(item)
+            with open(item, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        paths.append(os.path.join(base, line))
+    return list(dict.fromkeys(paths))
+
+
+def load_report(path):
+    """(record or None, model output) for a stored JSON file; (None, None) if it is not a report."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, str):
+        # Model output saved as a JSON string
+        data = json.loads(data)
+    if isinstance(data, dict) and "report_id" in data and isinstance(data.get("report"), dict):
+        return data, data["report"]
+    if isinstance(data, dict) and "sections" in data:
+        return None, data
+    return None, None
+
+
+# ---------------------------
+# Worker
+# ---------------------------
+def _write(path, data):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def render_file(path, out_dir=None, cas_dir=None, store=False):
+    """
+    Render one file; returns its result dict (status "ok", "skipped" or
+    "error"). With `store`, the PDF goes into the content store and the
+    result has its pdf_size breakdown.
+    """
+    from app.services import content_store
+    from app.services.pdf_service import generate_personality_pdf
+    from app.utils.pdf_size import pdf_size_breakdown
+    from app.utils.timing import collect, stage
+
+    result = {"path": path}
+    started = time.perf_counter()
+    with collect() as timings:
+        try:
+            with stage("load"):
+                record, data = load_report(path)
+            if data is None:
+                result.update(status="skipped", error="not a report")
+                return result
+            record = record or {}
+            buffer = io.BytesIO()
+            generate_personality_pdf(
+                buffer,
+                data,
+                person_name=record.get("person_name") or "",
+                generated_by=record.get("generated_by"),
+                template_id=record.get("template"),
+                tenant_id=record.get("tenant"),
+            )
+            pdf = buffer.getvalue()
+            with stage("write"):
+                digest = hashlib.sha256(pdf).hexdigest()
+                if out_dir:
+                    if record:
+                        name = os.path.join(record["user_id"], f"{record['report_id']}.pdf")
+                    else:
+                        name = os.path.splitext(os.path.basename(path))[0] + ".pdf"
+                    _write(os.path.join(out_dir, name), pdf)
+                if cas_dir:
+                    cas_path = os.path.join(cas_dir, digest[:2], f"{digest}.pdf")
+                    if not os.path.exists(cas_path):
+                        _write(cas_path, pdf)
+                if store:
+                    content_store.put_bytes(pdf)
+                    result["pdf_size"] = pdf_size_breakdown(pdf) or {"total": len(pdf)}
+            result.update(status="ok", bytes=len(pdf), sha256=digest)
+            if record:
+                result.update(
+                    user_id=record["user_id"],
+                    report_id=record["report_id"],
+                    previous_sha256=record.get("pdf_sha256"),
+                )
+        except Exception as e:
+            result.update(status="error", error=f"{type(e).__name__}: {e}")
+        finally:
+            result["timings"] = {name: round(seconds, 4) for name, seconds in timings.items()}
+            result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+def _results(paths, args, cas_dir):
+    store = args.update_records
+    if args.workers <= 0:
+        for path in paths:
+            yield render_file(path, args.out, cas_dir, store)
+        return
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload(["app.services.pdf_service"])
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as executor:
+        futures = [executor.submit(render_file, path, args.out, cas_dir, store) for path in paths]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def summarize(results, wall_seconds):
+    ok = [r for r in results if r["status"] == "ok"]
+    summary = {
+        "files": len(results),
+        "ok": len(ok),
+        "skipped": sum(r["status"] == "skipped" for r in results),
+        "failed": sum(r["status"] == "error" for r in results),
+        "wall_seconds": round(wall_seconds, 2),
+        "reports_per_second": round(len(ok) / wall_seconds, 2) if wall_seconds else 0.0,
+        "stages": {},
+    }
+    # The fixed stages first, then the finer ones (chart_<kind>, ...) in name order
+    extra = sorted({name for r in ok for name in r["timings"]} - set(STAGES))
+    for name in (*STAGES, *extra):
+        values = np.array([r["timings"].get(name, 0.0) for r in ok])
+        if len(values) and values.any():
+            summary["stages"][name] = {
+                "total": round(float(values.sum()), 2),
+                "mean_ms": round(float(values.mean()) * 1000, 1),
+                "p50_ms": round(float(np.percentile(values, 50)) * 1000, 1),
+                "p95_ms": round(float(np.percentile(values, 95)) * 1000, 1),
+            }
+    return summary
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from app.core.config import settings
+    from app.services import content_store, report_store
+    from app.services.pdf_service import TEMPLATE_VERSION
+
+    cas_dir = args.content_addressed
+    if args.update_records and cas_dir:
+        if os.path.abspath(cas_dir) != os.path.abspath(settings.CONTENT_STORE_DIR):
+            print("[RERENDER ERROR] --update-records stores PDFs in CONTENT_STORE_DIR; drop --content-addressed")
+            return 2
+        cas_dir = None  # stored through the content store instead
+
+    paths = collect_paths(args.inputs)
+    print(f"[RERENDER] {len(paths)} files, {args.workers} workers")
+    results = []
+    stored, replaced = set(), set()
+    results_file = open(args.results, "w", encoding="utf-8") if args.results else None
+    started = time.perf_counter()
+    try:
+        for result in _results(paths, args, cas_dir):
+            results.append(result)
+            if results_file:
+                results_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+            if result["status"] == "error":
+                print(f"[RERENDER ERROR] {result['path']}: {result['error']}")
+            elif args.update_records and result["status"] == "ok" and "report_id" in result:
+                stored.add(result["sha256"])
+                report_store.update_report(
+                    result["user_id"],
+                    result["report_id"],
+                    pdf_sha256=result["sha256"],
+                    pdf_size=result["pdf_size"],
+                    template_version=TEMPLATE_VERSION,
+                    uploaded_url=None,
+                )
+                if result.get("previous_sha256"):
+                    replaced.add(result["previous_sha256"])
+            if len(results) % 50 == 0:
+                print(f"[RERENDER] {len(results)}/{len(paths)} ({len(results) / (time.perf_counter() - started):.1f}/s)")
+    finally:
+        if results_file:
+            results_file.close()
+    # Once all are done: a PDF replaced for one record may be the new PDF of another
+    for digest in replaced - stored:
+        content_store.remove(digest)
+
+    summary = summarize(results, time.perf_counter() - started)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Local stand-in for the external services, for offline performance work.
+
+    python -m app.cli.standin --port 8090 --latency-ms 800 --jitter-ms 200 --error-rate 0.02
+
+Implements the subset of each API this backend uses:
+
+- OpenAI:   POST /v1/chat/completions (plain and "stream": true), answered
+            with a canned report (--completion-file), or with three canned
+            questions when the prompt asks for questions
+- PsyPack:  GET /api/get-assessments, POST /api/initiate-assessment,
+            GET /api/assessment-status/{id}, POST /api/report/{id}/pdf
+- Storage:  POST /upload (multipart "report"), answering {"path": <url>};
+            GET /files/<sha256>.pdf serves the last MAX_STORED_UPLOADS uploads
+- GET /stats: request counts per route (not subject to injected faults)
+
+Point the backend at it with:
+
+    OPENAI_BASE_URL=http://localhost:8090/v1
+    PSYPACK_BASE_URL=http://localhost:8090/api
+    PDF_STORAGE_PATH=http://localhost:8090/upload
+
+Every other request gets the injected behaviour: a delay of --latency-ms
+plus or minus --jitter-ms, a --error-status answer with probability
+--error-rate, 429 beyond --max-rps, and bodies sent at --bandwidth-kbps.
+--seed makes the delays and errors reproducible.
+"""
+import argparse
+import asyncio
+import collections
+import hashlib
+import io
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 16 * 1024
+# Uploads kept in memory for GET /files/...; older ones answer 404
+MAX_STORED_UPLOADS = 500
+DEFAULT_COMPLETION_FILE = "new_response_data.json"
+QUESTIONS_COMPLETION = json.dumps(
+    {
+        "1": {"question": "How do you usually spend a free weekend?", "question_type": "simple_q_and_a"},
+        "2": {
+            "question": "Which best describes how you make decisions?",
+            "question_type": "multichoice",
+            "options": ["Logic first", "Gut feeling", "Ask others", "Sleep on it"],
+        },
+        "3": {"question": "Describe a recent challenge and how you handled it.", "question_type": "voice_to_text"},
+    }
+)
+
+
+class Faults:
+    """Injected latency, errors, rate limit and bandwidth, drawn from one seeded RNG."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503, max_rps=0, bandwidth_kbps=0, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_rps = max_rps
+        self.bytes_per_second = bandwidth_kbps * 1024 / 8 if bandwidth_kbps else 0
+        self.random = random.Random(seed)
+        self._window = collections.deque()
+
+    def delay(self):
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def fails(self):
+        return self.random.random() < self.error_rate
+
+    def over_rate(self):
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= 1.0:
+            self._window.popleft()
+        if len(self._window) >= self.max_rps:
+            return True
+        self._window.append(now)
+        return False
+
+    async def paced(self, data):
+        """Yield `data` in chunks no faster than the configured bandwidth."""
+        for start in range(0, len(data), CHUNK_SIZE):
+            chunk = data[start : start + CHUNK_SIZE]
+            if self.bytes_per_second:
+                await asyncio.sleep(len(chunk) / self.bytes_per_second)
+            yield chunk
+
+
+def _sample_pdf():
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    pdf.drawString(72, 770, "Stand-in PsyPack report")
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _load_completion(path):
+    with open(path, "r", encoding="utf-8") as f:
+        content = json.load(f)
+    # Stored either as the completion text itself or as parsed JSON
+    return content if isinstance(content, str) else json.dumps(content)
+
+
+def create_app(faults, report_completion, pdf_bytes=None):
+    app = FastAPI(title="PsyMitrix stand-in services")
+    pdf_bytes = pdf_bytes or _sample_pdf()
+    counts = collections.Counter()
+    statuses = {}
+    uploads = collections.OrderedDict()  # "<sha256>.pdf" -> bytes, oldest first
+
+    @app.middleware("http")
+    async def inject(request: Request, call_next):
+        if request.url.path == "/stats":
+            return await call_next(request)
+        counts[request.url.path.split("/")[1] or "/"] += 1
+        await asyncio.sleep(faults.delay())
+        if faults.over_rate():
+            counts["rate_limited"] += 1
+            return JSONResponse({"error": {"message": "Rate limit exceeded (stand-in)"}}, status_code=429)
+        if faults.fails():
+            counts["errors"] += 1
+            return JSONResponse({"error": {"message": "Injected failure (stand-in)"}}, status_code=faults.error_status)
+        return await call_next(request)
+
+    def _body(data, media_type, headers=None):
+        return StreamingResponse(
+            faults.paced(data), media_type=media_type, headers=dict(headers or {}, **{"Content-Length": str(len(data))})
+        )
+
+    # ---------------------------
+    # OpenAI
+    # ---------------------------
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        # The question prompt spells out its answer format (app/core/prompts.py)
+        completion = QUESTIONS_COMPLETION if '"question_type"' in prompt else report_completion
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages", []))
+        completion_tokens = len(completion) // 4
+        created, completion_id = int(time.time()), f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model", "stand-in")
+        if not body.get("stream"):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": completion}}
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+            return _body(json.dumps(payload).encode("utf-8"), "application/json")
+
+        async def events():
+            # Roughly token-sized pieces; bandwidth pacing applies per event
+            for start in range(0, len(completion), 64):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": completion[start : start + 64]}, "finish_reason": None}],
+                }
+                async for piece in faults.paced(f"data: {json.dumps(chunk)}\n\n".encode("utf-8")):
+                    yield piece
+            done = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # ---------------------------
+    # PsyPack
+    # ---------------------------
+    @app.get("/api/get-assessments")
+    async def get_assessments():
+        return {
+            "assessments": [
+                {"assessmentId": "stand-in-big5", "name": "Big Five Personality (stand-in)", "duration": 20},
+                {"assessmentId": "stand-in-career", "name": "Career Interests (stand-in)", "duration": 15},
+            ]
+        }
+
+    @app.post("/api/initiate-assessment")
+    async def initiate_assessment(request: Request):
+        body = await request.json()
+        assessments = []
+        for email in body.get("emailList", []):
+            user_assessment_id = uuid.uuid4().hex
+            statuses[user_assessment_id] = time.monotonic()
+            assessments.append({"email": email, "userAssessmentId": user_assessment_id})
+        return {"success": True, "assessmentId": body.get("assessmentId"), "userAssessments": assessments}
+
+    @app.get("/api/assessment-status/{user_assessment_id}")
+    async def assessment_status(user_assessment_id: str):
+        started = statuses.get(user_assessment_id)
+        # Pretend the assessment is taken within a minute of being initiated
+        status = "completed" if started is None or time.monotonic() - started > 60 else "in_progress"
+        return {"userAssessmentId": user_assessment_id, "status": status, "reportId": f"report-{user_assessment_id[:12]}"}
+
+    @app.post("/api/report/{report_id}/pdf")
+    async def report_pdf(report_id: str):
+        return _body(pdf_bytes, "application/pdf", {"Content-Disposition": f"attachment; filename={report_id}.pdf"})
+
+    # ---------------------------
+    # Report storage
+    # ---------------------------
+    @app.post("/upload")
+    async def upload(request: Request, report: UploadFile = File(...)):
+        data = await report.read()
+        name = f"{hashlib.sha256(data).hexdigest()}.pdf"
+        counts["uploaded_bytes"] += len(data)
+        uploads[name] = data
+        uploads.move_to_end(name)
+        while len(uploads) > MAX_STORED_UPLOADS:
+            uploads.popitem(last=False)
+        return {"path": f"{str(request.base_url).rstrip('/')}/files/{name}"}
+
+    @app.get("/files/{name}")
+    async def uploaded_file(name: str):
+        data = uploads.get(name)
+        if data is None:
+            return Response(status_code=404)
+        return _body(data, "application/pdf")
+
+    @app.get("/stats")
+    async def stats():
+        return dict(counts)
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli.standin", description="Local stand-in for OpenAI, PsyPack and report storage.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform +/- around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--max-rps", type=float, default=0, help="requests per second before answering 429 (0 = no limit)")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0, help="response body rate (0 = unlimited)")
+    parser.add_argument("--seed", type=int, help="seed for jitter and errors (reproducible runs)")
+    parser.add_argument("--completion-file", default=DEFAULT_COMPLETION_FILE, help="canned chat completion content (JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import uvicorn
+
+    args = parse_args(argv)
+    faults = Faults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        max_rps=args.max_rps,
+        bandwidth_kbps=args.bandwidth_kbps,
+        seed=args.seed,
+    )
+    if not os.path.exists(args.completion_file):
+        raise SystemExit(f"Completion file not found: {args.completion_file}")
+    app = create_app(faults, _load_completion(args.completion_file))
+    print(f"[STANDIN] Serving on http://{args.host}:{args.port} (latency {args.latency_ms}±{args.jitter_ms} ms, error rate {args.error_rate})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,6 +7,100 @@ class Settings(BaseSettings):
     SQL_PASSWORD: str
     SQL_DATABASE: str
     OPEN_AI_API: str
+    # OpenAI-compatible endpoint (None = api.openai.com), e.g. the local stand-in
+    # (python -m app.cli.standin) at http://localhost:8090/v1
+    OPENAI_BASE_URL: Optional[str] = None
+    OPENAI_MODEL: str = "gpt-4.1"
+    # Rate governor for LLM calls (app/services/llm_governor.py), per process;
+    # LLM_REQUESTS_PER_MINUTE = 0 disables pacing
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_REQUESTS_PER_MINUTE: float = 0
+    # PsyPack assessments API (app/api/Psy); point at a stand-in for load tests
+    PSYPACK_BASE_URL: str = "https://asia-south1-psypack-deploy.cloudfunctions.net/api"
+    # Per-request stage timings (app/utils/server_timing.py): Server-Timing
+    # header plus one [TIMING] log line per request at or above the threshold
+    # (/health and /metrics are never logged)
+    SERVER_TIMING_ENABLED: bool = True
+    SERVER_TIMING_LOG: bool = True
+    SERVER_TIMING_LOG_MIN_MS: float = 1000
+    # Prometheus metrics at GET /metrics (app/utils/metrics.py). Each process
+    # writes its values to METRICS_DIR every METRICS_FLUSH_SECONDS so any
+    # worker can report the totals of all of them; None = this process only
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: Optional[str] = "metrics"
+    METRICS_FLUSH_SECONDS: float = 5.0
+
+    # Database pool ("mysql" in production, "sqlite" as a local stand-in for tests)
+    SQL_BACKEND: str = "mysql"
+    SQL_PORT: int = 3306
+    SQL_POOL_NAME: str = "psymitrix"
+    SQL_POOL_SIZE: int = 5
+    SQL_POOL_WAIT_TIMEOUT: float = 10.0
+    SQL_SQLITE_PATH: str = "psymitrix.sqlite3"
+
+    # Persisted report JSON (lets a PDF be re-rendered without another LLM call)
+    REPORT_STORE_DIR: str = "report_store"
+
+    # External report storage upload
+    PDF_STORAGE_PATH: Optional[str] = None
+    UPLOAD_CONNECT_TIMEOUT: float = 5.0
+    UPLOAD_READ_TIMEOUT: float = 60.0
+    UPLOAD_MAX_RETRIES: int = 3
+    UPLOAD_BACKOFF_SECONDS: float = 0.5
+    UPLOAD_MAX_CONNECTIONS: int = 10
+
+    # Local copies of generated PDFs; the byte caps below apply to the whole
+    # directory, shared by all workers
+    GENERATED_FILE_TTL_SECONDS: int = 300
+    GENERATED_MAX_BYTES: int = 500 * 1024 * 1024
+
+    # Content-addressed PDF store behind GET /report/{sha256}
+    CONTENT_STORE_DIR: str = "report_files"
+    CONTENT_STORE_TTL_SECONDS: int = 7 * 24 * 3600
+    CONTENT_STORE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    # "sync": upload before responding, "async": upload in the background, "off": local only
+    REPORT_REPLICATION: str = "sync"
+
+    # Render worker processes per web worker, capped at the CPU count
+    # (0 = render in a thread of the web worker)
+    RENDER_POOL_SIZE: int = 0
+    RENDER_POOL_MAX_JOBS: int = 50
+    RENDER_POOL_MAX_RSS_MB: int = 700
+    # Render report segments concurrently in the pool and merge them (needs pypdf)
+    PDF_PARALLEL_SEGMENTS: bool = False
+    # Chart pages: "fixed" (one page, precomputed positions) or "flow" (KeepTogether)
+    PDF_CHART_LAYOUT: str = "fixed"
+    # "standard" or "compact" (charts sized for their placement, flattened and quantized)
+    PDF_OUTPUT_MODE: str = "standard"
+    PDF_COMPACT_DPI: int = 150
+    PDF_COMPACT_COLORS: int = 64
+    # Charts: "separate" (one matplotlib figure each) or "sprite" (all of a
+    # report's charts drawn in one figure and cut apart; serial renders only)
+    PDF_CHART_RENDER: str = "separate"
+    # JSON list of tenant branding profiles (see app/services/branding.py)
+    TENANTS_FILE: Optional[str] = None
+    # Compiled brand kits kept per worker process
+    BRAND_CACHE_SIZE: int = 16
+    # PDF for preview requests (POST /report/?output=html|json): "async" (rendered
+    # in the background right away) or "on_demand" (on first download)
+    PREVIEW_PDF: str = "async"
+    # Population benchmarks for the comparison chart (app/services/benchmarks.py);
+    # BENCHMARK_FILE defaults to <REPORT_STORE_DIR>/benchmarks.json
+    BENCHMARKS_ENABLED: bool = True
+    BENCHMARK_FILE: Optional[str] = None
+    BENCHMARK_MIN_SAMPLES: int = 30
+    BENCHMARK_FLUSH_SECONDS: float = 30.0
+    BENCHMARK_REFRESH_SECONDS: float = 30.0
+    # Columnar score archive for cohort queries (app/services/score_archive.py);
+    # defaults to <REPORT_STORE_DIR>/_scores
+    SCORE_ARCHIVE_ENABLED: bool = True
+    SCORE_ARCHIVE_DIR: Optional[str] = None
+    # Most members a cohort report (POST /report/cohort) may aggregate
+    COHORT_MAX_MEMBERS: int = 1000
+    # Bulk generation (POST /report/bulk, python -m app.cli.bulk): items
+    # processed at once, and the most items one API request may carry
+    BULK_CONCURRENCY: int = 4
+    BULK_MAX_ITEMS: int = 1000
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
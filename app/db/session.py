@@ -1,10 +1,201 @@
-import mysql.connector
+"""
+Pooled database access.
+
+The pool is created lazily on first checkout, so importing the app never
+needs a reachable database. Every checkout is health-checked (and reconnected
+if the server dropped it) before being handed out.
+
+Usage inside an endpoint:
+
+    from fastapi import Depends
+    from app.db.session import get_db
+
+    @router.get("/")
+    def read_users(db=Depends(get_db)):
+        cur = db.cursor()
+        cur.execute("SELECT ...")
+
+Outside a request use `with db_connection() as db: ...`.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
 from app.core.config import settings
+from app.utils import metrics
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "checkouts": 0,
+    "in_use": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+    "timeouts": 0,
+    "reconnects": 0,
+}
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection became free within SQL_POOL_WAIT_TIMEOUT."""
+
+
+class _SQLitePool:
+    """Minimal stand-in for MySQLConnectionPool backed by sqlite3 (tests / local runs)."""
+
+    def __init__(self, path, pool_size):
+        self.pool_name = f"sqlite:{path}"
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._idle.put(sqlite3.connect(path, check_same_thread=False))
+
+    def get_connection(self):
+        try:
+            return _SQLiteConnection(self, self._idle.get_nowait())
+        except queue.Empty:
+            raise _PoolExhausted()
+
+    def _release(self, raw):
+        self._idle.put(raw)
+
+
+class _SQLiteConnection:
+    """Wraps a raw sqlite3 connection so that close() returns it to the pool."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self._raw.execute("SELECT 1")
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.rollback()
+            self._pool._release(self._raw)
+            self._raw = None
+
+
+class _PoolExhausted(Exception):
+    pass
+
+
+def _create_pool():
+    if settings.SQL_BACKEND == "sqlite":
+        return _SQLitePool(settings.SQL_SQLITE_PATH, settings.SQL_POOL_SIZE)
+
+    from mysql.connector import pooling
+
+    return pooling.MySQLConnectionPool(
+        pool_name=settings.SQL_POOL_NAME,
+        pool_size=settings.SQL_POOL_SIZE,
+        pool_reset_session=True,
+        host=settings.SQL_HOST,
+        port=settings.SQL_PORT,
+        user=settings.SQL_USER,
+        password=settings.SQL_PASSWORD,
+        database=settings.SQL_DATABASE,
+    )
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _create_pool()
+    return _pool
+
+
+def _checkout(pool):
+    """Take a connection from the pool, waiting up to SQL_POOL_WAIT_TIMEOUT for one to free up."""
+    exhausted = (_PoolExhausted,)
+    if settings.SQL_BACKEND != "sqlite":
+        from mysql.connector.errors import PoolError
+        exhausted = (_PoolExhausted, PoolError)
+
+    start = time.monotonic()
+    deadline = start + settings.SQL_POOL_WAIT_TIMEOUT
+    delay = 0.005
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except exhausted:
+            if time.monotonic() >= deadline:
+                with _stats_lock:
+                    _stats["timeouts"] += 1
+                raise PoolTimeoutError(
+                    f"No database connection available after {settings.SQL_POOL_WAIT_TIMEOUT}s "
+                    f"(pool size {settings.SQL_POOL_SIZE})"
+                )
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    waited = time.monotonic() - start
+    with _stats_lock:
+        _stats["checkouts"] += 1
+        _stats["in_use"] += 1
+        _stats["wait_seconds_total"] += waited
+        _stats["wait_seconds_max"] = max(_stats["wait_seconds_max"], waited)
+    return conn
+
+
+def _health_check(conn):
+    """Make sure the connection is alive; reconnect once if the server closed it."""
+    try:
+        conn.ping(reconnect=False)
+    except Exception:
+        conn.ping(reconnect=True, attempts=3, delay=0.2)
+        with _stats_lock:
+            _stats["reconnects"] += 1
+
+
+@contextmanager
+def db_connection():
+    """Check out a healthy connection; commit on success, roll back on error, always return it."""
+    conn = _checkout(get_pool())
+    try:
+        _health_check(conn)
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        with _stats_lock:
+            _stats["in_use"] -= 1
+        conn.close()  # returns the connection to the pool
+
+
+def get_db():
+    """FastAPI dependency: one pooled connection scoped to the request."""
+    with db_connection() as conn:
+        yield conn
+
+
+def pool_stats():
+    """Snapshot of pool size, usage and checkout wait times."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot["backend"] = settings.SQL_BACKEND
+    snapshot["pool_size"] = settings.SQL_POOL_SIZE
+    snapshot["created"] = _pool is not None
+    return snapshot
+
 
-mydb = mysql.connector.connect(
-  host=settings.SQL_HOST,
-  user=settings.SQL_USER,
-  password=settings.SQL_PASSWORD,
-  database=settings.SQL_DATABASE
+metrics.mirror_stats(
+    "db", pool_stats, totals=("checkouts", "wait_seconds_total", "timeouts", "reconnects"), gauges=("in_use",)
 )
-mycursor = mydb.cursor()
\ No newline at end of file
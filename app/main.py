@@ -1,19 +1,49 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse
 # from pydub import AudioSegment
 
 from app.api.v1.router import api_router
 from app.api.Psy.router import api_router as psy_api_router
 from app.utils.http_constants import HTTP_STATUS, HTTP_CODE
 from app.utils.response_helper import make_response
+from app.utils import metrics
+from app.utils.server_timing import ServerTimingMiddleware
+from app.db.session import pool_stats
+from app.services.storage_service import close_client
+from app.services.cleanup_service import janitor
+from app.services import benchmarks, content_store, render_pool
+from app.services.pdf_service import GENERATED_DIR
+from app.core.config import settings
 
 # Configure AudioSegment
 # Note: These paths should ideally be in environment variables or configuration
 # AudioSegment.converter = "/var/www/python-counsellor-india/ffmpeg-bin/ffmpeg"
 
-app = FastAPI(title="MBAI Python Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One cleanup thread per process; also picks up files left over from a restart
+    janitor.sweep(
+        GENERATED_DIR,
+        max_age=settings.GENERATED_FILE_TTL_SECONDS,
+        max_bytes=settings.GENERATED_MAX_BYTES,
+    )
+    content_store.sweep()
+    render_pool.start()
+    yield
+    await asyncio.to_thread(render_pool.shutdown)
+    # Merge this worker's last queued benchmark scores
+    await asyncio.to_thread(benchmarks.shutdown)
+    # Release the shared keep-alive connections to report storage
+    await close_client()
+    # Last snapshot of this worker's metrics
+    await asyncio.to_thread(metrics.shutdown)
+
+app = FastAPI(title="MBAI Python Backend", version="1.0.0", lifespan=lifespan)
 
 # Middleware
 app.add_middleware(
@@ -22,7 +52,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the per-request stage timings
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Exception Handlers
 @app.exception_handler(RequestValidationError)
@@ -48,4 +82,9 @@ app.include_router(prefix="/psy",router=psy_api_router) # All routes are under /
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "message": "Service is healthy"}
+    return {"status": "ok", "message": "Service is healthy", "db_pool": pool_stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    # Prometheus scrape target, totals over all worker processes
+    return PlainTextResponse(metrics.exposition(), media_type="text/plain; version=0.0.4")
@@ -31,6 +31,23 @@ class questions(BaseModel):
     take:str = None
     name:str = None
     generated_by:str = None
+    template: Optional[str] = None  # report template id, see GET /report/templates
+    tenant: Optional[str] = None  # branding profile id, see GET /report/tenants
+
+class CohortMember(BaseModel):
+    # Either a stored report ...
+    user_id: Optional[str] = None
+    report_id: Optional[str] = None
+    # ... or a score vector: {"sections.charts.radarChart/curiosity": 85, ...}
+    scores: Optional[dict[str, float]] = None
+    name: Optional[str] = None
+
+class CohortRequest(BaseModel):
+    name: str
+    members: list[CohortMember]
+    generated_by: Optional[str] = None
+    template: Optional[str] = None
+    tenant: Optional[str] = None
 
 class ApiRespons(BaseModel):
     status_code: int
@@ -1,18 +1,62 @@
 import os
 import json
+import functools
+import time
 from openai import OpenAI
 from app.core.prompts import question_prompt, report_prompt, questio_report_prompt
 from app.core.config import settings
 from app.schemas.models import IntakeParameters, questions
 from collections import defaultdict
 from fastapi import HTTPException
+from app.services.llm_governor import governor
 from app.utils.response_helper import remove_backslashes
+from app.utils import metrics
+from app.utils.timing import stage
 
 OPEN_AI_API_KEY = settings.OPEN_AI_API
 if not OPEN_AI_API_KEY:
     raise ValueError("❌ OPEN_AI_API environment variable not found.")
 
 
+@functools.lru_cache(maxsize=4)
+def _openai_client(base_url):
+    # One client (and connection pool) per endpoint, reused across calls
+    return OpenAI(api_key=OPEN_AI_API_KEY, base_url=base_url)
+
+
+def get_client():
+    """OpenAI client for OPENAI_BASE_URL (api.openai.com when unset)."""
+    return _openai_client(settings.OPENAI_BASE_URL)
+
+
+metrics.mirror_lru_cache("openai_client", _openai_client)
+
+
+def _chat(call, system_prompt, user_prompt):
+    """One JSON-mode chat completion through the rate governor, recorded in the LLM metrics."""
+    client = get_client()
+    model = settings.OPENAI_MODEL  # e.g. "gpt-4.1" / "gpt-4.1-mini"
+    with stage("llm"), governor.slot():
+        started = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+            )
+        except Exception:
+            metrics.LLM_DURATION.observe(time.perf_counter() - started, model=model, call=call, outcome="error")
+            raise
+    metrics.LLM_DURATION.observe(time.perf_counter() - started, model=model, call=call, outcome="ok")
+    if response.usage:
+        metrics.LLM_TOKENS.inc(response.usage.prompt_tokens, model=model, type="prompt")
+        metrics.LLM_TOKENS.inc(response.usage.completion_tokens, model=model, type="completion")
+    return response
+
+
 def chunk_text(text, chunk_size=1000, overlap=200):
     chunks = []
     start = 0
@@ -63,15 +107,8 @@ def generate_questions(params: IntakeParameters , questionList : questions) -> s
     dynamic_prompt = escaped_prompt.format_map(safe_data)
 
     try:
-        client = OpenAI(api_key=OPEN_AI_API_KEY)
-
-        ai_response = client.chat.completions.create(
-            model="gpt-4.1",   # or "gpt-4.1-mini" / "gpt-4.1-large"
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an empathetic psychiatrist generating intake questions."},
-                {"role": "user", "content": dynamic_prompt}
-            ],
+        ai_response = _chat(
+            "questions", "You are an empathetic psychiatrist generating intake questions.", dynamic_prompt
         )
 
         response_text = ai_response.choices[0].message.content
@@ -112,15 +149,8 @@ def generate_report(params: IntakeParameters , questionList : questions) -> str:
     safe_data = defaultdict(lambda: "N/A", data)
     dynamic_prompt = escaped_prompt.format_map(safe_data)
     try:
-        client = OpenAI(api_key=OPEN_AI_API_KEY)
-
-        ai_response = client.chat.completions.create(
-            model="gpt-4.1",   # or "gpt-4.1-mini" / "gpt-4.1-large"
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an empathetic psychiatrist generating intake questions."},
-                {"role": "user", "content": dynamic_prompt}
-            ],
+        ai_response = _chat(
+            "report", "You are an empathetic psychiatrist generating intake questions.", dynamic_prompt
         )
 
         response_text = ai_response.choices[0].message.content
@@ -144,15 +174,10 @@ def generate_report_from_questions(questions: str) -> str:
         dynamic_prompt = base_prompt.format(questions=chunk_context)
 
         # Call OpenAI API
-        client = OpenAI(api_key=OPEN_AI_API_KEY)
-
-        ai_response = client.chat.completions.create(
-            model="gpt-4.1",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an empathetic psychiatrist generating an intake analysis report."},
-                {"role": "user", "content": dynamic_prompt}
-            ],
+        ai_response = _chat(
+            "questions_report",
+            "You are an empathetic psychiatrist generating an intake analysis report.",
+            dynamic_prompt,
         )
 
         llm_output = ai_response.choices[0].message.content
@@ -0,0 +1,219 @@
+"""
+Population benchmarks for trait scores.
+
+Every newly generated report contributes its chart scores (radar, bar and
+comparison charts; 0-100 per trait). Per trait we keep:
+
+- count, mean and M2 (Welford / Chan), mergeable across batches and processes;
+- a 101-bin histogram of the rounded scores. Scores are bounded integers in
+  practice, so this is an exact quantile sketch of fixed size.
+
+Recording only appends to an in-process queue (no lock, no I/O). A daemon
+thread per process drains the queue every BENCHMARK_FLUSH_SECONDS and merges
+the batch into BENCHMARK_FILE under an exclusive file lock, so all web
+workers share one set of statistics. Readers (the comparison chart, in any
+process) use a snapshot of the file with percentiles precomputed at load
+time and re-read it when the file changes, so a lookup is a dict access.
+"""
+import collections
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.report_templates import get_template
+
+# Used until a trait has BENCHMARK_MIN_SAMPLES scores
+DEFAULT_BENCHMARK = 50
+
+BINS = 101
+
+# Chart kinds whose entries are 0-100 trait scores
+SCORE_KINDS = ("radar", "horizontal_bar", "vertical_bar", "comparison_bar")
+
+QUANTILES = {"p10": 0.10, "p25": 0.25, "p50": 0.50, "p75": 0.75, "p90": 0.90}
+
+_pending = collections.deque()
+_flush_lock = threading.Lock()
+_flusher = None
+_stop = threading.Event()
+
+_snapshot = {}
+_snapshot_mtime = None
+_snapshot_checked = 0.0
+
+
+def _path():
+    return settings.BENCHMARK_FILE or os.path.join(settings.REPORT_STORE_DIR, "benchmarks.json")
+
+
+def trait_key(field):
+    return " ".join(str(field).split()).lower()
+
+
+# ---------------------------
+# Recording (request path)
+# ---------------------------
+def record_report(data, template_id=None):
+    """Queue a report's trait scores; returns immediately (merged by the flusher thread)."""
+    if not settings.BENCHMARKS_ENABLED:
+        return
+    for chart in get_template(template_id).charts:
+        if chart.kind not in SCORE_KINDS:
+            continue
+        chart_input = chart.bind(data)
+        if chart_input is None:
+            continue
+        for entry in chart_input[1]:
+            if not isinstance(entry, dict) or "field" not in entry:
+                continue
+            try:
+                score = float(entry.get("value"))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= score <= 100:
+                _pending.append((trait_key(entry["field"]), score))
+    _ensure_flusher()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flush_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="benchmark-flush", daemon=True)
+            _flusher.start()
+
+
+def _flush_loop():
+    while not _stop.wait(settings.BENCHMARK_FLUSH_SECONDS):
+        try:
+            flush()
+        except Exception as e:
+            print(f"[BENCHMARK ERROR] Flush failed: {e}")
+
+
+# ---------------------------
+# Merging (flusher thread / shutdown)
+# ---------------------------
+def _empty():
+    return {"count": 0, "mean": 0.0, "m2": 0.0, "hist": [0] * BINS}
+
+
+def _merge(stats, scores):
+    """Fold a batch of scores into one trait's stats (Chan et al. parallel update)."""
+    batch = np.asarray(scores, dtype=float)
+    n_b = len(batch)
+    mean_b = float(batch.mean())
+    m2_b = float(((batch - mean_b) ** 2).sum())
+    n_a = stats["count"]
+    n = n_a + n_b
+    delta = mean_b - stats["mean"]
+    stats["mean"] += delta * n_b / n
+    stats["m2"] += m2_b + delta * delta * n_a * n_b / n
+    stats["count"] = n
+    hist = np.asarray(stats["hist"], dtype=np.int64)
+    hist += np.bincount(np.rint(batch).astype(int), minlength=BINS)
+    stats["hist"] = hist.tolist()
+
+
+def flush():
+    """Merge the queued scores into BENCHMARK_FILE (under an exclusive file lock)."""
+    with _flush_lock:
+        batch = collections.defaultdict(list)
+        while _pending:
+            trait, score = _pending.popleft()
+            batch[trait].append(score)
+        if not batch:
+            return 0
+
+        path = _path()
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with open(path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                traits = _read(path)
+                for trait, scores in batch.items():
+                    _merge(traits.setdefault(trait, _empty()), scores)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump({"version": 1, "traits": traits}, f, separators=(",", ":"))
+                    os.replace(tmp_path, path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    _load_snapshot(traits, os.stat(path).st_mtime_ns)
+    return sum(len(scores) for scores in batch.values())
+
+
+def shutdown():
+    _stop.set()
+    flush()
+
+
+# ---------------------------
+# Reading (chart rendering, any process)
+# ---------------------------
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("traits", {})
+    except FileNotFoundError:
+        return {}
+
+
+def _summary(stats):
+    count = stats["count"]
+    cumulative = np.cumsum(stats["hist"])
+    summary = {
+        "count": count,
+        "mean": round(stats["mean"], 2),
+        "std": round((stats["m2"] / (count - 1)) ** 0.5, 2) if count > 1 else 0.0,
+    }
+    for name, q in QUANTILES.items():
+        summary[name] = int(np.searchsorted(cumulative, q * count))
+    return summary
+
+
+def _load_snapshot(traits, mtime):
+    global _snapshot, _snapshot_mtime
+    _snapshot = {trait: _summary(stats) for trait, stats in traits.items() if stats["count"]}
+    _snapshot_mtime = mtime
+
+
+def _current():
+    global _snapshot_checked
+    now = time.monotonic()
+    if now - _snapshot_checked >= settings.BENCHMARK_REFRESH_SECONDS:
+        _snapshot_checked = now
+        try:
+            mtime = os.stat(_path()).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != _snapshot_mtime and mtime is not None:
+            _load_snapshot(_read(_path()), mtime)
+    return _snapshot
+
+
+def benchmark(field, stat="p50", default=DEFAULT_BENCHMARK):
+    """Population statistic for a trait (median by default); `default` while samples are few."""
+    summary = _current().get(trait_key(field))
+    if summary is None or summary["count"] < settings.BENCHMARK_MIN_SAMPLES:
+        return default
+    return summary[stat]
+
+
+def benchmark_stats():
+    """Snapshot of every trait's count, mean, std and percentiles."""
+    return dict(_current())
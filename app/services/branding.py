@@ -0,0 +1,102 @@
+"""
+Tenant branding profiles.
+
+Every report is rendered for one tenant: company name, contact details,
+logo, colour palette, chart colours, fonts and footer text. The built-in
+"endorphin" profile is always available. Further tenants are loaded once
+from the JSON list in TENANTS_FILE and validated against TenantProfile.
+
+pdf_service compiles each profile into a brand kit (styles, parsed colours,
+logo bytes, chart colours) and keeps those in an LRU cache.
+"""
+import json
+import threading
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+
+DEFAULT_TENANT = "endorphin"
+
+
+class TenantError(ValueError):
+    """Tenant profiles are malformed, or the requested tenant does not exist."""
+
+
+class TenantFonts(BaseModel):
+    # Standard PDF font names, or names registered from `files`
+    regular: str = "Helvetica"
+    bold: str = "Helvetica-Bold"
+    italic: str = "Helvetica-Oblique"
+    # font name -> TrueType file to register (and embed), e.g. {"Inter": "assets/Inter.ttf"}
+    files: Dict[str, str] = {}
+
+
+class TenantProfile(BaseModel):
+    id: str
+    company_name: str
+    company_site: str = ""
+    company_mail: str = ""
+    # Missing or unreadable logos are replaced by a generated placeholder
+    logo_path: Optional[str] = None
+    # Overrides for pdf_service.COLORS keys (e.g. {"primary": "#0B5D1E"})
+    palette: Dict[str, str] = {}
+    # Series colours for multi-colour charts; empty keeps the default set
+    chart_colors: List[str] = []
+    fonts: TenantFonts = TenantFonts()
+    footer_text: str = (
+        "We are {company_name}, dedicated to advancing careers and well-being. | {company_site}"
+    )
+    # "Generated by" line on the cover; defaults to "<company_name> AI"
+    generated_by: Optional[str] = None
+
+
+ENDORPHIN = TenantProfile(
+    id=DEFAULT_TENANT,
+    company_name="Endorphin",
+    company_site="www.endorphin.in",
+    company_mail="info.endorphin@gmail.com",
+    logo_path="public/endorphin.jpeg",
+    generated_by="Endorphin AI",
+)
+
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def _load_profiles():
+    profiles = {ENDORPHIN.id: ENDORPHIN}
+    if not settings.TENANTS_FILE:
+        return profiles
+    try:
+        with open(settings.TENANTS_FILE, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            profile = TenantProfile(**entry)
+            profiles[profile.id] = profile
+    except (OSError, ValueError, TypeError, ValidationError) as e:
+        raise TenantError(f"Invalid tenant profiles in {settings.TENANTS_FILE}: {e}") from e
+    return profiles
+
+
+def _all_profiles():
+    global _profiles
+    with _profiles_lock:
+        if _profiles is None:
+            _profiles = _load_profiles()
+        return _profiles
+
+
+def get_tenant(tenant_id=None):
+    """The tenant's profile (DEFAULT_TENANT when tenant_id is empty). Raises TenantError."""
+    tenant_id = tenant_id or DEFAULT_TENANT
+    profiles = _all_profiles()
+    try:
+        return profiles[tenant_id]
+    except KeyError:
+        raise TenantError(f"Unknown tenant '{tenant_id}'") from None
+
+
+def list_tenants():
+    return [{"id": p.id, "company_name": p.company_name} for p in _all_profiles().values()]
@@ -0,0 +1,174 @@
+"""
+Bulk report generation: many reports from one JSONL batch.
+
+Each input line is one POST /report/ body plus an optional item id:
+
+    {"id": "emp-0042", "params": {"Name": ...}, "questionList": {"questions": [...]}}
+
+Items run BULK_CONCURRENCY at a time through the same pipeline as single
+requests (report_pipeline): the LLM call goes through the rate governor,
+the PDF is rendered in the render pool. One JSONL result line per item is
+produced as soon as that item finishes, in completion order.
+
+Resuming: with a checkpoint file, every successful item is appended to it
+(and fsynced) before its result is emitted. A rerun of the same batch
+replays checkpointed items without touching them again. Items are matched
+on their id (line number without one) and request key together, so two
+lines sharing an id, or an edited line, never replay another's result. Items that were
+half done when the batch died are cheap to redo as well: their stored
+report is found by request key, so no second LLM call is made.
+"""
+import asyncio
+import json
+import os
+import time
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.models import IntakeParameters, questions
+from app.services.branding import TenantError, get_tenant
+from app.services.idempotency import request_key, run_once
+from app.services.report_pipeline import is_complete, render_once, stored_report
+from app.services.report_templates import TemplateError, get_template
+
+
+class BulkItemError(ValueError):
+    """A batch line is not valid JSON or not a valid report request."""
+
+
+def parse_item(line, line_no):
+    """(item_id, params, questionList, idempotency_key) for one JSONL line. Raises BulkItemError."""
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise BulkItemError(f"invalid JSON: {e}")
+    if not isinstance(item, dict):
+        raise BulkItemError("each line must be a JSON object")
+    try:
+        params = IntakeParameters(**(item.get("params") or {}))
+        questionList = questions(**(item.get("questionList") or {}))
+    except ValidationError as e:
+        raise BulkItemError(f"invalid request: {e.errors()[0].get('msg', e)}")
+    if not params.Name:
+        raise BulkItemError("params.Name is required")
+    try:
+        get_template(questionList.template)
+        get_tenant(questionList.tenant)
+    except (TemplateError, TenantError) as e:
+        raise BulkItemError(str(e))
+    return str(item.get("id") or line_no), params, questionList, item.get("idempotency_key")
+
+
+def read_checkpoint(path):
+    """{(item_id, request_key): result} of the items a previous run of the batch completed."""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A line torn by the crash; that item simply runs again
+                continue
+            if "request_key" in result:
+                done[(str(result["id"]), result["request_key"])] = result
+    return done
+
+
+def _append_checkpoint(path, result):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+async def _process(line, line_no, render):
+    started = time.perf_counter()
+    result = {"id": str(line_no), "line": line_no}
+    try:
+        item_id, params, questionList, idempotency_key = parse_item(line, line_no)
+        result["id"] = item_id
+        key = result["request_key"] = request_key(params, questionList, idempotency_key)
+        record = await run_once(f"{key}:record", lambda: stored_report(params, questionList, key))
+        if render and not is_complete(record):
+            record = await render_once(record)
+        result.update(
+            status="ok",
+            user_id=record["user_id"],
+            report_id=record["report_id"],
+            download_path=f"/report/{record['pdf_sha256']}" if record.get("pdf_sha256") else None,
+            uploaded_url=record.get("uploaded_url"),
+        )
+    except Exception as e:
+        result.update(status="error", error=str(getattr(e, "detail", e)))
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+async def run_batch(lines, checkpoint=None, concurrency=None, render=True):
+    """
+    Async iterator of result dicts ({"id", "line", "status": "ok" | "error",
+    ...}) for an iterable of JSONL lines. Checkpointed items come back with
+    "resumed": true. Blank lines are ignored.
+    """
+    done = read_checkpoint(checkpoint)
+    concurrency = max(1, concurrency or settings.BULK_CONCURRENCY)
+    results = asyncio.Queue()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def worker(line, line_no):
+        try:
+            result = await _process(line, line_no, render)
+            if checkpoint and result["status"] == "ok":
+                await asyncio.to_thread(_append_checkpoint, checkpoint, result)
+            await results.put(result)
+        finally:
+            slots.release()
+
+    async def feed():
+        try:
+            for line_no, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                resumed = done.get(_checkpoint_key(line, line_no)) if done else None
+                if resumed is not None:
+                    await results.put(dict(resumed, resumed=True))
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(worker(line, line_no))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            # Wait for the stragglers, then signal the end
+            for _ in range(concurrency):
+                await slots.acquire()
+            await results.put(None)
+        except Exception as e:
+            # Reading the input failed: hand the error to the consumer
+            await results.put(e)
+
+    tasks = set()
+    feeder = asyncio.create_task(feed())
+    try:
+        while True:
+            result = await results.get()
+            if result is None:
+                break
+            if isinstance(result, Exception):
+                raise result
+            yield result
+        await feeder
+    finally:
+        # Consumer went away (client disconnect, Ctrl+C): stop what is still running
+        feeder.cancel()
+        for task in list(tasks):
+            task.cancel()
+
+
+def _checkpoint_key(line, line_no):
+    try:
+        item_id, params, questionList, idempotency_key = parse_item(line, line_no)
+    except BulkItemError:
+        return None  # failed items are never checkpointed
+    return item_id, request_key(params, questionList, idempotency_key)
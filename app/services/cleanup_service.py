@@ -0,0 +1,239 @@
+"""
+Deferred deletion of generated files.
+
+A single janitor thread per process keeps pending deletions in a min-heap
+ordered by due time and sleeps until the earliest one, instead of one
+sleeping thread per file. It also:
+
+- sweeps a directory at startup, so files left behind by a restart are
+  deleted (or re-scheduled) based on their mtime;
+- caps the total bytes of a group's directory (e.g. temporary renders vs.
+  the download store), deleting the least recently used files first;
+- lets a pending deletion be cancelled or pushed back when the file is
+  served again.
+
+Every gunicorn worker runs its own janitor over the same directories, so
+the shared state is the file system, not the heap: a file's mtime is its
+last use (content_store touches it when serving), an expired file is only
+deleted if its mtime + ttl has passed (otherwise it is re-scheduled), and
+the byte cap is checked against the directory itself, under a file lock.
+"""
+import fcntl
+import heapq
+import itertools
+import os
+import threading
+import time
+
+
+DEFAULT_GROUP = "default"
+LOCK_NAME = ".janitor.lock"
+# A capped directory is re-scanned at most this often, when files were added
+CAP_CHECK_INTERVAL = 1.0
+
+
+class FileJanitor:
+    def __init__(self):
+        self._limits = {}  # group -> (max bytes, directory, recursive)
+        self._heap = []  # (due, seq, path); entries superseded in _due are skipped
+        self._due = {}
+        self._ttls = {}
+        self._groups = {}
+        self._dirty = set()  # capped groups with files added since their last check
+        self._checked = {}  # group -> monotonic time of the last cap check
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # -- public API -------------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="file-janitor", daemon=True)
+                self._thread.start()
+
+    def set_limit(self, group, max_bytes, directory, recursive=False):
+        """Cap the total size of the files in `group`'s `directory` (max_bytes None = unbounded)."""
+        with self._cond:
+            if max_bytes is None:
+                self._limits.pop(group, None)
+            else:
+                self._limits[group] = (max_bytes, directory, recursive)
+
+    def schedule(self, path, delay, group=DEFAULT_GROUP):
+        """
+        Delete `path` in `delay` seconds, or `delay` seconds after its mtime if
+        that is later (re-scheduling replaces an earlier due time).
+        """
+        self.start()
+        self._schedule_at(path, time.time() + delay, delay, group)
+
+    def cancel(self, path):
+        """Drop a pending deletion. Returns True if one was pending."""
+        with self._cond:
+            if path not in self._due:
+                return False
+            self._forget(path)
+            return True
+
+    def sweep(self, directory, max_age, max_bytes=None, group=DEFAULT_GROUP, recursive=False):
+        """
+        Startup pass over `directory`: delete files older than `max_age`
+        seconds (by mtime) and schedule the rest for when they reach it.
+        """
+        if max_bytes is not None:
+            self.set_limit(group, max_bytes, directory, recursive)
+        if not os.path.isdir(directory):
+            return
+        now = time.time()
+        for path in self._iter_files(directory, recursive):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            due = stat.st_mtime + max_age
+            if due <= now:
+                self._delete(path, reason="stale")
+            else:
+                self._schedule_at(path, due, max_age, group)
+        self.start()
+
+    def enforce_limit(self, group):
+        """Delete the least recently used files of `group` until its directory is under the cap."""
+        with self._cond:
+            limit = self._limits.get(group)
+            self._dirty.discard(group)
+            self._checked[group] = time.monotonic()
+        if limit is None:
+            return
+        max_bytes, directory, recursive = limit
+        if not os.path.isdir(directory):
+            return
+        # One worker at a time, so two janitors do not both evict for the same overshoot
+        with open(os.path.join(directory, LOCK_NAME), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                files = []
+                total = 0
+                for path in self._iter_files(directory, recursive):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, path, stat.st_size))
+                    total += stat.st_size
+                if total <= max_bytes:
+                    return
+                heapq.heapify(files)
+                while total > max_bytes and files:
+                    _, path, size = heapq.heappop(files)
+                    with self._cond:
+                        self._forget(path)
+                    if self._delete(path, reason="size cap"):
+                        total -= size
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pending": len(self._due),
+                "capped_groups": sorted(self._limits),
+            }
+
+    # -- internals --------------------------------------------------------
+
+    @staticmethod
+    def _iter_files(directory, recursive):
+        # Skips the lock file and files still being written (tempfile "*.tmp")
+        def wanted(name):
+            return not name.startswith(".") and not name.endswith(".tmp")
+
+        if not recursive:
+            for entry in os.scandir(directory):
+                if entry.is_file() and wanted(entry.name):
+                    yield entry.path
+            return
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if wanted(name):
+                    yield os.path.join(root, name)
+
+    def _schedule_at(self, path, due, ttl, group):
+        with self._cond:
+            self._forget(path)
+            self._due[path] = due
+            self._ttls[path] = ttl
+            self._groups[path] = group
+            heapq.heappush(self._heap, (due, next(self._seq), path))
+            if group in self._limits:
+                self._dirty.add(group)
+            self._cond.notify()
+
+    def _forget(self, path):
+        # Caller holds self._cond. The heap entry stays and is skipped later.
+        if path in self._due:
+            del self._due[path]
+            del self._ttls[path]
+            del self._groups[path]
+
+    def _next_cap_check(self):
+        # Caller holds self._cond. (group, seconds until it may be checked) for the most urgent dirty group.
+        now = time.monotonic()
+        waits = [(self._checked.get(g, 0) + CAP_CHECK_INTERVAL - now, g) for g in self._dirty]
+        if not waits:
+            return None, None
+        wait, group = min(waits)
+        return group, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+                        heapq.heappop(self._heap)  # cancelled or re-scheduled
+                    group, cap_wait = self._next_cap_check()
+                    if group is not None and cap_wait <= 0:
+                        path = None
+                        break
+                    wait = self._heap[0][0] - time.time() if self._heap else None
+                    if wait is not None and wait <= 0:
+                        _, _, path = heapq.heappop(self._heap)
+                        ttl, path_group = self._ttls[path], self._groups[path]
+                        self._forget(path)
+                        break
+                    waits = [w for w in (wait, cap_wait) if w is not None]
+                    self._cond.wait(timeout=min(waits) if waits else None)
+            if path is None:
+                try:
+                    self.enforce_limit(group)
+                except Exception as e:
+                    print(f"[DELETE ERROR] Size cap for {group}: {e}")
+                continue
+            self._expire(path, ttl, path_group)
+
+    def _expire(self, path, ttl, group):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return  # already gone
+        if mtime + ttl > time.time():
+            # Written or served again (possibly by another worker) since it was scheduled
+            self._schedule_at(path, mtime + ttl, ttl, group)
+            return
+        self._delete(path, reason="expired")
+
+    @staticmethod
+    def _delete(path, reason):
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+                print(f"[AUTO-DELETE] Removed ({reason}): {path}")
+                return True
+            except Exception as e:
+                print(f"[DELETE ERROR] {e}")
+        return False
+
+
+janitor = FileJanitor()
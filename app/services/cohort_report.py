@@ -0,0 +1,438 @@
+"""
+Team / cohort reports: one PDF summarising many members' scores.
+
+Members are stored reports (user_id + report_id) or plain score vectors
+({archive column: score}, see score_archive.report_scores). Their scores
+become one members x columns matrix; every statistic is a numpy reduction
+over that matrix, and the three cohort charts (overlaid radar, box plot,
+heatmap) are drawn as regions of a single chart sprite, whatever the member
+count: each chart draws all members with one artist, so nothing is allocated
+per member and no LLM call is made.
+"""
+import io
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LinearSegmentedColormap
+from reportlab.lib.units import cm
+from reportlab.platypus import PageBreak, Paragraph, Spacer, Table, TableStyle, Image as RLImage
+
+from app.services import pdf_service, report_store
+from app.services.benchmarks import SCORE_KINDS
+from app.services.report_templates import get_template
+from app.services.score_archive import report_scores
+
+# Members named on the heatmap's axis (beyond this it shows rows only)
+HEATMAP_NAMED_MEMBERS = 40
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class CohortError(ValueError):
+    """A cohort request names no usable members, or reports that do not exist."""
+
+
+# ---------------------------
+# Members and aggregates
+# ---------------------------
+def resolve_members(members, template_id=None):
+    """
+    Plain member dicts ({"name", "scores", "labels"}) for the request's
+    members: stored reports are loaded and scored, score vectors pass
+    through. Raises CohortError listing reports that do not exist.
+    """
+    template = get_template(template_id)
+    resolved, missing = [], []
+    for member in members:
+        if member.get("scores") is not None:
+            resolved.append(
+                {"name": member.get("name") or f"Member {len(resolved) + 1}", "scores": dict(member["scores"]), "labels": {}}
+            )
+            continue
+        record = report_store.get_report(member.get("user_id"), member.get("report_id"))
+        if record is None:
+            missing.append(f"{member.get('user_id')}/{member.get('report_id')}")
+            continue
+        labels = {}
+        scores = report_scores(record["report"], record.get("template") or template.id, labels)
+        resolved.append(
+            {"name": member.get("name") or record.get("person_name") or record["user_id"], "scores": scores, "labels": labels}
+        )
+    if missing:
+        raise CohortError(f"Reports not found: {', '.join(missing)}")
+    if not resolved:
+        raise CohortError("A cohort needs at least one member")
+    return resolved
+
+
+def _chart_of(column, charts):
+    path = column.split("/", 1)[0]
+    return next((chart for chart in charts if chart.path == path), None)
+
+
+def _default_label(column, charts):
+    # Score vectors carry no labels: "path/analytical thinking" -> "Analytical Thinking"
+    if "/" in column:
+        return column.split("/", 1)[1].title()
+    chart = _chart_of(column, charts)
+    return chart.args.get("title", chart.name)
+
+
+def score_matrix(members, template_id=None):
+    """
+    (columns, labels, kinds, matrix): the template's score columns present in
+    any member, their display labels and chart kinds, and a float32
+    members x columns matrix with NaN where a member has no score.
+    """
+    charts = get_template(template_id).charts
+    columns, labels = [], {}
+    for member in members:
+        for column in member["scores"]:
+            if column not in labels and _chart_of(column, charts) is not None:
+                columns.append(column)
+                labels[column] = None
+            if labels.get(column) is None and column in member["labels"]:
+                labels[column] = member["labels"][column]
+    # Template order, then first appearance
+    order = {chart.path: i for i, chart in enumerate(charts)}
+    columns.sort(key=lambda column: order[column.split("/", 1)[0]])
+    kinds = [_chart_of(column, charts).kind for column in columns]
+    labels = [labels[column] or _default_label(column, charts) for column in columns]
+    index = {column: i for i, column in enumerate(columns)}
+    matrix = np.full((len(members), len(columns)), np.nan, dtype=np.float32)
+    for row, member in enumerate(members):
+        for column, value in member["scores"].items():
+            if column in index:
+                matrix[row, index[column]] = value
+    return columns, labels, kinds, matrix
+
+
+def aggregate(matrix):
+    """Per-column count, mean, std and PERCENTILES of a members x columns matrix (NaN ignored)."""
+    present = ~np.isnan(matrix)
+    count = present.sum(axis=0)
+    total = np.where(present, matrix, 0).sum(axis=0, dtype=np.float64)
+    mean = np.divide(total, count, out=np.full(len(count), np.nan), where=count > 0)
+    squares = np.where(present, (matrix - mean) ** 2, 0).sum(axis=0, dtype=np.float64)
+    std = np.sqrt(np.divide(squares, count - 1, out=np.zeros(len(count)), where=count > 1))
+    stats = {"count": count, "mean": mean, "std": std}
+    if matrix.size:
+        for p, values in zip(PERCENTILES, np.nanpercentile(matrix, PERCENTILES, axis=0)):
+            stats[f"p{p}"] = values
+    return stats
+
+
+# ---------------------------
+# Cohort charts (drawn through pdf_service.render_chart_sprite)
+# ---------------------------
+def _draw_cohort_radar(fig, cell, value, theme):
+    labels, matrix, stats = value["labels"], value["matrix"], value["stats"]
+    N = len(labels)
+    angles = np.linspace(0, 2 * np.pi, N, endpoint=False)
+    closed = np.append(angles, angles[0])
+
+    ax = fig.add_subplot(cell, polar=True, facecolor="none")
+    ax.set_theta_offset(np.pi / 2)
+    ax.set_theta_direction(-1)
+
+    # Every member's outline as one collection
+    rows = np.concatenate([matrix, matrix[:, :1]], axis=1)
+    segments = np.stack([np.broadcast_to(closed, rows.shape), rows], axis=-1)
+    ax.add_collection(
+        LineCollection(
+            segments,
+            colors=theme["secondary"],
+            linewidths=0.8,
+            alpha=max(0.05, min(0.5, 8 / len(matrix))),
+        )
+    )
+    p25, p75 = np.append(stats["p25"], stats["p25"][0]), np.append(stats["p75"], stats["p75"][0])
+    ax.fill(
+        np.concatenate([closed, closed[::-1]]),
+        np.concatenate([p75, p25[::-1]]),
+        facecolor=theme["accent"],
+        alpha=0.8,
+        label="Middle 50%",
+    )
+    ax.plot(closed, np.append(stats["mean"], stats["mean"][0]), linewidth=2.5, color=theme["primary"], label="Cohort mean")
+
+    ax.set_thetagrids(np.degrees(angles), labels, fontsize=9, color=theme["title"])
+    ax.tick_params(axis="y", colors=theme["subtle_text"])
+    ax.set_ylim(0, 100)
+    ax.set_yticks([25, 50, 75, 100])
+    ax.set_rlabel_position(180 / max(1, N))
+    ax.grid(color=theme["grid_lines"], linestyle="-", linewidth=0.7)
+    ax.spines["polar"].set_visible(False)
+    ax.legend(loc="upper center", bbox_to_anchor=(0.5, -0.06), ncol=2, frameon=False, fontsize=9)
+
+
+def _draw_cohort_box(fig, cell, value, theme, title="Score Distribution"):
+    labels, stats = value["labels"], value["stats"]
+    ax = fig.add_subplot(cell, facecolor="none")
+    boxes = [
+        {
+            "label": label,
+            "whislo": stats["p10"][i],
+            "q1": stats["p25"][i],
+            "med": stats["p50"][i],
+            "q3": stats["p75"][i],
+            "whishi": stats["p90"][i],
+            "mean": stats["mean"][i],
+            "fliers": [],
+        }
+        for i, label in enumerate(labels)
+    ]
+    ax.bxp(
+        boxes[::-1],
+        vert=False,
+        showmeans=True,
+        patch_artist=True,
+        boxprops={"facecolor": theme["accent"], "edgecolor": theme["primary"]},
+        medianprops={"color": theme["primary"], "linewidth": 2},
+        whiskerprops={"color": theme["primary"]},
+        capprops={"color": theme["primary"]},
+        meanprops={"marker": "D", "markerfacecolor": theme["contrast"], "markeredgecolor": theme["contrast"], "markersize": 5},
+    )
+    ax.set_xlim(0, 100)
+    ax.set_xlabel("Score", fontsize=10, color=theme["title"])
+    ax.set_title(title, fontsize=12, fontweight="bold", color=theme["title"])
+    ax.tick_params(axis="y", labelsize=9, colors=theme["title"])
+    ax.grid(axis="x", linestyle="--", alpha=0.6, color=theme["grid_lines"])
+    for spine in ("top", "right"):
+        ax.spines[spine].set_visible(False)
+
+
+def _draw_cohort_heatmap(fig, cell, value, theme, title="Member Scores"):
+    labels, names, matrix = value["labels"], value["names"], value["matrix"]
+    ax = fig.add_subplot(cell, facecolor="none")
+    cmap = LinearSegmentedColormap.from_list("cohort", [theme["white"], theme["secondary"], theme["primary"]])
+    cmap.set_bad(theme["gauge_background"])
+    image = ax.imshow(
+        np.ma.masked_invalid(matrix), cmap=cmap, vmin=0, vmax=100, aspect="auto", interpolation="nearest"
+    )
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=90, fontsize=8, color=theme["title"])
+    if len(names) <= HEATMAP_NAMED_MEMBERS:
+        ax.set_yticks(range(len(names)))
+        ax.set_yticklabels(names, fontsize=8, color=theme["title"])
+    else:
+        ax.set_ylabel(f"{len(names)} members", fontsize=10, color=theme["title"])
+        ax.set_yticks([])
+    ax.set_title(title, fontsize=12, fontweight="bold", color=theme["title"])
+    colorbar = fig.colorbar(image, cax=ax.inset_axes([1.02, 0, 0.03, 1]))
+    colorbar.ax.tick_params(labelsize=8, colors=theme["subtle_text"])
+
+
+def _label_inches(labels):
+    # About 0.07in per character, as pdf_service._label_margin
+    return 0.3 + 0.07 * max((len(label) for label in labels), default=0)
+
+
+def _cohort_drawers(labels, box_labels, names):
+    box_height = max(2.5, 0.4 * len(box_labels) + 1.2)
+    named = len(names) <= HEATMAP_NAMED_MEMBERS
+    return {
+        "cohort_radar": (_draw_cohort_radar, (6, 6.4), (0.6, 0.6, 0.8, 0.4)),
+        "cohort_box": (_draw_cohort_box, (7, box_height), (_label_inches(box_labels), 0.3, 0.6, 0.42)),
+        "cohort_heatmap": (
+            _draw_cohort_heatmap,
+            (7, 7),
+            (_label_inches(names) if named else 0.5, 0.8, _label_inches(labels), 0.42),
+        ),
+    }
+
+
+# ---------------------------
+# Cohort PDF
+# ---------------------------
+COHORT_CHARTS = {
+    "cohort_radar": (
+        "Cohort Profile: Overlaid Radar",
+        "Every member's core traits drawn on one radar, with the cohort mean and the range "
+        "covering the middle half of the group.",
+        [
+            ("Thin lines", "One line per member."),
+            ("Bold line", "The cohort mean for each trait."),
+            ("Shaded band", "Between the 25th and 75th percentile: where the middle half of the cohort scores."),
+        ],
+    ),
+    "cohort_box": (
+        "Score Distribution Across the Cohort",
+        "How spread out the group is on each skill and comparison trait.",
+        [
+            ("Box", "The middle half of the cohort (25th to 75th percentile)."),
+            ("Line in the box", "The median member."),
+            ("Whiskers", "The 10th and 90th percentile."),
+            ("Diamond", "The cohort mean."),
+        ],
+    ),
+    "cohort_heatmap": (
+        "Member Score Heatmap",
+        "Each row is a member and each column a trait; darker cells are higher scores.",
+        [
+            ("Rows", "Members, in the order they were given."),
+            ("Columns", "Traits from the radar, skill and comparison charts."),
+            ("Colour", "Score from 0 (light) to 100 (dark); grey where a member has no score."),
+        ],
+    ),
+}
+
+
+def _fmt(value):
+    return "-" if np.isnan(value) else f"{value:.1f}"
+
+
+def _cohort_cover(cohort_name, member_count, ctx, styles):
+    brand = ctx["brand"]
+    return [
+        Spacer(1, 6 * cm),
+        RLImage(io.BytesIO(brand.logo), width=4.5 * cm, height=4.5 * cm, hAlign="CENTER"),
+        Spacer(1, 0.8 * cm),
+        Paragraph(f"<b>{cohort_name}</b>", styles["ReportTitle"]),
+        Spacer(1, 0.5 * cm),
+        Paragraph(f"Team Profile Report — {member_count} members", styles["ReportSubtitle"]),
+        Spacer(1, 1 * cm),
+        Paragraph(f"{brand.company_name} Inc.", styles["CenteredBody"]),
+        Paragraph(f"{brand.company_mail} | {brand.company_site}", styles["CenteredBody"]),
+        Spacer(1, 2 * cm),
+        Paragraph(f"Generated by {ctx['generated_by']}.", styles["CenteredBody"]),
+        Paragraph("(Confidential — For recipient only.)", styles["CenteredBody"]),
+        PageBreak(),
+    ]
+
+
+def _table(rows, brand, col_widths):
+    table = Table(rows, colWidths=col_widths, repeatRows=1, hAlign="LEFT")
+    table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), brand.palette["accent"]),
+                ("TEXTCOLOR", (0, 0), (-1, 0), brand.palette["primary"]),
+                ("FONTNAME", (0, 0), (-1, 0), brand.fonts.bold),
+                ("FONTNAME", (0, 1), (-1, -1), brand.fonts.regular),
+                ("FONTSIZE", (0, 0), (-1, -1), 9),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [brand.palette["accent"], brand.palette["white"]]),
+                ("GRID", (0, 0), (-1, -1), 0.4, brand.palette["secondary"]),
+            ]
+        )
+    )
+    return table
+
+
+def _summary_story(labels, kinds, stats, styles, brand):
+    rows = [["Trait", "Chart", "n", "Mean", "SD", "P25", "Median", "P75"]]
+    for i, label in enumerate(labels):
+        rows.append(
+            [
+                Paragraph(label, brand.styles["TableCell"]),
+                kinds[i].replace("_", " "),
+                int(stats["count"][i]),
+                _fmt(stats["mean"][i]),
+                _fmt(stats["std"][i]),
+                _fmt(stats["p25"][i]),
+                _fmt(stats["p50"][i]),
+                _fmt(stats["p75"][i]),
+            ]
+        )
+    return [
+        Paragraph("Cohort Summary", styles["SectionHeader"]),
+        Paragraph(
+            "Aggregate scores for every trait in the members' reports. n is the number of "
+            "members with a score for the trait; percentiles are over those members.",
+            styles["Body"],
+        ),
+        Spacer(1, 0.4 * cm),
+        _table(rows, brand, [150, 70, 30, 40, 35, 40, 45, 40]),
+        PageBreak(),
+    ]
+
+
+def _members_story(members, matrix, styles, brand):
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=1)
+    means = np.divide(
+        np.where(present, matrix, 0).sum(axis=1), counts, out=np.full(len(counts), np.nan), where=counts > 0
+    )
+    rows = [["#", "Member", "Scores", "Average"]]
+    rows += [
+        [i + 1, Paragraph(str(member["name"]), brand.styles["TableCell"]), int(counts[i]), _fmt(means[i])]
+        for i, member in enumerate(members)
+    ]
+    return [
+        Paragraph("Members", styles["SectionHeader"]),
+        Spacer(1, 0.3 * cm),
+        _table(rows, brand, [30, 280, 60, 60]),
+    ]
+
+
+def _cohort_charts(members, labels, kinds, matrix, stats, theme):
+    """{chart key: (chart data dict, PNG buffer, w_cm, h_cm)} for the cohort charts with data."""
+    names = [str(member["name"]) for member in members]
+
+    def select(kind_set):
+        return [i for i, kind in enumerate(kinds) if kind in kind_set]
+
+    def sub(columns):
+        return {key: values[columns] for key, values in stats.items()}
+
+    radar, box, heat = select(("radar",)), select(("horizontal_bar", "vertical_bar", "comparison_bar")), select(SCORE_KINDS)
+    charts = []
+    if len(radar) >= 3:
+        charts.append(
+            ("cohort_radar", {"labels": [labels[i] for i in radar], "matrix": matrix[:, radar], "stats": sub(radar)},
+             [{"field": labels[i], "value": _fmt(stats["mean"][i])} for i in radar], 14)
+        )
+    if box:
+        charts.append(
+            ("cohort_box", {"labels": [labels[i] for i in box], "stats": sub(box)},
+             [{"field": labels[i], "value": f"{_fmt(stats['p50'][i])} ({_fmt(stats['p25'][i])}-{_fmt(stats['p75'][i])})"} for i in box], 16)
+        )
+    if heat:
+        charts.append(
+            ("cohort_heatmap", {"labels": [labels[i] for i in heat], "names": names, "matrix": matrix[:, heat]},
+             [{"field": "Members", "value": len(names)}, {"field": "Traits", "value": len(heat)},
+              {"field": "Missing scores", "value": int(np.isnan(matrix[:, heat]).sum())}], 16)
+        )
+    drawers = _cohort_drawers(
+        [labels[i] for i in heat], [labels[i] for i in box], names
+    )
+    buffers = pdf_service.render_chart_sprite(
+        [(key, value, {}, w) for key, value, _, w in charts], theme, drawers=drawers
+    )
+    result = {}
+    for (key, _, rows, w), buffer in zip(charts, buffers):
+        if buffer is None:
+            continue
+        fig_w, fig_h = drawers[key][1]
+        result[key] = ({"explanation": COHORT_CHARTS[key][1], "data": rows}, buffer, w, w * fig_h / fig_w)
+    return result
+
+
+def generate_cohort_pdf(members, cohort_name, generated_by=None, template_id=None, tenant_id=None):
+    """
+    Render a cohort report for resolved members (see resolve_members) and
+    return the PDF bytes. Runs in the render pool: members are plain dicts.
+    """
+    brand = pdf_service.brand_kit(tenant_id)
+    styles = brand.styles
+    ctx = pdf_service._report_context(cohort_name, generated_by, brand)
+    ctx["REPORT_TITLE"] = f"{cohort_name} Team Report"
+
+    _, labels, kinds, matrix = score_matrix(members, template_id)
+    stats = aggregate(matrix)
+    charts = _cohort_charts(members, labels, kinds, matrix, stats, brand.chart_theme) if labels else {}
+
+    story = _cohort_cover(cohort_name, len(members), ctx, styles)
+    if labels:
+        story += _summary_story(labels, kinds, stats, styles, brand)
+    for key, (chart_data, buffer, w, h) in charts.items():
+        title, _, guide = COHORT_CHARTS[key]
+        story.append(
+            pdf_service.build_chart_story(title, chart_data, buffer, w, h, [list(row) for row in guide], styles, brand)
+        )
+        story.append(PageBreak())
+    story += _members_story(members, matrix, styles, brand)
+
+    buffer = io.BytesIO()
+    pdf_service._build_doc(pdf_service._make_doc(buffer, ctx), story, ctx)
+    return buffer.getvalue()
@@ -0,0 +1,95 @@
+"""
+Bounded, content-addressed store for rendered report PDFs.
+
+Files live at CONTENT_STORE_DIR/<sha[:2]>/<sha>.pdf, keyed by the sha256 of
+their bytes, which doubles as a strong ETag. Every file is tracked by the
+janitor: it expires CONTENT_STORE_TTL_SECONDS after it was last written or
+served (by any worker: both touch the file's mtime), and the whole store is
+capped at CONTENT_STORE_MAX_BYTES.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from app.core.config import settings
+from app.services.cleanup_service import janitor
+from app.utils import metrics
+
+JANITOR_GROUP = "content"
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def _path(digest):
+    return os.path.join(settings.CONTENT_STORE_DIR, digest[:2], f"{digest}.pdf")
+
+
+def put_bytes(data):
+    """Store `data` (no-op if already present) and return its sha256 hex digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _path(digest)
+    try:
+        os.utime(path)  # already stored: a fresh lease in every worker's janitor
+    except FileNotFoundError:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    janitor.schedule(path, settings.CONTENT_STORE_TTL_SECONDS, group=JANITOR_GROUP)
+    return digest
+
+
+def get_path(digest, touch=True):
+    """Local path for a digest, or None. Serving a file pushes its expiry back."""
+    if not _SHA256.fullmatch(digest or ""):
+        return None
+    path = _path(digest)
+    try:
+        if touch:
+            # The mtime is the lease every worker's janitor checks before deleting
+            os.utime(path)
+        elif not os.path.exists(path):
+            raise FileNotFoundError(path)
+    except FileNotFoundError:
+        metrics.count_cache("content_store", False)
+        return None
+    metrics.count_cache("content_store", True)
+    if touch:
+        janitor.schedule(path, settings.CONTENT_STORE_TTL_SECONDS, group=JANITOR_GROUP)
+    return path
+
+
+def exists(digest):
+    return get_path(digest, touch=False) is not None
+
+
+def remove(digest):
+    """Delete a stored PDF (e.g. one replaced by a re-render). Returns True if it existed."""
+    if not _SHA256.fullmatch(digest or ""):
+        return False
+    path = _path(digest)
+    janitor.cancel(path)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def sweep():
+    """Re-register files from a previous run with the janitor (call once at startup)."""
+    janitor.sweep(
+        settings.CONTENT_STORE_DIR,
+        max_age=settings.CONTENT_STORE_TTL_SECONDS,
+        max_bytes=settings.CONTENT_STORE_MAX_BYTES,
+        group=JANITOR_GROUP,
+        recursive=True,
+    )
@@ -0,0 +1,66 @@
+"""
+Request de-duplication for report generation.
+
+A request is identified by the client's Idempotency-Key header when present,
+otherwise by a hash of its IntakeParameters and questions. While one request
+for a key is running, duplicates in the same worker await its result instead
+of repeating the LLM call, render and upload. Completed requests are found
+again through the report store's key index (see report_store).
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import threading
+
+from app.utils import metrics
+
+# Futures are concurrent.futures ones so waiters on any event loop can share them.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+@metrics.collector
+def _inflight_entries():
+    metrics.CACHE_ENTRIES.set(len(_inflight), cache="inflight_requests")
+
+
+def request_key(params, questionList, idempotency_key=None):
+    """Stable key for a report request."""
+    if idempotency_key:
+        material = f"idempotency-key:{idempotency_key.strip()}"
+    else:
+        material = json.dumps(
+            {"params": params.model_dump(), "questions": questionList.model_dump()},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+async def run_once(key, factory):
+    """
+    Run `factory()` (a coroutine function) once per key at a time.
+
+    Concurrent callers with the same key share the first caller's result or
+    exception.
+    """
+    with _inflight_lock:
+        pending = _inflight.get(key)
+        if pending is None:
+            future = _inflight[key] = concurrent.futures.Future()
+    metrics.count_cache("inflight_requests", pending is not None)
+    if pending is not None:
+        return await asyncio.shield(asyncio.wrap_future(pending))
+
+    try:
+        result = await factory()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
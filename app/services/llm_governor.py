@@ -0,0 +1,61 @@
+"""
+Rate governor for LLM calls.
+
+Every call to the model goes through `governor.slot()`, which bounds the
+calls in flight (LLM_MAX_CONCURRENCY) and spaces their starts so this
+process stays under LLM_REQUESTS_PER_MINUTE (0 = no pacing). Calls run in
+worker threads (asyncio.to_thread), so the governor is thread-based and
+shared by the API and the bulk CLI alike. Limits are per process: with
+several web workers, divide the provider's quota between them.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.config import settings
+from app.utils import metrics
+from app.utils.timing import stage
+
+
+class RateGovernor:
+    def __init__(self, max_concurrency, requests_per_minute=0):
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self._stats = {"calls": 0, "waited_seconds": 0.0, "in_flight": 0}
+
+    @contextmanager
+    def slot(self):
+        """Hold one LLM call slot; blocks until both a slot and the pacing allow a start."""
+        started = time.monotonic()
+        with stage("llm_wait"):
+            self._slots.acquire()
+        try:
+            if self._interval:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start)
+                    self._next_start = start + self._interval
+                if start > now:
+                    with stage("llm_wait"):
+                        time.sleep(start - now)
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["waited_seconds"] += time.monotonic() - started
+                self._stats["in_flight"] += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._stats["in_flight"] -= 1
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, waited_seconds=round(self._stats["waited_seconds"], 3))
+
+
+governor = RateGovernor(settings.LLM_MAX_CONCURRENCY, settings.LLM_REQUESTS_PER_MINUTE)
+metrics.mirror_stats("llm", governor.stats, totals=("calls", "waited_seconds"), gauges=("in_flight",))
@@ -0,0 +1,121 @@
+"""
+Page-parallel report rendering.
+
+The report is split into its segments (cover + TOC, static pages, breakdown,
+one per chart, closing - see pdf_service.report_segments). Each segment is
+rendered as a small PDF in the render pool, concurrently, and the pieces are
+merged in order with pypdf.
+
+Footer page numbers depend on how many pages come before a segment, so every
+segment is rendered with an offset taken from the page counts seen for that
+segment last time. When a segment turns out longer or shorter than expected
+(e.g. a long personality breakdown), only the segments after it are rendered
+again with the corrected offset.
+
+Enabled with PDF_PARALLEL_SEGMENTS, and only when the render pool is on and
+pypdf is installed; otherwise reports are rendered in one piece as before.
+"""
+import asyncio
+import io
+import threading
+
+from app.core.config import settings
+from app.services import pdf_service, render_pool
+from app.services.report_templates import get_template
+from app.utils import metrics
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional dependency
+    PdfReader = PdfWriter = None
+
+# Page counts observed per (template, tenant, segment), used as the next render's estimate.
+_DEFAULT_PAGES = {"cover": 2, "static": 2, "breakdown": 3, "chart": 1, "closing": 2}
+_expected_pages = {}
+_expected_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"reports": 0, "segments": 0, "rerendered_segments": 0}
+
+
+def enabled():
+    return settings.PDF_PARALLEL_SEGMENTS and render_pool.enabled() and PdfWriter is not None
+
+
+def _expected(key, segment):
+    with _expected_lock:
+        return _expected_pages.get(key + (segment,), _DEFAULT_PAGES[segment[0]])
+
+
+def _offsets(page_counts):
+    offsets, total = [], 0
+    for count in page_counts:
+        offsets.append(total)
+        total += count
+    return offsets
+
+
+def merge_segments(parts, title):
+    """Concatenate segment PDFs (bytes, in order) into one document and return its bytes."""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)))
+    writer.add_metadata({"/Title": title})
+    # Segments embed their own copies of fonts and the logo
+    writer.compress_identical_objects()
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+async def render_report(data, person_name, generated_by, template_id=None, tenant_id=None):
+    """Render the report segment by segment in the render pool; returns the merged PDF bytes."""
+    template_id = get_template(template_id).id
+    brand = pdf_service.brand_kit(tenant_id)
+    key = (template_id, brand.id)
+    segments = pdf_service.report_segments(data, template_id)
+
+    async def render(segment, page_offset):
+        return await render_pool.run(
+            pdf_service.render_segment,
+            segment,
+            data,
+            person_name,
+            generated_by,
+            page_offset,
+            template_id,
+            brand.id,
+        )
+
+    offsets = _offsets([_expected(key, segment) for segment in segments])
+    results = await asyncio.gather(*(render(s, o) for s, o in zip(segments, offsets)))
+
+    actual = _offsets([count for _, count in results])
+    stale = [i for i, (expected, real) in enumerate(zip(offsets, actual)) if expected != real]
+    if stale:
+        # A segment's page count does not depend on its offset, so one pass is enough
+        rerendered = await asyncio.gather(*(render(segments[i], actual[i]) for i in stale))
+        for i, result in zip(stale, rerendered):
+            results[i] = result
+
+    with _expected_lock:
+        for segment, (_, count) in zip(segments, results):
+            _expected_pages[key + (segment,)] = count
+    with _stats_lock:
+        _stats["reports"] += 1
+        _stats["segments"] += len(segments)
+        _stats["rerendered_segments"] += len(stale)
+
+    ctx = pdf_service._report_context(person_name, generated_by, brand)
+    parts = [pdf for pdf, _ in results if pdf]
+    return await asyncio.to_thread(
+        merge_segments, parts, f"{ctx['person_name']} - {ctx['REPORT_TITLE']}"
+    )
+
+
+def parallel_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+metrics.mirror_stats("parallel", parallel_stats, totals=("reports", "segments", "rerendered_segments"))
@@ -7,8 +7,11 @@ Option A behaviour: missing charts/sections are SKIPPED entirely.
 
 import os
 from datetime import datetime
+import functools
+import hashlib
 import io
 import json
+import time
 
 import numpy as np
 from PIL import Image, ImageDraw
@@ -29,8 +32,23 @@ from reportlab.platypus import (
     TableStyle,
     PageBreak,
     KeepTogether,
+    Flowable,
 )
 from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from app.core.config import settings
+from app.services import benchmarks
+from app.services.branding import TenantFonts, get_tenant
+from app.services.report_templates import (
+    CHART_KINDS,
+    get_template,
+    is_nonempty_list,
+    is_valid_number,
+)
+from app.utils import metrics
+from app.utils.timing import stage
 
 # ---------------------------
 # Styling / constants
@@ -62,48 +80,25 @@ CHART_COLORS = [
     "#14B8A6",
 ]
 
-
-PAGE_WIDTH, PAGE_HEIGHT = A4
-
-
-# ---------------------------
-# Safe helpers
-# ---------------------------
-def safe_get(obj, path, default=None):
-    """Safely retrieve nested keys like safe_get(data, 'sections.charts.radarChart.data')"""
-    if obj is None:
-        return default
-    if isinstance(path, str) and path == "":
-        return obj
-    keys = path.split(".")
-    cur = obj
-    for key in keys:
-        if isinstance(cur, dict) and key in cur:
-            cur = cur[key]
-        else:
-            return default
-    return cur
+# Colours the chart creators draw with: COLORS plus the "series" colours.
+# Tenants get their own theme through their brand kit.
+CHART_THEME = dict(COLORS, series=CHART_COLORS)
 
 
-def is_nonempty_list(x):
-    return isinstance(x, list) and len(x) > 0
+# reportlab colours of the default theme, parsed once (tenants: BrandKit.palette)
+PALETTE = {name: colors.HexColor(value) for name, value in COLORS.items()}
 
+PAGE_WIDTH, PAGE_HEIGHT = A4
 
-def is_valid_number(x):
-    try:
-        if x is None:
-            return False
-        float(x)
-        return True
-    except Exception:
-        return False
+# Bump whenever the rendered layout changes, so stored reports can be re-rendered.
+TEMPLATE_VERSION = "3"
 
 
 # ---------------------------
 # Placeholder logo generator
 # ---------------------------
 def make_placeholder_logo(
-    size=(240, 240), bg=COLORS["primary"], circle=COLORS["accent"]
+    size=(240, 240), bg=COLORS["primary"], circle=COLORS["accent"], outline=COLORS["secondary"]
 ):
     img = Image.new("RGBA", size, bg)
     draw = ImageDraw.Draw(img)
@@ -115,7 +110,7 @@ def make_placeholder_logo(
         x = cx + r_outer * np.cos(angle)
         y = cy - r_outer * np.sin(angle)
         points.append((x, y))
-    draw.polygon(points, fill=bg, outline=COLORS["secondary"])
+    draw.polygon(points, fill=bg, outline=outline)
     r_inner = int(r_outer * 0.6)
     draw.ellipse([cx - r_inner, cy - r_inner, cx + r_inner, cy + r_inner], fill=circle)
     draw.ellipse([cx - 12, cy - 12, cx + 12, cy + 12], fill=bg)
@@ -128,23 +123,63 @@ def make_placeholder_logo(
 # ---------------------------
 # Chart creators (called only when data present)
 # ---------------------------
-def create_radar_chart(radar_entries):
-    if not is_nonempty_list(radar_entries):
-        raise ValueError("Radar entries must be a non-empty list")
-    labels = [
-        str(e.get("field", "")) for e in radar_entries if "field" in e and "value" in e
-    ]
-    values = [float(e["value"]) for e in radar_entries if "field" in e and "value" in e]
+def _compact_png(image):
+    """Compact-mode PNG of an RGB(A) image: flattened onto white and palette-quantized."""
+    if image.mode == "RGBA":
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image)
+    image = image.convert("RGB").quantize(
+        colors=settings.PDF_COMPACT_COLORS, dither=Image.Dither.NONE
+    )
+    buffer = io.BytesIO()
+    image.save(buffer, format="png")
+    buffer.seek(0)
+    return buffer
+
+
+def _figure_png(fig, placed_width_cm=None):
+    """
+    PNG of a finished chart figure (closes the figure).
+    Standard mode: 200 dpi RGBA. Compact mode (PDF_OUTPUT_MODE): rendered at
+    PDF_COMPACT_DPI for the width the chart is placed at, flattened onto white
+    (no alpha mask in the PDF) and palette-quantized, which compresses far better.
+    """
+    buffer = io.BytesIO()
+    if settings.PDF_OUTPUT_MODE == "compact" and placed_width_cm:
+        dpi = settings.PDF_COMPACT_DPI * (placed_width_cm / 2.54) / fig.get_figwidth()
+        # Opaque white background, so semi-transparent fills are blended, not dropped
+        fig.patch.set_facecolor("white")
+        fig.patch.set_alpha(1.0)
+        fig.savefig(buffer, format="png", dpi=dpi)
+        plt.close(fig)
+        buffer.seek(0)
+        return _compact_png(Image.open(buffer))
+    fig.savefig(buffer, format="png", transparent=True)
+    plt.close(fig)
+    buffer.seek(0)
+    return buffer
+
+
+def _entries(entries, what):
+    if not is_nonempty_list(entries):
+        raise ValueError(f"{what} entries must be a non-empty list")
+    labels = [str(e.get("field", "")) for e in entries if "field" in e and "value" in e]
+    values = [float(e["value"]) for e in entries if "field" in e and "value" in e]
     if len(labels) == 0:
-        raise ValueError("Radar entries contain no valid items")
+        raise ValueError(f"{what} entries contain no valid items")
+    return labels, values
+
+
+# Each chart is drawn into a region (SubplotSpec) of a figure: its own figure
+# (create_*_chart) or its cell of a chart sprite (render_chart_sprite).
+def _draw_radar_chart(fig, cell, radar_entries, theme):
+    labels, values = _entries(radar_entries, "Radar")
     N = len(labels)
     angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
     values_closed = values + values[:1]
     angles_closed = angles + angles[:1]
 
-    plt.style.use("default")
-    fig = plt.figure(figsize=(6, 6), dpi=200, facecolor="none")
-    ax = fig.add_subplot(111, polar=True, facecolor="none")
+    ax = fig.add_subplot(cell, polar=True, facecolor="none")
     ax.set_theta_offset(np.pi / 2)
     ax.set_theta_direction(-1)
 
@@ -153,58 +188,41 @@ def create_radar_chart(radar_entries):
         values_closed,
         linewidth=2.5,
         linestyle="solid",
-        color=COLORS["primary"],
+        color=theme["primary"],
     )
     ax.fill(
         angles_closed,
         values_closed,
         alpha=0.55,
-        facecolor=COLORS["secondary"],
-        edgecolor=COLORS["primary"],
+        facecolor=theme["secondary"],
+        edgecolor=theme["primary"],
         linewidth=1,
     )
 
-    ax.set_thetagrids(np.degrees(angles), labels, fontsize=9, color=COLORS["title"])
-    ax.tick_params(axis="y", colors=COLORS["subtle_text"])
+    ax.set_thetagrids(np.degrees(angles), labels, fontsize=9, color=theme["title"])
+    ax.tick_params(axis="y", colors=theme["subtle_text"])
     ax.set_ylim(0, 100)
     ax.set_yticks([25, 50, 75, 100])
     ax.set_rlabel_position(180 / max(1, N))
-    ax.grid(color=COLORS["grid_lines"], linestyle="-", linewidth=0.7)
+    ax.grid(color=theme["grid_lines"], linestyle="-", linewidth=0.7)
     ax.spines["polar"].set_visible(False)
 
-    fig.patch.set_alpha(0.0)
-    plt.tight_layout()
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", transparent=True)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
-
-
-def create_horizontal_bar_chart(bar_entries, title="Score Summary"):
-    if not is_nonempty_list(bar_entries):
-        raise ValueError("Bar entries must be a non-empty list")
-    labels = [
-        str(e.get("field", "")) for e in bar_entries if "field" in e and "value" in e
-    ]
-    values = [float(e["value"]) for e in bar_entries if "field" in e and "value" in e]
-    if len(labels) == 0:
-        raise ValueError("Bar entries contain no valid items")
 
+def _draw_horizontal_bar_chart(fig, cell, bar_entries, theme, title="Score Summary"):
+    labels, values = _entries(bar_entries, "Bar")
     N = len(labels)
-    bar_colors = [CHART_COLORS[i % len(CHART_COLORS)] for i in range(N)]
-    plt.style.use("default")
-    fig, ax = plt.subplots(figsize=(7, 3.5), dpi=200, facecolor="none")
+    bar_colors = [theme["series"][i % len(theme["series"])] for i in range(N)]
+    ax = fig.add_subplot(cell)
     y_pos = np.arange(N)
     bars = ax.barh(y_pos, values, align="center", color=bar_colors, linewidth=0)
     ax.set_yticks(y_pos)
-    ax.set_yticklabels(labels, fontsize=9, color=COLORS["title"])
+    ax.set_yticklabels(labels, fontsize=9, color=theme["title"])
     ax.invert_yaxis()
     ax.set_xlim(0, 100)
-    ax.set_xlabel("Profile Score (0-100)", color=COLORS["primary"], fontsize=10)
-    ax.tick_params(axis="x", colors=COLORS["subtle_text"])
+    ax.set_xlabel("Profile Score (0-100)", color=theme["primary"], fontsize=10)
+    ax.tick_params(axis="x", colors=theme["subtle_text"])
     ax.grid(axis="x", linestyle="--", linewidth=0.5, color="#DDDDDD")
-    ax.set_title(title, fontsize=12, color=COLORS["primary"], fontweight="bold", pad=10)
+    ax.set_title(title, fontsize=12, color=theme["primary"], fontweight="bold", pad=10)
     for i, b in enumerate(bars):
         ax.text(
             b.get_width() + 1,
@@ -212,44 +230,29 @@ def create_horizontal_bar_chart(bar_entries, title="Score Summary"):
             f"{int(values[i])}",
             va="center",
             fontsize=9,
-            color=COLORS["primary"],
+            color=theme["primary"],
             fontweight="bold",
         )
     ax.spines["right"].set_visible(False)
     ax.spines["top"].set_visible(False)
     ax.spines["left"].set_linewidth(0.5)
     ax.spines["bottom"].set_linewidth(0.5)
-    fig.patch.set_alpha(0.0)
-    plt.tight_layout()
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", transparent=True)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
 
 
-def create_vertical_bar_chart(bar_entries, title="Score Summary"):
-    if not is_nonempty_list(bar_entries):
-        raise ValueError("Vertical bar entries must be a non-empty list")
-    labels = [
-        str(e.get("field", "")) for e in bar_entries if "field" in e and "value" in e
-    ]
-    values = [float(e["value"]) for e in bar_entries if "field" in e and "value" in e]
-    if len(labels) == 0:
-        raise ValueError("Vertical bar entries contain no valid items")
+def _draw_vertical_bar_chart(fig, cell, bar_entries, theme, title="Score Summary"):
+    labels, values = _entries(bar_entries, "Vertical bar")
     N = len(labels)
-    bar_colors = [CHART_COLORS[i % len(CHART_COLORS)] for i in range(N)]
-    plt.style.use("default")
-    fig, ax = plt.subplots(figsize=(7, 3.5), dpi=200, facecolor="none")
+    bar_colors = [theme["series"][i % len(theme["series"])] for i in range(N)]
+    ax = fig.add_subplot(cell)
     x_pos = np.arange(N)
     bars = ax.bar(x_pos, values, align="center", color=bar_colors, linewidth=0)
     ax.set_xticks(x_pos)
-    ax.set_xticklabels(labels, fontsize=9, color=COLORS["title"])
+    ax.set_xticklabels(labels, fontsize=9, color=theme["title"])
     ax.set_ylim(0, 100)
-    ax.set_ylabel("Profile Score (0-100)", color=COLORS["primary"], fontsize=10)
-    ax.tick_params(axis="y", colors=COLORS["subtle_text"])
+    ax.set_ylabel("Profile Score (0-100)", color=theme["primary"], fontsize=10)
+    ax.tick_params(axis="y", colors=theme["subtle_text"])
     ax.grid(axis="y", linestyle="--", linewidth=0.5, color="#DDDDDD")
-    ax.set_title(title, fontsize=12, color=COLORS["primary"], fontweight="bold", pad=10)
+    ax.set_title(title, fontsize=12, color=theme["primary"], fontweight="bold", pad=10)
     for i, b in enumerate(bars):
         ax.text(
             b.get_x() + b.get_width() / 2,
@@ -257,41 +260,28 @@ def create_vertical_bar_chart(bar_entries, title="Score Summary"):
             f"{int(values[i])}",
             ha="center",
             fontsize=9,
-            color=COLORS["primary"],
+            color=theme["primary"],
             fontweight="bold",
         )
     ax.spines["right"].set_visible(False)
     ax.spines["top"].set_visible(False)
     ax.spines["left"].set_linewidth(0.5)
     ax.spines["bottom"].set_linewidth(0.5)
-    fig.patch.set_alpha(0.0)
-    plt.tight_layout()
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", transparent=True)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
 
 
-def create_comparison_bar_chart(entries, title="Trait Comparison"):
-    if not is_nonempty_list(entries):
-        raise ValueError("Comparison entries must be a non-empty list")
-    labels = [str(e.get("field", "")) for e in entries if "field" in e and "value" in e]
-    user_values = [float(e["value"]) for e in entries if "field" in e and "value" in e]
-    if len(labels) == 0:
-        raise ValueError("Comparison entries contain no valid items")
-    benchmark_values = [50] * len(labels)
+def _draw_comparison_bar_chart(fig, cell, entries, theme, title="Trait Comparison"):
+    labels, user_values = _entries(entries, "Comparison")
+    benchmark_values = [benchmarks.benchmark(label) for label in labels]
     N = len(labels)
 
-    plt.style.use("default")
-    fig, ax = plt.subplots(figsize=(8, 4), dpi=200, facecolor="none")
+    ax = fig.add_subplot(cell)
     x_pos = np.arange(N)
     ax.bar(
         x_pos - 0.2,
         user_values,
         width=0.4,
         align="center",
-        color=CHART_COLORS[0],
+        color=theme["series"][0],
         label="Your Score",
     )
     ax.bar(
@@ -299,40 +289,27 @@ def create_comparison_bar_chart(entries, title="Trait Comparison"):
         benchmark_values,
         width=0.4,
         align="center",
-        color=CHART_COLORS[1],
+        color=theme["series"][1],
         label="Benchmark",
     )
     ax.set_xticks(x_pos)
-    ax.set_xticklabels(labels, fontsize=9, color=COLORS["title"])
+    ax.set_xticklabels(labels, fontsize=9, color=theme["title"])
     ax.set_ylim(0, 100)
-    ax.set_ylabel("Profile Score (0-100)", color=COLORS["primary"], fontsize=10)
-    ax.tick_params(axis="y", colors=COLORS["subtle_text"])
+    ax.set_ylabel("Profile Score (0-100)", color=theme["primary"], fontsize=10)
+    ax.tick_params(axis="y", colors=theme["subtle_text"])
     ax.grid(axis="y", linestyle="--", linewidth=0.5, color="#DDDDDD")
-    ax.set_title(title, fontsize=12, color=COLORS["primary"], fontweight="bold", pad=10)
+    ax.set_title(title, fontsize=12, color=theme["primary"], fontweight="bold", pad=10)
     ax.legend()
     ax.spines["right"].set_visible(False)
     ax.spines["top"].set_visible(False)
     ax.spines["left"].set_linewidth(0.5)
     ax.spines["bottom"].set_linewidth(0.5)
-    fig.patch.set_alpha(0.0)
-    plt.tight_layout()
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", transparent=True)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
 
 
-def create_donut_chart(entries, title="Strengths Distribution"):
-    if not is_nonempty_list(entries):
-        raise ValueError("Donut entries must be a non-empty list")
-    labels = [str(e.get("field", "")) for e in entries if "field" in e and "value" in e]
-    values = [float(e["value"]) for e in entries if "field" in e and "value" in e]
-    if len(labels) == 0:
-        raise ValueError("Donut entries contain no valid items")
-    chart_colors = [CHART_COLORS[i % len(CHART_COLORS)] for i in range(len(labels))]
-    plt.style.use("default")
-    fig, ax = plt.subplots(figsize=(6, 6), dpi=200, facecolor="none")
+def _draw_donut_chart(fig, cell, entries, theme, title="Strengths Distribution"):
+    labels, values = _entries(entries, "Donut")
+    chart_colors = [theme["series"][i % len(theme["series"])] for i in range(len(labels))]
+    ax = fig.add_subplot(cell)
     wedges, texts, autotexts = ax.pie(
         values,
         labels=labels,
@@ -342,41 +319,34 @@ def create_donut_chart(entries, title="Strengths Distribution"):
         pctdistance=0.85,
     )
     for autotext in autotexts:
-        autotext.set_color(COLORS["white"])
+        autotext.set_color(theme["white"])
         autotext.set_fontweight("bold")
-    centre_circle = plt.Circle((0, 0), 0.70, fc=COLORS["white"])
-    fig.gca().add_artist(centre_circle)
+    centre_circle = plt.Circle((0, 0), 0.70, fc=theme["white"])
+    ax.add_artist(centre_circle)
     ax.axis("equal")
-    ax.set_title(title, fontsize=12, color=COLORS["primary"], fontweight="bold", pad=10)
-    fig.patch.set_alpha(0.0)
-    plt.tight_layout()
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", transparent=True)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
+    ax.set_title(title, fontsize=12, color=theme["primary"], fontweight="bold", pad=10)
 
 
-def create_gauge_chart(score, title="Risk Profile"):
+def _draw_gauge_chart(fig, cell, score, theme, title="Risk Profile"):
     if not is_valid_number(score):
         raise ValueError("Gauge score must be numeric")
     score = float(score)
     score = max(0.0, min(100.0, score))
-    fig, ax = plt.subplots(figsize=(6, 3.5), dpi=200, facecolor="none")
+    ax = fig.add_subplot(cell)
     ax.add_patch(
         patches.Circle(
-            (0.5, 0.4), 0.4, color=COLORS["gauge_background"], fill=True, zorder=1
+            (0.5, 0.4), 0.4, color=theme["gauge_background"], fill=True, zorder=1
         )
     )
     ax.add_patch(
-        patches.Circle((0.5, 0.4), 0.3, color=COLORS["white"], fill=True, zorder=1)
+        patches.Circle((0.5, 0.4), 0.3, color=theme["white"], fill=True, zorder=1)
     )
     theta = 180 - score * 1.8
     ax.add_patch(
-        patches.Wedge((0.5, 0.4), 0.4, 180, theta, color=COLORS["primary"], zorder=2)
+        patches.Wedge((0.5, 0.4), 0.4, 180, theta, color=theme["primary"], zorder=2)
     )
     ax.add_patch(
-        patches.Circle((0.5, 0.4), 0.3, color=COLORS["white"], fill=True, zorder=3)
+        patches.Circle((0.5, 0.4), 0.3, color=theme["white"], fill=True, zorder=3)
     )
     ax.text(
         0.5,
@@ -386,7 +356,7 @@ def create_gauge_chart(score, title="Risk Profile"):
         verticalalignment="center",
         fontsize=40,
         fontweight="bold",
-        color=COLORS["primary"],
+        color=theme["primary"],
         zorder=4,
     )
     ax.text(
@@ -396,84 +366,237 @@ def create_gauge_chart(score, title="Risk Profile"):
         horizontalalignment="center",
         verticalalignment="center",
         fontsize=12,
-        color=COLORS["primary"],
+        color=theme["primary"],
         zorder=4,
     )
     ax.set_xlim(0, 1)
     ax.set_ylim(0, 1)
     ax.axis("off")
-    fig.patch.set_alpha(0.0)
-    plt.tight_layout()
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format="png", transparent=True)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
+
+
+# kind -> (drawer, figure size in inches, fixed sprite margins in inches:
+# left, right, bottom, top; see render_chart_sprite). The margins are what
+# tight_layout arrives at for typical data; None = sized from the labels
+# (plus _LABEL_PADS: tick padding, or minus the room a pie leaves around itself).
+CHART_DRAWERS = {
+    "radar": (_draw_radar_chart, (6, 6), (0.6, 0.6, 0.4, 0.4)),
+    "horizontal_bar": (_draw_horizontal_bar_chart, (7, 3.5), (None, 0.3, 0.6, 0.42)),
+    "vertical_bar": (_draw_vertical_bar_chart, (7, 3.5), (0.7, 0.15, 0.4, 0.42)),
+    "comparison_bar": (_draw_comparison_bar_chart, (8, 4), (0.7, 0.15, 0.4, 0.42)),
+    "donut": (_draw_donut_chart, (6, 6), (None, None, 0.15, 0.42)),
+    "gauge": (_draw_gauge_chart, (6, 3.5), (0.15, 0.15, 0.15, 0.15)),
+}
+
+
+_LABEL_PADS = {"horizontal_bar": 0.3, "donut": -0.1}
+
+
+def _label_margin(kind, entries):
+    # Room for the longest tick / slice label (about 0.07in per character)
+    longest = max((len(str(e.get("field", ""))) for e in entries if isinstance(e, dict)), default=0)
+    return max(0.3, _LABEL_PADS[kind] + 0.07 * longest)
+
+
+def _create_chart(kind, value, placed_width_cm=None, theme=None, **args):
+    drawer, figsize, _ = CHART_DRAWERS[kind]
+    theme = theme or CHART_THEME
+    plt.style.use("default")
+    started = time.perf_counter()
+    with stage(f"chart_{kind}"):
+        fig = plt.figure(figsize=figsize, dpi=200, facecolor="none")
+        try:
+            drawer(fig, fig.add_gridspec(1, 1)[0], value, theme, **args)
+        except Exception:
+            plt.close(fig)
+            raise
+        fig.patch.set_alpha(0.0)
+        fig.tight_layout()
+        png = _figure_png(fig, placed_width_cm)
+    metrics.CHART_DURATION.observe(time.perf_counter() - started, kind=kind)
+    return png
+
+
+def create_radar_chart(radar_entries, placed_width_cm=None, theme=None):
+    return _create_chart("radar", radar_entries, placed_width_cm, theme)
+
+
+def create_horizontal_bar_chart(bar_entries, title="Score Summary", placed_width_cm=None, theme=None):
+    return _create_chart("horizontal_bar", bar_entries, placed_width_cm, theme, title=title)
+
+
+def create_vertical_bar_chart(bar_entries, title="Score Summary", placed_width_cm=None, theme=None):
+    return _create_chart("vertical_bar", bar_entries, placed_width_cm, theme, title=title)
+
+
+def create_comparison_bar_chart(entries, title="Trait Comparison", placed_width_cm=None, theme=None):
+    return _create_chart("comparison_bar", entries, placed_width_cm, theme, title=title)
+
+
+def create_donut_chart(entries, title="Strengths Distribution", placed_width_cm=None, theme=None):
+    return _create_chart("donut", entries, placed_width_cm, theme, title=title)
+
+
+def create_gauge_chart(score, title="Risk Profile", placed_width_cm=None, theme=None):
+    return _create_chart("gauge", score, placed_width_cm, theme, title=title)
+
+
+def render_chart_sprite(charts, theme=None, drawers=None):
+    """
+    Draw several charts as regions of one figure and cut them apart again.
+
+    charts is a list of (kind, value, args, placed_width_cm); returns one PNG
+    buffer per chart, or None where the chart's data was unusable. The figure
+    is set up once, every region gets fixed margins (CHART_DRAWERS, or
+    `drawers` in the same format) instead of a tight_layout pass, and the
+    whole sprite is drawn with a single canvas draw, so the per-figure
+    overhead is paid once per report.
+    """
+    theme = theme or CHART_THEME
+    drawers = drawers or CHART_DRAWERS
+    sizes = [drawers[kind][1] for kind, _, _, _ in charts]
+    if not sizes:
+        return []
+    started = time.perf_counter()
+    fig_w = max(w for w, _ in sizes)
+    fig_h = sum(h for _, h in sizes)
+    compact = settings.PDF_OUTPUT_MODE == "compact"
+    dpi = 200
+    if compact and all(placed for _, _, _, placed in charts):
+        # The finest resolution any chart needs; coarser ones are scaled down after slicing
+        dpi = max(
+            settings.PDF_COMPACT_DPI * (placed / 2.54) / w
+            for (_, _, _, placed), (w, _) in zip(charts, sizes)
+        )
+
+    plt.style.use("default")
+    fig = plt.figure(figsize=(fig_w, fig_h), dpi=dpi, facecolor="none")
+    regions, top = [], 0.0
+    try:
+        for (kind, value, args, _), (w, h) in zip(charts, sizes):
+            drawer, _, (left, right, bottom, upper) = drawers[kind]
+            if None in (left, right):
+                label_margin = _label_margin(kind, value if isinstance(value, list) else [])
+                left = label_margin if left is None else left
+                right = label_margin if right is None else right
+            cell = fig.add_gridspec(
+                1,
+                1,
+                left=left / fig_w,
+                right=(w - right) / fig_w,
+                bottom=1 - (top + h - bottom) / fig_h,
+                top=1 - (top + upper) / fig_h,
+            )[0]
+            drawn = len(fig.axes)
+            try:
+                drawer(fig, cell, value, theme, **args)
+                regions.append((top, w, h))
+            except Exception as e:
+                for ax in fig.axes[drawn:]:
+                    ax.remove()
+                print(f"[WARNING] Skipping {kind} chart in sprite due to error: {e}")
+                regions.append(None)
+            top += h
+
+        # savefig(transparent=True) equivalent for the standard (RGBA) output
+        fig.patch.set_alpha(0.0)
+        for ax in fig.axes:
+            ax.patch.set_facecolor("none")
+        fig.canvas.draw()
+        pixels = np.asarray(fig.canvas.buffer_rgba())
+    finally:
+        plt.close(fig)
+
+    buffers = []
+    for region, (_, _, _, placed_width_cm) in zip(regions, charts):
+        if region is None:
+            buffers.append(None)
+            continue
+        top, w, h = region
+        y0 = int(round(top * dpi))
+        image = Image.fromarray(pixels[y0 : y0 + int(round(h * dpi)), : int(round(w * dpi))])
+        if compact and placed_width_cm:
+            width = max(1, int(round(settings.PDF_COMPACT_DPI * placed_width_cm / 2.54)))
+            if width < image.width:
+                image = image.resize((width, max(1, round(width * h / w))), Image.LANCZOS)
+            buffers.append(_compact_png(image))
+            continue
+        buffer = io.BytesIO()
+        image.save(buffer, format="png")
+        buffer.seek(0)
+        buffers.append(buffer)
+    metrics.CHART_DURATION.observe(time.perf_counter() - started, kind="sprite")
+    return buffers
 
 
 # ---------------------------
 # PDF utilities: header/footer and small table helpers
 # ---------------------------
-def header_footer(canvas, REPORT_TITLE , company_site ,COMPANY_NAME ):
+def _draw_page_chrome(canvas, REPORT_TITLE, brand):
+    palette, fonts = brand.palette, brand.fonts
     canvas.saveState()
-    canvas.setFillColor(colors.HexColor(COLORS["sidebar"]))
+    canvas.setFillColor(palette["sidebar"])
     canvas.rect(0, 0, 1.5 * cm, PAGE_HEIGHT, fill=1, stroke=0)
     canvas.translate(1.0 * cm, 8 * cm)
     canvas.rotate(90)
-    canvas.setFont("Helvetica-Bold", 12)
-    canvas.setFillColor(colors.HexColor(COLORS["white"]))
-    canvas.drawString(0, 0, COMPANY_NAME)
+    canvas.setFont(fonts.bold, 12)
+    canvas.setFillColor(palette["white"])
+    canvas.drawString(0, 0, brand.company_name)
     canvas.restoreState()
 
     canvas.saveState()
-    canvas.setFillColor(colors.HexColor(COLORS["primary"]))
-    canvas.setFont("Helvetica-Bold", 10)
+    canvas.setFillColor(palette["primary"])
+    canvas.setFont(fonts.bold, 10)
     canvas.drawString(2.5 * cm, PAGE_HEIGHT - 2 * cm, REPORT_TITLE)
-    canvas.setStrokeColor(colors.HexColor(COLORS["contrast"]))
+    canvas.setStrokeColor(palette["contrast"])
     canvas.setLineWidth(1.5)
     canvas.line(
         2.5 * cm, PAGE_HEIGHT - 2.2 * cm, PAGE_WIDTH - 2 * cm, PAGE_HEIGHT - 2.2 * cm
     )
 
-    canvas.setFont("Helvetica-Bold", 8)
-    canvas.setFillColor(colors.HexColor(COLORS["primary"]))
-    page_num_text = f"Page {canvas.getPageNumber()}"
-    canvas.drawRightString(PAGE_WIDTH - 2 * cm, 1.4 * cm, page_num_text)
-
-    canvas.setStrokeColor(colors.HexColor(COLORS["contrast"]))
+    canvas.setStrokeColor(palette["contrast"])
     canvas.setLineWidth(1.5)
     canvas.line(2.5 * cm, 1.8 * cm, PAGE_WIDTH - 2 * cm, 1.8 * cm)
 
-    canvas.setFont("Helvetica-Oblique", 8)
-    canvas.setFillColor(colors.HexColor(COLORS["subtle_text"]))
-    canvas.drawString(
-        2.5 * cm,
-        1.4 * cm,
-        f"We are {COMPANY_NAME}, dedicated to advancing careers and well-being. | {company_site}",
-    )
+    canvas.setFont(fonts.italic, 8)
+    canvas.setFillColor(palette["subtle_text"])
+    canvas.drawString(2.5 * cm, 1.4 * cm, brand.footer_text)
     canvas.restoreState()
 
 
-def _create_chart_guide_table(data):
-    styles = getSampleStyleSheet()
-    if "BodyText" not in styles:
-        styles.add(
-            ParagraphStyle(
-                name="BodyText", fontName="Helvetica", fontSize=10, leading=12
-            )
-        )
+def header_footer(canvas, REPORT_TITLE, brand, page_offset=0):
+    # Sidebar, header and footer are the same on every page of a report: draw
+    # them once into a form XObject and stamp that, adding only the page number.
+    chrome = "PageChrome" + hashlib.sha1(
+        f"{brand.id}|{REPORT_TITLE}".encode("utf-8")
+    ).hexdigest()[:12]
+    if not canvas.hasForm(chrome):
+        canvas.beginForm(chrome)
+        _draw_page_chrome(canvas, REPORT_TITLE, brand)
+        canvas.endForm()
+    canvas.doForm(chrome)
+
+    canvas.saveState()
+    canvas.setFont(brand.fonts.bold, 8)
+    canvas.setFillColor(brand.palette["primary"])
+    page_num_text = f"Page {canvas.getPageNumber() + page_offset}"
+    canvas.drawRightString(PAGE_WIDTH - 2 * cm, 1.4 * cm, page_num_text)
+    canvas.restoreState()
+
+
+def _create_chart_guide_table(data, brand):
     wrapped_data = [
-        [Paragraph(str(cell), styles["BodyText"]) for cell in row] for row in data
+        [Paragraph(str(cell), brand.styles["TableCell"]) for cell in row] for row in data
     ]
     style = TableStyle(
         [
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(COLORS["accent"])),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor(COLORS["primary"])),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("BACKGROUND", (0, 0), (-1, 0), brand.palette["accent"]),
+            ("TEXTCOLOR", (0, 0), (-1, 0), brand.palette["primary"]),
+            ("FONTNAME", (0, 0), (-1, 0), brand.fonts.bold),
+            ("FONTNAME", (0, 1), (-1, -1), brand.fonts.regular),
             ("ALIGN", (0, 0), (-1, -1), "LEFT"),
             ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor(COLORS["primary"])),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor(COLORS["accent"])]),
+            ("GRID", (0, 0), (-1, -1), 0.5, brand.palette["primary"]),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [brand.palette["accent"]]),
             ("FONTSIZE", (0, 0), (-1, -1), 10),
             ("LEFTPADDING", (0, 0), (-1, -1), 8),
         ]
@@ -483,26 +606,20 @@ def _create_chart_guide_table(data):
     return table
 
 
-def _create_data_table(data):
-    styles = getSampleStyleSheet()
-    if "BodyText" not in styles:
-        styles.add(
-            ParagraphStyle(
-                name="BodyText", fontName="Helvetica", fontSize=10, leading=12
-            )
-        )
+def _create_data_table(data, brand):
     wrapped_data = [
-        [Paragraph(str(cell), styles["BodyText"]) for cell in row] for row in data
+        [Paragraph(str(cell), brand.styles["TableCell"]) for cell in row] for row in data
     ]
     style = TableStyle(
         [
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(COLORS["accent"])),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor(COLORS["primary"])),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("BACKGROUND", (0, 0), (-1, 0), brand.palette["accent"]),
+            ("TEXTCOLOR", (0, 0), (-1, 0), brand.palette["primary"]),
+            ("FONTNAME", (0, 0), (-1, 0), brand.fonts.bold),
+            ("FONTNAME", (0, 1), (-1, -1), brand.fonts.regular),
             ("ALIGN", (0, 0), (-1, -1), "LEFT"),
             ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor(COLORS["primary"])),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor(COLORS["accent"])]),
+            ("GRID", (0, 0), (-1, -1), 0.5, brand.palette["primary"]),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [brand.palette["accent"]]),
             ("FONTSIZE", (0, 0), (-1, -1), 10),
             ("LEFTPADDING", (0, 0), (-1, -1), 8),
         ]
@@ -512,7 +629,95 @@ def _create_data_table(data):
     return table
 
 
-def build_chart_story(title, chart_data, buffer, w, h, guide_data, styles):
+class ChartPage(Flowable):
+    """
+    A whole chart page drawn at precomputed positions.
+
+    Stacks the page's flowables top to bottom like a frame would, but in one
+    measuring pass and without KeepTogether's split / re-measure attempts.
+    The chart image is scaled down (keeping its aspect ratio) so the page
+    always fits in one frame. If the text and tables alone leave less than
+    MIN_IMAGE_HEIGHT for the image, it falls back to the flowing layout.
+    """
+
+    MIN_IMAGE_HEIGHT = 4 * cm
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._flowables = flowables
+        self._image = next(f for f in flowables if isinstance(f, RLImage))
+        self._image_size = (self._image.drawWidth, self._image.drawHeight)
+        self._layout = []
+        self._fits = False
+
+    def _spaced(self):
+        # Frame-style spacing: spaceBefore collapses into the previous spaceAfter
+        previous_after = None
+        for f in self._flowables:
+            before = 0 if previous_after is None else max(f.getSpaceBefore() - previous_after, 0)
+            previous_after = f.getSpaceAfter()
+            yield f, before, previous_after
+
+    def wrap(self, availWidth, availHeight):
+        image_width, image_height = self._image_size
+        layout = []
+        fixed = 0
+        for f, before, after in self._spaced():
+            w, h = (0, 0) if f is self._image else f.wrap(availWidth, availHeight)
+            layout.append([f, w, h, before, after])
+            fixed += h + before + after
+
+        scale = min(1.0, (availHeight - fixed) / image_height)
+        self._fits = image_height * scale >= self.MIN_IMAGE_HEIGHT
+        if not self._fits:
+            self.width, self.height = availWidth, fixed + image_height
+            return self.width, self.height
+
+        self._image.drawWidth = image_width * scale
+        self._image.drawHeight = image_height * scale
+        for entry in layout:
+            if entry[0] is self._image:
+                entry[1], entry[2] = self._image.drawWidth, self._image.drawHeight
+        self._layout = layout
+        self.width = availWidth
+        self.height = fixed + self._image.drawHeight
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        if self._fits:
+            return []
+        image_width, image_height = self._image_size
+        self._image.drawWidth, self._image.drawHeight = image_width, image_height
+        return [KeepTogether(self._flowables)]
+
+    def draw(self):
+        y = self.height
+        for f, w, h, before, after in self._layout:
+            y -= before + h
+            f.drawOn(self.canv, 0, y, _sW=self.width - w)
+            y -= after
+
+
+def chart_data_rows(title, chart_data):
+    """[field, value] rows of a chart's "Chart Data" table (also used by the HTML preview)."""
+    # Handle single-value charts like Gauge
+    if (
+        isinstance(chart_data, dict)
+        and "data" in chart_data
+        and is_nonempty_list(chart_data["data"])
+    ):
+        return [
+            [e.get("field", ""), e.get("value", "")]
+            for e in chart_data["data"]
+            if "field" in e and "value" in e
+        ]
+    # For charts like gauge -> value; for others if no 'data' available, try to present the title/value
+    if isinstance(chart_data, dict) and "value" in chart_data:
+        return [[title.split(":")[0].strip(), chart_data.get("value", "N/A")]]
+    return [[title.split(":")[0].strip(), "N/A"]]
+
+
+def build_chart_story(title, chart_data, buffer, w, h, guide_data, styles, brand):
     """Builds a story section for a single chart. chart_data is the original chart dict from JSON."""
     story = [
         Paragraph(title, styles["SectionHeader"]),
@@ -530,92 +735,54 @@ def build_chart_story(title, chart_data, buffer, w, h, guide_data, styles):
         Paragraph("Chart Data", styles["TraitTitle"]),
     ]
 
-    # Handle single-value charts like Gauge
-    if (
-        isinstance(chart_data, dict)
-        and "data" in chart_data
-        and is_nonempty_list(chart_data["data"])
-    ):
-        data_list = [
-            [e.get("field", ""), e.get("value", "")]
-            for e in chart_data["data"]
-            if "field" in e and "value" in e
-        ]
-    else:
-        # For charts like gauge -> value; for others if no 'data' available, try to present the title/value
-        if isinstance(chart_data, dict) and "value" in chart_data:
-            data_list = [[title.split(":")[0].strip(), chart_data.get("value", "N/A")]]
-        else:
-            data_list = [[title.split(":")[0].strip(), "N/A"]]
-
-    story.append(_create_data_table([["Field", "Value"]] + data_list))
+    data_list = chart_data_rows(title, chart_data)
+    story.append(_create_data_table([["Field", "Value"]] + data_list, brand))
     story.append(Spacer(1, 0.5 * cm))
     story.append(Paragraph("How to Read This Chart", styles["TraitTitle"]))
-    story.append(_create_chart_guide_table([["Element", "Description"]] + guide_data))
-    return KeepTogether(story)
+    story.append(_create_chart_guide_table([["Element", "Description"]] + guide_data, brand))
+    if settings.PDF_CHART_LAYOUT == "flow":
+        return KeepTogether(story)
+    return ChartPage(story)
 
 
-def add_static_pages(story, styles):
+def add_static_pages(story, styles, template=None, brand=None):
     """Adds the static introduction and explanation pages to the story."""
-    story.append(Paragraph("1. Report Overview", styles["SectionHeader"]))
-    story.append(
-        Paragraph(
-            "This <b>confidential report</b> summarizes your core personality, cognitive style, and motivational drivers. "
-            "It is structured to provide an easy-to-digest profile for both personal growth and professional development.",
-            styles["Body"],
-        )
-    )
+    template = template or get_template()
+    brand = brand or brand_kit()
+    overview = template.overview
+    story.append(Paragraph(overview["title"], styles["SectionHeader"]))
+    story.append(Paragraph(overview["text"], styles["Body"]))
     story.append(Spacer(1, 0.5 * cm))
-    story.append(Paragraph("Key Components:", styles["TraitTitle"]))
-    for p in ["Trait Breakdown", "Graphical Summaries", "Recommendations"]:
+    story.append(Paragraph(overview.get("items_title", ""), styles["TraitTitle"]))
+    for p in overview["items"]:
         story.append(Paragraph(f"• {p}", styles["CustomBullet"]))
     story.append(PageBreak())
 
-    story.append(Paragraph("2. How to Read This Report", styles["SectionHeader"]))
-    story.append(
-        Paragraph(
-            "Each score reflects the intensity of the corresponding trait, interpreted along a standardized 1–10 scale.",
-            styles["Body"],
-        )
-    )
+    how_to_read = template.how_to_read
+    story.append(Paragraph(how_to_read["title"], styles["SectionHeader"]))
+    story.append(Paragraph(how_to_read["text"], styles["Body"]))
     story.append(Spacer(1, 0.4 * cm))
-    story.append(Paragraph("Score Interpretation (1–10 Scale)", styles["TraitTitle"]))
-    score_table_data = [
-        [
-            Paragraph(f"<b>{h}</b>", styles["Body"])
-            for h in ["Score Range", "Interpretation", "Meaning"]
-        ],
-        [
-            Paragraph("1–3", styles["Body"]),
-            Paragraph("Low", styles["Body"]),
-            Paragraph("Trait is less dominant.", styles["Body"]),
-        ],
-        [
-            Paragraph("4–6", styles["Body"]),
-            Paragraph("Balanced", styles["Body"]),
-            Paragraph("Represents flexibility.", styles["Body"]),
-        ],
-        [
-            Paragraph("7–10", styles["Body"]),
-            Paragraph("High", styles["Body"]),
-            Paragraph("Trait strongly defines behavior.", styles["Body"]),
-        ],
+    story.append(Paragraph(how_to_read.get("table_title", ""), styles["TraitTitle"]))
+    header, *rows = how_to_read["table"]
+    score_table_data = [[Paragraph(f"<b>{h}</b>", styles["Body"]) for h in header]] + [
+        [Paragraph(cell, styles["Body"]) for cell in row] for row in rows
     ]
-    score_table = Table(score_table_data, colWidths=[70, 100, 300], repeatRows=1)
+    score_table = Table(score_table_data, colWidths=how_to_read.get("col_widths"), repeatRows=1)
     score_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(COLORS["accent"])),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor(COLORS["primary"])),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("BACKGROUND", (0, 0), (-1, 0), brand.palette["accent"]),
+                ("TEXTCOLOR", (0, 0), (-1, 0), brand.palette["primary"]),
+                ("FONTNAME", (0, 0), (-1, 0), brand.fonts.bold),
+                ("FONTNAME", (0, 1), (-1, -1), brand.fonts.regular),
                 (
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.HexColor(COLORS["accent"]), colors.white],
+                    [brand.palette["accent"], colors.white],
                 ),
-                ("BOX", (0, 0), (-1, -1), 0.7, colors.HexColor(COLORS["primary"])),
-                ("GRID", (0, 0), (-1, -1), 0.4, colors.HexColor(COLORS["secondary"])),
+                ("BOX", (0, 0), (-1, -1), 0.7, brand.palette["primary"]),
+                ("GRID", (0, 0), (-1, -1), 0.4, brand.palette["secondary"]),
             ]
         )
     )
@@ -624,170 +791,84 @@ def add_static_pages(story, styles):
 
 
 # ---------------------------
-# Main generator (fault-tolerant)
+# Report segments
 # ---------------------------
+# A report is a sequence of independent segments, each ending in a PageBreak,
+# laid out by its template (report_templates): cover + TOC, static pages,
+# personality breakdown (+ cognitive intro), one page per chart and the
+# closing recommendations. generate_personality_pdf concatenates them into
+# one story; pdf_parallel renders them in separate processes and merges them.
+
+CHART_CREATORS = {
+    "radar": create_radar_chart,
+    "horizontal_bar": create_horizontal_bar_chart,
+    "vertical_bar": create_vertical_bar_chart,
+    "comparison_bar": create_comparison_bar_chart,
+    "donut": create_donut_chart,
+    "gauge": create_gauge_chart,
+}
+assert set(CHART_CREATORS) == set(CHART_KINDS)
+
 
-def generate_personality_pdf(filename, data, person_name, generated_by):
-    # Prepare logo (use file if present, else placeholder buffer)
+def _report_context(person_name, generated_by, brand):
     username = person_name if person_name else ""
-    REPORT_TITLE = f"{username} Profile Report"
-    COMPANY_NAME = "Endorphin"
-    company_info_mail = "info.endorphin@gmail.com"
-    company_site = "www.endorphin.in"
-    logo_path = "public/endorphin.jpeg"
-
-    if os.path.exists(logo_path):
-        logo_buffer = logo_path
-    else:
-        logo_buffer = make_placeholder_logo()
-
-    # Process and generate all charts in a data-driven way.
-    # This configuration list drives chart creation. To add/remove a chart,
-    # simply add/remove an entry from this list.
-    chart_configs = [
-        {
-            "name": "Radar Chart",
-            "page_title": "5. Radar Chart of Traits",
-            "data_path": "sections.charts.radarChart",
-            "value_key": "data",
-            "validation_func": is_nonempty_list,
-            "creation_func": create_radar_chart,
-            "args": {},
-            "w": 12,
-            "h": 12,
-            "guide_data": [
-                ["Axes", "Each axis represents a different personality trait."],
-                [
-                    "Value",
-                    "The further the point is from the center, the higher the score.",
-                ],
-            ],
-        },
-        {
-            "name": "Bar Chart",
-            "page_title": "6. Bar Chart Summary (Core Attributes)",
-            "data_path": "sections.charts.barChart",
-            "value_key": "data",
-            "validation_func": is_nonempty_list,
-            "creation_func": create_horizontal_bar_chart,
-            "args": {"title": "Core Attribute Summary"},
-            "w": 14,
-            "h": 7,
-            "guide_data": [
-                ["Bars", "Each horizontal bar represents a core attribute."],
-                ["Length", "The length of the bar corresponds to your score (0-100)."],
-            ],
-        },
-        {
-            "name": "Cognitive Chart",
-            "page_title": "7. Cognitive Score Chart",
-            "data_path": "sections.barChart",  # Note: Different path from other charts
-            "value_key": "data",
-            "validation_func": is_nonempty_list,
-            "creation_func": create_vertical_bar_chart,
-            "args": {"title": "Cognitive Score Summary"},
-            "w": 14,
-            "h": 7,
-            "guide_data": [
-                ["Bars", "Each vertical bar represents a cognitive ability."],
-                ["Height", "The height of the bar shows your score."],
-            ],
-        },
-        {
-            "name": "Comparison Chart",
-            "page_title": "8. Trait Comparison Chart",
-            "data_path": "sections.charts.comparisonTable",
-            "value_key": "data",
-            "validation_func": is_nonempty_list,
-            "creation_func": create_comparison_bar_chart,
-            "args": {},
-            "w": 16,
-            "h": 8,
-            "guide_data": [
-                ["Your Score", "The dark bar representing your score."],
-                [
-                    "Benchmark",
-                    "The lighter bar representing the population average (50).",
-                ],
-            ],
-        },
-        {
-            "name": "Donut Chart",
-            "page_title": "9. Donut Chart of Strengths",
-            "data_path": "sections.charts.donutChart",
-            "value_key": "data",
-            "validation_func": is_nonempty_list,
-            "creation_func": create_donut_chart,
-            "args": {},
-            "w": 12,
-            "h": 12,
-            "guide_data": [
-                ["Slices", "Each slice represents a different strength."],
-                ["Size", "The size of the slice corresponds to the score."],
-            ],
-        },
-        {
-            "name": "Gauge Chart",
-            "page_title": "10. Gauge Chart: Risk Profile",
-            "data_path": "sections.charts.gaugeChart",
-            "value_key": "value",
-            "validation_func": is_valid_number,
-            "creation_func": create_gauge_chart,
-            "args": {"title": "Risk Profile"},
-            "w": 12,
-            "h": 7,
-            "guide_data": [
-                ["Value", "The value represents the risk profile score."],
-                ["Color", "The color of the gauge indicates the level of risk."],
-            ],
-        },
-    ]
+    return {
+        "person_name": person_name,
+        "generated_by": generated_by or brand.generated_by,
+        "REPORT_TITLE": f"{username} Profile Report",
+        "brand": brand,
+    }
+
+
+def _render_chart(chart, data, theme=None):
+    """Draw one chart; returns its chart definition, or None when it has to be skipped."""
+    chart_input = chart.bind(data)
+    if chart_input is None:
+        return None
+    chart_meta, chart_value = chart_input
+    try:
+        with stage("charts"):
+            buffer = CHART_CREATORS[chart.kind](
+                chart_value, placed_width_cm=chart.w, theme=theme, **chart.args
+            )
+    except Exception as e:
+        # Add logging to see which chart is failing and why.
+        print(f"[WARNING] Skipping chart '{chart.name}' due to error: {e}")
+        return None
+    if not buffer:
+        return None
+    return _chart_definition(chart, chart_meta, buffer)
 
-    chart_definitions = []
-    for config in chart_configs:
-        chart_meta = safe_get(data, config["data_path"], default=None)
-        chart_value = safe_get(chart_meta, config["value_key"], default=None)
 
-        if chart_meta and config["validation_func"](chart_value):
-            try:
-                buffer = config["creation_func"](chart_value, **config.get("args", {}))
-                if buffer:
-                    chart_definitions.append(
-                        (
-                            config["page_title"],
-                            chart_meta,
-                            buffer,
-                            config["w"],
-                            config["h"],
-                            config["guide_data"],
-                        )
-                    )
-            except Exception as e:
-                # Add logging to see which chart is failing and why.
-                print(f"[WARNING] Skipping chart '{config['name']}' due to error: {e}")
-                continue
+def _chart_definition(chart, chart_meta, buffer):
+    return (chart.page_title, chart_meta, buffer, chart.w, chart.h, [list(row) for row in chart.guide])
 
-    # Build PDF doc
-    doc = SimpleDocTemplate(
-        filename,
-        pagesize=A4,
-        leftMargin=2.5 * cm,
-        rightMargin=2 * cm,
-        topMargin=2.6 * cm,
-        bottomMargin=2.2 * cm,
-        title=f"{person_name} - {REPORT_TITLE}",
+
+def _render_chart_sprite(charts, data, theme=None):
+    """Chart definitions of all charts with data, drawn as one sprite; {chart index: definition or None}."""
+    bound = [(index, chart, chart.bind(data)) for index, chart in enumerate(charts)]
+    bound = [(index, chart, chart_input) for index, chart, chart_input in bound if chart_input]
+    buffers = render_chart_sprite(
+        [(chart.kind, chart_value, chart.args, chart.w) for _, chart, (_, chart_value) in bound],
+        theme,
     )
+    return {
+        index: _chart_definition(chart, chart_meta, buffer) if buffer else None
+        for (index, chart, (chart_meta, _)), buffer in zip(bound, buffers)
+    }
 
-    # Styles
+
+def build_styles(palette=PALETTE, fonts=None):
+    fonts = fonts or TenantFonts()
     styles = getSampleStyleSheet()
     styles.add(
         ParagraphStyle(
             name="ReportTitle",
             alignment=1,
             fontSize=30,
-            textColor=colors.HexColor(COLORS["title"]),
+            textColor=palette["title"],
             spaceAfter=20,
-            fontName="Helvetica-Bold",
+            fontName=fonts.bold,
         )
     )
     styles.add(
@@ -795,28 +876,28 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
             name="ReportSubtitle",
             alignment=1,
             fontSize=14,
-            textColor=colors.HexColor(COLORS["primary"]),
+            textColor=palette["primary"],
             spaceAfter=30,
-            fontName="Helvetica",
+            fontName=fonts.regular,
         )
     )
     styles.add(
         ParagraphStyle(
             name="SectionHeader",
             fontSize=16,
-            textColor=colors.HexColor(COLORS["primary"]),
+            textColor=palette["primary"],
             spaceAfter=10,
             spaceBefore=20,
-            fontName="Helvetica-Bold",
+            fontName=fonts.bold,
         )
     )
     styles.add(
         ParagraphStyle(
             name="TraitTitle",
             fontSize=12,
-            textColor=colors.HexColor(COLORS["title"]),
+            textColor=palette["title"],
             spaceAfter=4,
-            fontName="Helvetica-Bold",
+            fontName=fonts.bold,
         )
     )
     styles.add(
@@ -824,8 +905,8 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
             name="CenteredBody",
             fontSize=10,
             leading=16,
-            textColor=colors.HexColor(COLORS["body_text"]),
-            fontName="Helvetica",
+            textColor=palette["body_text"],
+            fontName=fonts.regular,
             alignment=1,
         )
     )
@@ -834,8 +915,8 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
             name="Body",
             fontSize=10,
             leading=16,
-            textColor=colors.HexColor(COLORS["body_text"]),
-            fontName="Helvetica",
+            textColor=palette["body_text"],
+            fontName=fonts.regular,
         )
     )
     styles.add(
@@ -846,21 +927,73 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
             firstLineIndent=-0.5 * cm,
         )
     )
+    # Cells of the chart data / guide tables
+    styles.add(ParagraphStyle(name="TableCell", parent=styles["BodyText"], fontName=fonts.regular))
+    return styles
+
+
+class BrandKit:
+    """A tenant profile compiled for rendering: parsed colours, styles, fonts and logo."""
+
+    def __init__(self, profile):
+        self.id = profile.id
+        self.company_name = profile.company_name
+        self.company_site = profile.company_site
+        self.company_mail = profile.company_mail
+        self.generated_by = profile.generated_by or f"{profile.company_name} AI"
+        self.footer_text = profile.footer_text.format(
+            company_name=profile.company_name,
+            company_site=profile.company_site,
+            company_mail=profile.company_mail,
+        )
+        hex_colors = dict(COLORS, **profile.palette)
+        self.chart_theme = dict(hex_colors, series=profile.chart_colors or CHART_COLORS)
+        self.palette = {name: colors.HexColor(value) for name, value in hex_colors.items()}
+        self.fonts = profile.fonts
+        for name, path in self.fonts.files.items():
+            pdfmetrics.registerFont(TTFont(name, path))
+        self.styles = build_styles(self.palette, self.fonts)
+        self.logo = self._load_logo(profile.logo_path, hex_colors)
+
+    @staticmethod
+    def _load_logo(logo_path, hex_colors):
+        # Use the file if present, else a placeholder in the tenant's colours
+        if logo_path and os.path.exists(logo_path):
+            with open(logo_path, "rb") as f:
+                return f.read()
+        return make_placeholder_logo(
+            bg=hex_colors["primary"], circle=hex_colors["accent"], outline=hex_colors["secondary"]
+        ).getvalue()
+
+
+@functools.lru_cache(maxsize=settings.BRAND_CACHE_SIZE)
+def _compiled_brand_kit(tenant_id):
+    print(f"[BRAND] Compiled brand kit for tenant '{tenant_id}'")
+    return BrandKit(get_tenant(tenant_id))
+
+
+metrics.mirror_lru_cache("brand_kit", _compiled_brand_kit)
+
+
+def brand_kit(tenant_id=None):
+    """The tenant's compiled BrandKit (cached per worker process). Raises TenantError."""
+    return _compiled_brand_kit(get_tenant(tenant_id).id)
+
+
+def _cover_story(ctx, styles, template):
+    person_name = ctx["person_name"]
+    brand = ctx["brand"]
 
     story = []
 
     # COVER
     story.append(Spacer(1, 6 * cm))
     # RLImage accepts either filename or file-like object.
-    story.append(RLImage(logo_buffer, width=4.5 * cm, height=4.5 * cm, hAlign="CENTER"))
+    story.append(RLImage(io.BytesIO(brand.logo), width=4.5 * cm, height=4.5 * cm, hAlign="CENTER"))
     story.append(Spacer(1, 0.8 * cm))
     story.append(Paragraph(f"<b>{person_name}'s</b>", styles["ReportTitle"]))
     story.append(Spacer(1, 0.5 * cm))
-    story.append(
-        Paragraph(
-            "Comprehensive Personality & Cognitive Profile", styles["ReportSubtitle"]
-        )
-    )
+    story.append(Paragraph(template.cover_subtitle, styles["ReportSubtitle"]))
     story.append(Spacer(1, 1 * cm))
     story.append(
         Paragraph(
@@ -868,14 +1001,14 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
             styles["CenteredBody"],
         )
     )
-    story.append(Paragraph(f"{COMPANY_NAME} Inc.", styles["CenteredBody"]))
+    story.append(Paragraph(f"{brand.company_name} Inc.", styles["CenteredBody"]))
     story.append(
-        Paragraph(f"{company_info_mail} | {company_site}", styles["CenteredBody"])
+        Paragraph(f"{brand.company_mail} | {brand.company_site}", styles["CenteredBody"])
     )
     story.append(Spacer(1, 2 * cm))
     story.append(
         Paragraph(
-            f"The Individual Profile of {person_name}'s Report Generated by {generated_by}.",
+            f"The Individual Profile of {person_name}'s Report Generated by {ctx['generated_by']}.",
             styles["CenteredBody"],
         )
     )
@@ -887,27 +1020,15 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
     # TABLE OF CONTENTS (static, minimal)
     story.append(Paragraph("Table of Contents", styles["ReportTitle"]))
     story.append(Spacer(1, 0.5 * cm))
-    toc_data = [
-        ("Report Overview", 3),
-        ("How to Read This Report", 4),
-        ("Personality Breakdown", 5),
-        ("Cognitive Profile", 6),
-        ("Radar Chart", 7),
-        ("Bar Chart", 8),
-        ("Comparison Chart", 9),
-        ("Donut Chart", 10),
-        ("Gauge Chart", 11),
-        ("Recommendations", 12),
-        ("Next Steps", 13),
-    ]
     toc_table_data = [
-        [f"{i+1}.", title, f".... {page}"] for i, (title, page) in enumerate(toc_data)
+        [f"{i+1}.", title, f".... {page}"] for i, (title, page) in enumerate(template.toc)
     ]
     toc_table = Table(toc_table_data, colWidths=[30, 420, 50])
     toc_table.setStyle(
         TableStyle(
             [
-                ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor(COLORS["title"])),
+                ("TEXTCOLOR", (0, 0), (-1, -1), brand.palette["title"]),
+                ("FONTNAME", (0, 0), (-1, -1), brand.fonts.regular),
                 ("FONTSIZE", (0, 0), (-1, -1), 11),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
@@ -916,20 +1037,23 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
                     (0, 0),
                     (-1, -1),
                     0.25,
-                    colors.HexColor(COLORS["secondary"]),
+                    brand.palette["secondary"],
                 ),
             ]
         )
     )
     story.append(toc_table)
     story.append(PageBreak())
+    return story
+
 
-    # STATIC PAGES
-    add_static_pages(story, styles)
+def _breakdown_story(data, styles, template):
+    story = []
 
     # Personality Breakdown (safe)
-    story.append(Paragraph("3. Personality Breakdown", styles["SectionHeader"]))
-    report_section = safe_get(data, "sections.report", default={})
+    breakdown = template.breakdown
+    story.append(Paragraph(breakdown["title"], styles["SectionHeader"]))
+    report_section = template.get_breakdown(data, default={})
     if isinstance(report_section, dict) and len(report_section) > 0:
         for trait, desc in report_section.items():
             story.append(
@@ -943,89 +1067,169 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
             )
     else:
         # If section missing, we simply skip content (Option A)
-        story.append(
-            Paragraph("No personality breakdown data available.", styles["Body"])
-        )
+        story.append(Paragraph(breakdown["empty_text"], styles["Body"]))
     story.append(PageBreak())
 
     # Cognitive intro
-    story.append(Paragraph("4. Cognitive Profile Overview", styles["SectionHeader"]))
-    story.append(
-        Paragraph(
-            "This section details your cognitive functioning. The following chart visualizes your performance across core cognitive domains.",
-            styles["Body"],
-        )
-    )
-    story.append(Spacer(1, 0.5 * cm))
-    story.append(PageBreak())
+    if template.cognitive_intro:
+        story.append(Paragraph(template.cognitive_intro["title"], styles["SectionHeader"]))
+        story.append(Paragraph(template.cognitive_intro["text"], styles["Body"]))
+        story.append(Spacer(1, 0.5 * cm))
+        story.append(PageBreak())
+    return story
+
+
+def _chart_story(chart_definition, styles, brand):
+    # Option A: skip any chart missing metadata or buffer
+    if chart_definition is None:
+        return []
+    title, chart_data, buffer, w, h, guide_data = chart_definition
+    try:
+        return [
+            build_chart_story(title, chart_data, buffer, w, h, guide_data, styles, brand),
+            PageBreak(),
+        ]
+    except Exception:
+        # Skip problematic charts silently (Option A)
+        return []
 
-    # The `chart_definitions` list is now built dynamically in the loop above.
-    # This section is intentionally left blank.
 
-    # Add chart pages — Option A: skip any chart missing metadata or buffer
-    for title, chart_data, buffer, w, h, guide_data in chart_definitions:
-        try:
-            # If any critical piece missing, skip
-            if not chart_data or buffer is None:
-                continue
-            story.append(
-                build_chart_story(title, chart_data, buffer, w, h, guide_data, styles)
-            )
-            story.append(PageBreak())
-        except Exception:
-            # Skip problematic charts silently (Option A)
-            continue
+def _closing_block(story, block, styles, gap):
+    story.append(Paragraph(block["title"], styles["SectionHeader"]))
+    story.append(Paragraph(block["text"], styles["Body"]))
+    story.append(Spacer(1, gap))
+    for p in block["items"]:
+        story.append(Paragraph("• " + p, styles["CustomBullet"]))
 
-    # Recommendations & Next Steps (always include)
-    story.append(Paragraph("11. Career Fit Recommendations", styles["SectionHeader"]))
-    story.append(
-        Paragraph(
-            "These recommendations suggest environments and roles where you are likely to thrive.",
-            styles["Body"],
-        )
-    )
-    story.append(Spacer(1, 0.3 * cm))
 
-    insights = [
-        "<b>Strengths Leverage:</b> Utilize high openness and strong logical reasoning in roles requiring creativity and analytical problem-solving.",
-        "<b>Growth Areas Focus:</b> Target spontaneous engagement and social energy development through varied networking opportunities.",
-        "<b>Optimal Career Fit:</b> Analytical and structured roles (e.g., data analysis, engineering) are best suited.",
-        "<b>Ideal Environment:</b> Seek environments that provide clear goals and autonomy.",
-    ]
-    for p in insights:
-        story.append(Paragraph("• " + p, styles["CustomBullet"]))
-    story.append(PageBreak())
+def _closing_story(styles, template):
+    story = []
 
-    story.append(Paragraph("12. Next Steps", styles["SectionHeader"]))
-    story.append(
-        Paragraph(
-            "Use these steps to integrate your profile results into your development goals.",
-            styles["Body"],
-        )
+    # Recommendations & Next Steps
+    if template.recommendations:
+        _closing_block(story, template.recommendations, styles, 0.3 * cm)
+    if template.next_steps:
+        if story:
+            story.append(PageBreak())
+        _closing_block(story, template.next_steps, styles, 0.5 * cm)
+    return story
+
+
+def report_segments(data, template_id=None):
+    """Ordered segment descriptors (picklable) for a report; charts without data are left out."""
+    template = get_template(template_id)
+    segments = []
+    for section in template.sections:
+        if section == "charts":
+            segments.extend(
+                ("chart", index)
+                for index, chart in enumerate(template.charts)
+                if chart.bind(data) is not None
+            )
+        else:
+            segments.append((section,))
+    return segments
+
+
+def build_segment_story(segment, data, ctx, styles, template):
+    kind = segment[0]
+    if kind == "cover":
+        return _cover_story(ctx, styles, template)
+    if kind == "static":
+        story = []
+        add_static_pages(story, styles, template, ctx["brand"])
+        return story
+    if kind == "breakdown":
+        return _breakdown_story(data, styles, template)
+    if kind == "chart":
+        brand = ctx["brand"]
+        if "charts" in ctx:
+            chart_definition = ctx["charts"].get(segment[1])
+        else:
+            chart_definition = _render_chart(template.charts[segment[1]], data, brand.chart_theme)
+        return _chart_story(chart_definition, styles, brand)
+    if kind == "closing":
+        return _closing_story(styles, template)
+    raise ValueError(f"Unknown report segment: {segment!r}")
+
+
+def _make_doc(target, ctx):
+    return SimpleDocTemplate(
+        target,
+        pagesize=A4,
+        leftMargin=2.5 * cm,
+        rightMargin=2 * cm,
+        topMargin=2.6 * cm,
+        bottomMargin=2.2 * cm,
+        title=f"{ctx['person_name']} - {ctx['REPORT_TITLE']}",
+        # Fixed creation date / document id, so identical content gives identical bytes.
+        invariant=1,
+        pageCompression=1,
+        initialFontName=ctx["brand"].fonts.regular,
     )
-    story.append(Spacer(1, 0.5 * cm))
 
-    next_steps_list = [
-        "<b>Discuss & Validate</b>: Share this report with a trusted mentor or coach.",
-        "<b>Set a SMART Goal</b>: Choose one 'Growth Area' and set a specific, measurable goal for the next 90 days.",
-        "<b>Track Success</b>: Document instances where your strengths helped you succeed.",
-        "<b>Revisit in Six Months</b>: Personal development is cyclical. Revisit this report to measure growth.",
-    ]
-    for p in next_steps_list:
-        story.append(Paragraph("• " + p, styles["CustomBullet"]))
+
+def _build_doc(doc, story, ctx, page_offset=0):
+    def on_page(canvas, doc):
+        header_footer(canvas, ctx["REPORT_TITLE"], ctx["brand"], page_offset)
 
     # Build PDF (safe)
     try:
-        doc.build(story,
-                  onFirstPage=lambda canvas, doc: header_footer(canvas, REPORT_TITLE, company_site, COMPANY_NAME),
-                  onLaterPages=lambda canvas, doc: header_footer(canvas, REPORT_TITLE, company_site, COMPANY_NAME))
+        doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
     except Exception as e:
         print(f"[ERROR] Failed during PDF build: {e}")
         raise e
 
+
+# ---------------------------
+# Main generator (fault-tolerant)
+# ---------------------------
+
+def generate_personality_pdf(
+    filename, data, person_name, generated_by, template_id=None, tenant_id=None
+):
+    template = get_template(template_id)
+    with stage("brand"):
+        brand = brand_kit(tenant_id)
+    ctx = _report_context(person_name, generated_by, brand)
+    styles = brand.styles
+    doc = _make_doc(filename, ctx)
+    if settings.PDF_CHART_RENDER == "sprite":
+        with stage("charts"):
+            ctx["charts"] = _render_chart_sprite(template.charts, data, brand.chart_theme)
+
+    story = []
+    with stage("story"):
+        for segment in report_segments(data, template.id):
+            story.extend(build_segment_story(segment, data, ctx, styles, template))
+
+    with stage("build"):
+        _build_doc(doc, story, ctx)
     return filename
 
 
+def render_segment(
+    segment, data, person_name, generated_by, page_offset=0, template_id=None, tenant_id=None
+):
+    """
+    Render a single segment as its own PDF, numbering pages from page_offset + 1.
+    Returns (pdf_bytes, page_count); (None, 0) when the segment has no content.
+    """
+    template = get_template(template_id)
+    brand = brand_kit(tenant_id)
+    ctx = _report_context(person_name, generated_by, brand)
+    styles = brand.styles
+    with stage("story"):
+        story = build_segment_story(segment, data, ctx, styles, template)
+    if not story:
+        return None, 0
+    buffer = io.BytesIO()
+    doc = _make_doc(buffer, ctx)
+    with stage("build"):
+        _build_doc(doc, story, ctx, page_offset)
+    return buffer.getvalue(), doc.page
+
+
 
 # ---------------------------
 # CLI / run
@@ -1046,66 +1250,109 @@ def generate_personality_pdf(filename, data, person_name, generated_by):
 #             print("[ERROR] Failed to generate PDF:", str(e))
 
 import os
-import threading
-import time
-import requests
+import asyncio
+import uuid
 from datetime import datetime
 from dotenv import load_dotenv
+from app.core.config import settings
+from app.services import content_store, pdf_parallel, render_pool
+from app.services.cleanup_service import janitor
+from app.services.storage_service import replicate_report, replicate_in_background
+from app.utils.pdf_size import pdf_size_breakdown
 load_dotenv()
 
 GENERATED_DIR = "generated_reports"
 
 
 def schedule_delete(path, delay=300):
-    """Delete the file after delay seconds in a background thread."""
-    def task():
-        time.sleep(delay)
-        if os.path.exists(path):
-            try:
-                os.remove(path)
-                print(f"[AUTO-DELETE] Removed: {path}")
-            except Exception as e:
-                print(f"[DELETE ERROR] {e}")
-    threading.Thread(target=task, daemon=True).start()
+    """Delete the file after delay seconds (handled by the process-wide janitor)."""
+    janitor.schedule(path, delay)
 
 
-def generate_personality_pdf_safe(filename, data, person_name, generated_by):
+def render_personality_pdf_file(
+    data, person_name, generated_by, template_id=None, tenant_id=None
+):
+    """
+    Render the report into GENERATED_DIR and return the local path (blocking).
+    Every render gets its own file name: concurrent renders of the same
+    person must not share a file, and the person's name is not a safe path.
+    """
     # Ensure folder exists
     os.makedirs(GENERATED_DIR, exist_ok=True)
 
     # Local full path
-    full_path = os.path.join(GENERATED_DIR, filename)
+    full_path = os.path.join(GENERATED_DIR, f"{uuid.uuid4().hex}.pdf")
 
     # Generate PDF → MUST return file path
     pdf_path = generate_personality_pdf(
         filename=full_path,
         data=data,
         person_name=person_name,
-        generated_by=generated_by
+        generated_by=generated_by,
+        template_id=template_id,
+        tenant_id=tenant_id,
     )
 
     if pdf_path is None or not os.path.exists(pdf_path):
         raise ValueError(f"PDF generation failed. File not found at {pdf_path}")
+    return pdf_path
 
-    upload_url = os.getenv("PDF_STORAGE_PATH")
-    if not upload_url:
-        raise ValueError("PDF_STORAGE_PATH environment variable is not set")
-
-    try:
-        with open(pdf_path, "rb") as file:
-            response = requests.post(upload_url, files={"report": file})
-
-        response.raise_for_status()
 
-        # EXPECTED: server returns PUBLIC URL like:
-        uploaded_url = response.json().get("path")
-        if uploaded_url is None:
-            raise ValueError("Upload response missing 'path' field.")
-
-    except requests.RequestException as e:
-        uploaded_url = None
-
-    # Auto delete local file
-    schedule_delete(pdf_path, delay=300)
-
-    return uploaded_url
+async def generate_personality_pdf_safe(
+    filename, data, person_name, generated_by, on_uploaded=None, template_id=None, tenant_id=None
+):
+    """
+    Render the report off the event loop, keep it in the local content store
+    and replicate it to PDF_STORAGE_PATH according to REPORT_REPLICATION.
+    `filename` is only the display name (upload file name, logs).
+
+    Returns {"pdf_sha256", "pdf_size", "download_path", "uploaded_url"}; pdf_size
+    is the byte breakdown from pdf_size_breakdown and uploaded_url is
+    None when replication is off or still running (`on_uploaded(url)` is
+    called once it finishes).
+    """
+    # "render" keeps what the stages inside do not cover (pool queueing, pickling, merging)
+    started = time.perf_counter()
+    with stage("render"):
+        if pdf_parallel.enabled():
+            # Segments rendered concurrently in the pool and merged in memory
+            pdf_bytes = await pdf_parallel.render_report(
+                data, person_name, generated_by, template_id, tenant_id
+            )
+        else:
+            # Runs in the render process pool (or a thread when RENDER_POOL_SIZE=0)
+            pdf_path = await render_pool.run(
+                render_personality_pdf_file,
+                data,
+                person_name,
+                generated_by,
+                template_id,
+                tenant_id,
+            )
+            try:
+                with open(pdf_path, "rb") as file:
+                    pdf_bytes = file.read()
+            finally:
+                # Auto delete local file
+                schedule_delete(pdf_path, delay=settings.GENERATED_FILE_TTL_SECONDS)
+    metrics.PDF_DURATION.observe(time.perf_counter() - started, mode=settings.PDF_OUTPUT_MODE)
+    metrics.PDF_BYTES.observe(len(pdf_bytes), mode=settings.PDF_OUTPUT_MODE)
+    with stage("store"):
+        pdf_sha256 = await asyncio.to_thread(content_store.put_bytes, pdf_bytes)
+        pdf_size = await asyncio.to_thread(pdf_size_breakdown, pdf_bytes) or {"total": len(pdf_bytes)}
+    print(f"[PDF SIZE] {filename} ({settings.PDF_OUTPUT_MODE}): {pdf_size}")
+
+    result = {
+        "pdf_sha256": pdf_sha256,
+        "pdf_size": pdf_size,
+        "download_path": f"/report/{pdf_sha256}",
+        "uploaded_url": None,
+    }
+
+    mode = settings.REPORT_REPLICATION if settings.PDF_STORAGE_PATH else "off"
+    if mode == "sync":
+        # Raises UploadError after bounded retries instead of silently returning None
+        result["uploaded_url"] = await replicate_report(pdf_bytes, pdf_sha256, filename)
+    elif mode == "async":
+        replicate_in_background(pdf_bytes, pdf_sha256, filename, on_uploaded)
+    return result
@@ -0,0 +1,171 @@
+"""
+Dedicated process pool for CPU-heavy report rendering.
+
+matplotlib and reportlab run in separate worker processes instead of the web
+worker, so a long render no longer stalls other requests and their font /
+figure / image caches do not accumulate in the web worker's RSS.
+
+- Workers are started from a forkserver that has already imported the PDF
+  stack, and each one renders a throwaway chart on start-up, so the first
+  real job does not pay import and font-cache costs.
+- Each worker is replaced after RENDER_POOL_MAX_JOBS jobs. If a job reports
+  an RSS above RENDER_POOL_MAX_RSS_MB, that worker alone is replaced: new
+  jobs go to a fresh process, the old one exits after its queued jobs, and
+  the other warm workers are kept.
+- Every gunicorn worker has its own pool, so a host runs
+  (gunicorn workers x RENDER_POOL_SIZE) render processes; RENDER_POOL_SIZE
+  is capped at the CPU count. 0 disables the pool and renders in a thread
+  of the web worker, as before.
+"""
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import resource
+import threading
+
+from app.core.config import settings
+from app.utils import metrics, timing
+
+_PRELOAD = ["app.services.pdf_service"]
+
+_slots = []  # [{"executor": single-process executor, "in_flight": jobs}]
+_slots_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"jobs": 0, "recycles": 0, "last_worker_rss_bytes": 0}
+
+
+def _current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to the peak RSS (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _warm_up():
+    """Worker initializer: import the PDF stack and prime matplotlib's font cache."""
+    import io
+    import matplotlib.pyplot as plt
+    from app.services import pdf_service  # noqa: F401  (imports matplotlib + reportlab)
+
+    fig, ax = plt.subplots(figsize=(1, 1), dpi=50)
+    ax.set_title("warm-up")
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
+
+
+def _run_job(fn, args, kwargs, timed=False):
+    try:
+        if not timed:
+            return fn(*args, **kwargs), _current_rss_bytes(), None
+        # The caller is collecting stage timings: collect them here and send them back
+        with timing.collect() as timings:
+            result = fn(*args, **kwargs)
+        return result, _current_rss_bytes(), dict(timings)
+    finally:
+        # Workers exit without atexit handlers when recycled; snapshot after every job
+        metrics.flush()
+
+
+def _noop():
+    return None
+
+
+def _make_executor():
+    # One process per executor, so each worker can be replaced on its own
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload(_PRELOAD)
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=context,
+        initializer=_warm_up,
+        max_tasks_per_child=settings.RENDER_POOL_MAX_JOBS,
+    )
+    executor.submit(_noop)  # start and warm the worker now, not on the first job
+    return executor
+
+
+def enabled():
+    return settings.RENDER_POOL_SIZE > 0
+
+
+def pool_size():
+    """Render processes per web worker: RENDER_POOL_SIZE, capped at the CPU count."""
+    return min(settings.RENDER_POOL_SIZE, os.cpu_count() or 1)
+
+
+def _get_slots():
+    global _slots
+    with _slots_lock:
+        if not _slots:
+            _slots = [{"executor": _make_executor(), "in_flight": 0} for _ in range(pool_size())]
+        return _slots
+
+
+def start():
+    """Spin up and pre-warm all workers (call once at app start-up)."""
+    if enabled():
+        _get_slots()
+        print(f"[RENDER POOL] {pool_size()} render process(es) for this web worker")
+
+
+def _recycle(slot, old):
+    """Replace one oversized worker; it finishes the jobs already queued on it and exits."""
+    with _slots_lock:
+        if slot["executor"] is not old:
+            return  # someone else already recycled it
+        slot["executor"] = _make_executor()
+    old.shutdown(wait=False)
+    with _stats_lock:
+        _stats["recycles"] += 1
+    print("[RENDER POOL] Worker RSS over limit, recycled it")
+
+
+async def run(fn, *args, **kwargs):
+    """Run a picklable top-level function in the render pool (or a thread when disabled)."""
+    if not enabled():
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    slots = _get_slots()
+    with _slots_lock:
+        # The least busy worker; jobs queue on it while all of them are busy
+        slot = min(slots, key=lambda s: s["in_flight"])
+        slot["in_flight"] += 1
+        executor = slot["executor"]
+    try:
+        future = executor.submit(_run_job, fn, args, kwargs, timing.active())
+        result, rss, timings = await asyncio.wrap_future(future)
+    finally:
+        with _slots_lock:
+            slot["in_flight"] -= 1
+    timing.merge(timings)
+
+    with _stats_lock:
+        _stats["jobs"] += 1
+        _stats["last_worker_rss_bytes"] = rss
+    if rss > settings.RENDER_POOL_MAX_RSS_MB * 1024 * 1024:
+        _recycle(slot, executor)
+    return result
+
+
+def shutdown():
+    global _slots
+    with _slots_lock:
+        slots, _slots = _slots, []
+    for slot in slots:
+        slot["executor"].shutdown(wait=True)
+
+
+def pool_stats():
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot["size"] = pool_size() if enabled() else 0
+    return snapshot
+
+
+metrics.mirror_stats("render", pool_stats, totals=("jobs", "recycles"))
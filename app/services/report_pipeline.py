@@ -0,0 +1,103 @@
+"""
+Generating and rendering one report: the steps shared by POST /report/,
+the bulk endpoint and the bulk CLI.
+
+stored_report makes the LLM call and persists its output (once per request
+key); render_and_store renders a stored report into the content store and
+replicates it. Both are safe to repeat: a stored report is found again by
+its key, and a rendered one by its PDF hash.
+"""
+import asyncio
+import json
+import re
+
+from app.core.config import settings
+from app.schemas.models import IntakeParameters, questions
+from app.services import benchmarks, content_store, report_store, score_archive
+from app.services.ai_service import generate_report
+from app.services.branding import get_tenant
+from app.services.idempotency import run_once
+from app.services.pdf_service import generate_personality_pdf_safe, TEMPLATE_VERSION
+from app.services.report_templates import get_template
+from app.utils import metrics
+
+
+async def stored_report(params: IntakeParameters, questionList: questions, key: str):
+    """The saved model output for a request; generated (one LLM call) and stored on first use."""
+    record = await asyncio.to_thread(report_store.find_by_idempotency_key, key)
+    metrics.count_cache("stored_reports", record is not None)
+    if record is None:
+        report_data = (await asyncio.to_thread(generate_report, params, questionList)).strip()
+        # If the model returned an error dict -> return error
+        if isinstance(report_data, dict) and "error" in report_data:
+            raise ValueError(report_data["error"])
+
+        # ✓ Normalize output from AI model
+        if isinstance(report_data, (dict, list)):
+            report_cleaned = report_data
+        else:
+            try:
+                report_cleaned = json.loads(report_data)
+            except Exception:
+                # If not valid JSON → fallback wrapper
+                report_cleaned = {"report": str(report_data)}
+
+        # ✓ Persist the model output so the PDF can be rebuilt without another LLM call
+        # Display name for uploads; keep it a plain file name whatever the person's name holds
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", params.Name).strip("._") or "Report"
+        outname = f"{safe_name}_Personality_Report.pdf"
+        tenant = get_tenant(questionList.tenant)
+        record = await asyncio.to_thread(
+            report_store.save_report,
+            user_id=params.Name,
+            data=report_cleaned,
+            template_version=TEMPLATE_VERSION,
+            person_name=params.Name,
+            # None -> the tenant's default "<company> AI" line at render time
+            generated_by=tenant.generated_by,
+            report_name=outname,
+            template=get_template(questionList.template).id,
+            tenant=tenant.id,
+        )
+        await asyncio.to_thread(report_store.link_idempotency_key, key, record)
+        # Only queues the scores; merged into the shared benchmarks in the background
+        benchmarks.record_report(report_cleaned, record["template"])
+        if settings.SCORE_ARCHIVE_ENABLED:
+            try:
+                await asyncio.to_thread(score_archive.append_report, record)
+            except Exception as e:
+                print(f"[SCORE ARCHIVE ERROR] Append failed for {record['report_id']}: {e}")
+    return record
+
+
+async def render_and_store(record):
+    """Render a stored report, keep it locally, replicate it and update the record."""
+    user_id, report_id = record["user_id"], record["report_id"]
+    rendered = await generate_personality_pdf_safe(
+        filename=record["report_name"],
+        data=record["report"],
+        person_name=record["person_name"],
+        generated_by=record["generated_by"],
+        on_uploaded=lambda url: report_store.update_report(user_id, report_id, uploaded_url=url),
+        template_id=record.get("template"),
+        tenant_id=record.get("tenant"),
+    )
+    fields = {
+        "pdf_sha256": rendered["pdf_sha256"],
+        "pdf_size": rendered["pdf_size"],
+        "template_version": TEMPLATE_VERSION,
+    }
+    if rendered["uploaded_url"]:
+        # With async replication the URL arrives later through on_uploaded
+        fields["uploaded_url"] = rendered["uploaded_url"]
+    return await asyncio.to_thread(report_store.update_report, user_id, report_id, **fields)
+
+
+async def render_once(record):
+    """render_and_store, shared by concurrent requests for the same report."""
+    return await run_once(f"render:{record['report_id']}", lambda: render_and_store(record))
+
+
+def is_complete(record):
+    """Whether a stored report's PDF is available (uploaded, or in the local content store)."""
+    return bool(record.get("uploaded_url")) or content_store.exists(record.get("pdf_sha256"))
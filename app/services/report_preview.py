@@ -0,0 +1,380 @@
+"""
+On-screen report preview (HTML or JSON).
+
+Built from the same model output, report template and tenant branding as the
+PDF, but without matplotlib or reportlab: charts become small specs (labels,
+values, colours) that the JSON preview hands to a client-side chart library
+and the HTML preview draws as inline SVG. The HTML page is a Jinja2 template
+(app/templates/report_preview.html), compiled once per process.
+
+A preview takes a few milliseconds; the PDF is rendered separately, in the
+background or on first download (PREVIEW_PDF).
+"""
+import base64
+import functools
+import math
+import os
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.services import benchmarks, pdf_service
+from app.services.report_templates import get_template
+from app.utils import metrics
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+# Chart titles used by the pdf_service chart creators when the template sets none
+_DEFAULT_TITLES = {
+    "radar": None,
+    "horizontal_bar": "Score Summary",
+    "vertical_bar": "Score Summary",
+    "comparison_bar": "Trait Comparison",
+    "donut": "Strengths Distribution",
+    "gauge": "Risk Profile",
+}
+
+# ---------------------------
+# Chart specs (JSON)
+# ---------------------------
+def chart_spec(kind, value, theme, title=None):
+    """Labels, values and colours of one chart; raises ValueError on unusable data."""
+    title = title or _DEFAULT_TITLES[kind]
+    series = theme["series"]
+    if kind == "gauge":
+        score = max(0.0, min(100.0, float(value)))
+        return {
+            "kind": kind,
+            "title": title,
+            "value": score,
+            "colors": [theme["primary"], theme["gauge_background"]],
+        }
+
+    entries = [e for e in value if isinstance(e, dict) and "field" in e and "value" in e]
+    if not entries:
+        raise ValueError(f"{kind} entries contain no valid items")
+    spec = {
+        "kind": kind,
+        "title": title,
+        "labels": [str(e["field"]) for e in entries],
+        "values": [float(e["value"]) for e in entries],
+    }
+    if kind == "radar":
+        spec["colors"] = [theme["primary"], theme["secondary"]]
+    elif kind == "comparison_bar":
+        spec["benchmark"] = [benchmarks.benchmark(label) for label in spec["labels"]]
+        spec["colors"] = [series[0], series[1]]
+    else:
+        spec["colors"] = [series[i % len(series)] for i in range(len(entries))]
+    return spec
+
+
+def preview_report(data, person_name, generated_by=None, template_id=None, tenant_id=None):
+    """
+    JSON-safe preview of a report: the template's text, the model output and
+    one chart spec per chart that has data (charts are skipped like in the PDF).
+    """
+    template = get_template(template_id)
+    brand = pdf_service.brand_kit(tenant_id)
+    colors = {k: v for k, v in brand.chart_theme.items() if k != "series"}
+    sections = []
+
+    for section in template.sections:
+        if section == "cover":
+            sections.append(
+                {
+                    "kind": "cover",
+                    "subtitle": template.cover_subtitle,
+                    "generated_on": datetime.now().strftime("%B %d, %Y"),
+                    "generated_by": generated_by or brand.generated_by,
+                }
+            )
+        elif section == "static":
+            sections.append(
+                {
+                    "kind": "static",
+                    "overview": template.overview,
+                    "how_to_read": template.how_to_read,
+                }
+            )
+        elif section == "breakdown":
+            report_section = template.get_breakdown(data, default={})
+            items = report_section.items() if isinstance(report_section, dict) else []
+            sections.append(
+                {
+                    "kind": "breakdown",
+                    "title": template.breakdown["title"],
+                    "empty_text": template.breakdown["empty_text"],
+                    "items": [[str(trait), str(desc)] for trait, desc in items],
+                    "cognitive_intro": template.cognitive_intro,
+                }
+            )
+        elif section == "charts":
+            for chart in template.charts:
+                chart_input = chart.bind(data)
+                if chart_input is None:
+                    continue
+                chart_meta, chart_value = chart_input
+                try:
+                    spec = chart_spec(
+                        chart.kind, chart_value, brand.chart_theme, chart.args.get("title")
+                    )
+                except (TypeError, ValueError) as e:
+                    print(f"[WARNING] Skipping chart '{chart.name}' in preview: {e}")
+                    continue
+                sections.append(
+                    {
+                        "kind": "chart",
+                        "title": chart.page_title,
+                        "explanation": str(chart_meta.get("explanation", "")),
+                        "chart": spec,
+                        "rows": pdf_service.chart_data_rows(chart.page_title, chart_meta),
+                        "guide": [list(row) for row in chart.guide],
+                    }
+                )
+        elif section == "closing":
+            sections.append(
+                {
+                    "kind": "closing",
+                    "blocks": [b for b in (template.recommendations, template.next_steps) if b],
+                }
+            )
+
+    return {
+        "title": f"{person_name or ''} Profile Report",
+        "person_name": person_name,
+        "template": template.id,
+        "tenant": brand.id,
+        "brand": {
+            "company_name": brand.company_name,
+            "company_site": brand.company_site,
+            "company_mail": brand.company_mail,
+            "footer_text": brand.footer_text,
+            "colors": colors,
+        },
+        "sections": sections,
+    }
+
+
+# ---------------------------
+# Inline SVG (HTML)
+# ---------------------------
+def _shape(tag, text=None, **attrs):
+    # class_ -> class, font_size -> font-size
+    attrs = {k.rstrip("_").replace("_", "-"): v for k, v in attrs.items()}
+    return {"tag": tag, "attrs": attrs, "text": text}
+
+
+def _r(x):
+    return round(x, 1)
+
+
+def _radar_svg(spec, theme):
+    cx, cy, radius = 260, 190, 130
+    n = len(spec["values"])
+    angles = [-math.pi / 2 + 2 * math.pi * i / n for i in range(n)]
+    shapes = [
+        _shape("circle", cx=cx, cy=cy, r=_r(radius * ring / 100), fill="none",
+               stroke=theme["grid_lines"], stroke_width=0.7)
+        for ring in (25, 50, 75, 100)
+    ]
+    for angle, label in zip(angles, spec["labels"]):
+        x, y = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+        shapes.append(_shape("line", x1=cx, y1=cy, x2=_r(x), y2=_r(y),
+                             stroke=theme["grid_lines"], stroke_width=0.7))
+        lx, ly = cx + (radius + 14) * math.cos(angle), cy + (radius + 14) * math.sin(angle)
+        anchor = "middle" if abs(math.cos(angle)) < 0.3 else ("start" if math.cos(angle) > 0 else "end")
+        shapes.append(_shape("text", label, x=_r(lx), y=_r(ly + 4), text_anchor=anchor,
+                             font_size=11, fill=theme["title"]))
+    points = " ".join(
+        f"{_r(cx + radius * min(v, 100) / 100 * math.cos(a))},"
+        f"{_r(cy + radius * min(v, 100) / 100 * math.sin(a))}"
+        for v, a in zip(spec["values"], angles)
+    )
+    line, fill = spec["colors"]
+    shapes.append(_shape("polygon", points=points, fill=fill, fill_opacity=0.55,
+                         stroke=line, stroke_width=2.5))
+    return {"width": 520, "height": 380, "shapes": shapes}
+
+
+def _bar_axes(shapes, left, top, width, height, theme, horizontal):
+    for tick in (0, 25, 50, 75, 100):
+        if horizontal:
+            x = _r(left + width * tick / 100)
+            shapes.append(_shape("line", x1=x, y1=top, x2=x, y2=top + height,
+                                 stroke="#DDDDDD", stroke_dasharray="4 3"))
+            shapes.append(_shape("text", str(tick), x=x, y=top + height + 16, text_anchor="middle",
+                                 font_size=10, fill=theme["subtle_text"]))
+        else:
+            y = _r(top + height - height * tick / 100)
+            shapes.append(_shape("line", x1=left, y1=y, x2=left + width, y2=y,
+                                 stroke="#DDDDDD", stroke_dasharray="4 3"))
+            shapes.append(_shape("text", str(tick), x=left - 6, y=_r(y + 4), text_anchor="end",
+                                 font_size=10, fill=theme["subtle_text"]))
+
+
+def _title(shapes, spec, theme, width):
+    if spec["title"]:
+        shapes.append(_shape("text", spec["title"], x=width / 2, y=20, text_anchor="middle",
+                             font_size=14, font_weight="bold", fill=theme["primary"]))
+
+
+def _horizontal_bar_svg(spec, theme):
+    n = len(spec["values"])
+    left, top, width, row = 170, 36, 380, 30
+    height = n * row
+    shapes = []
+    _title(shapes, spec, theme, 600)
+    _bar_axes(shapes, left, top, width, height, theme, horizontal=True)
+    for i, (label, value, color) in enumerate(zip(spec["labels"], spec["values"], spec["colors"])):
+        y = top + i * row
+        bar = width * max(0.0, min(value, 100)) / 100
+        shapes.append(_shape("rect", x=left, y=y + 5, width=_r(bar), height=row - 10, fill=color))
+        shapes.append(_shape("text", label, x=left - 8, y=y + row / 2 + 4, text_anchor="end",
+                             font_size=11, fill=theme["title"]))
+        shapes.append(_shape("text", f"{int(value)}", x=_r(left + bar + 4), y=y + row / 2 + 4,
+                             font_size=11, font_weight="bold", fill=theme["primary"]))
+    return {"width": 600, "height": top + height + 26, "shapes": shapes}
+
+
+def _vertical_bar_svg(spec, theme):
+    n = len(spec["values"])
+    left, top, width, height = 50, 36, 530, 220
+    slot = width / n
+    benchmark = spec.get("benchmark")
+    shapes = []
+    _title(shapes, spec, theme, 600)
+    _bar_axes(shapes, left, top, width, height, theme, horizontal=False)
+    for i, (label, value) in enumerate(zip(spec["labels"], spec["values"])):
+        x = left + i * slot
+        if benchmark is None:
+            bars = [(x + slot * 0.2, slot * 0.6, value, spec["colors"][i])]
+        else:
+            bars = [
+                (x + slot * 0.1, slot * 0.4, value, spec["colors"][0]),
+                (x + slot * 0.5, slot * 0.4, benchmark[i], spec["colors"][1]),
+            ]
+        for bx, bw, v, color in bars:
+            bh = height * max(0.0, min(v, 100)) / 100
+            shapes.append(_shape("rect", x=_r(bx), y=_r(top + height - bh), width=_r(bw),
+                                 height=_r(bh), fill=color))
+        if benchmark is None:
+            shapes.append(_shape("text", f"{int(value)}", x=_r(x + slot / 2),
+                                 y=_r(top + height - height * min(value, 100) / 100 - 4),
+                                 text_anchor="middle", font_size=11, font_weight="bold",
+                                 fill=theme["primary"]))
+        shapes.append(_shape("text", label, x=_r(x + slot / 2), y=top + height + 16,
+                             text_anchor="middle", font_size=10, fill=theme["title"]))
+    if benchmark is not None:
+        for j, name in enumerate(("Your Score", "Benchmark")):
+            shapes.append(_shape("rect", x=left + 10 + j * 110, y=top + height + 30, width=12,
+                                 height=12, fill=spec["colors"][j]))
+            shapes.append(_shape("text", name, x=left + 28 + j * 110, y=top + height + 40,
+                                 font_size=11, fill=theme["title"]))
+    return {"width": 600, "height": top + height + (50 if benchmark is not None else 26),
+            "shapes": shapes}
+
+
+def _arc_path(cx, cy, outer, inner, start, end):
+    """Ring segment between two angles (radians, clockwise from 12 o'clock)."""
+    def point(radius, angle):
+        return f"{_r(cx + radius * math.sin(angle))},{_r(cy - radius * math.cos(angle))}"
+
+    large = 1 if end - start > math.pi else 0
+    return (
+        f"M{point(outer, start)} A{outer},{outer} 0 {large} 1 {point(outer, end)} "
+        f"L{point(inner, end)} A{inner},{inner} 0 {large} 0 {point(inner, start)} Z"
+    )
+
+
+def _donut_svg(spec, theme):
+    cx, cy, outer, inner = 260, 215, 150, 105
+    total = sum(v for v in spec["values"] if v > 0) or 1.0
+    shapes = []
+    _title(shapes, spec, theme, 520)
+    start = 0.0
+    for label, value, color in zip(spec["labels"], spec["values"], spec["colors"]):
+        if value <= 0:
+            continue
+        # A full circle cannot be drawn as one arc: stop just short of it
+        sweep = min(2 * math.pi * value / total, 2 * math.pi - 1e-4)
+        shapes.append(_shape("path", d=_arc_path(cx, cy, outer, inner, start, start + sweep),
+                             fill=color, stroke=theme["white"], stroke_width=1))
+        mid = start + sweep / 2
+        mr = (outer + inner) / 2
+        shapes.append(_shape("text", f"{100 * value / total:.1f}%",
+                             x=_r(cx + mr * math.sin(mid)), y=_r(cy - mr * math.cos(mid) + 4),
+                             text_anchor="middle", font_size=10, font_weight="bold",
+                             fill=theme["white"]))
+        lx, ly = cx + (outer + 12) * math.sin(mid), cy - (outer + 12) * math.cos(mid)
+        shapes.append(_shape("text", label, x=_r(lx), y=_r(ly + 4),
+                             text_anchor="start" if math.sin(mid) >= 0 else "end",
+                             font_size=11, fill=theme["title"]))
+        start += sweep
+    return {"width": 520, "height": 390, "shapes": shapes}
+
+
+def _gauge_svg(spec, theme):
+    cx, cy, outer, inner = 200, 170, 140, 105
+    foreground, background = spec["colors"]
+    half = -math.pi / 2  # 9 o'clock
+    shapes = [
+        _shape("path", d=_arc_path(cx, cy, outer, inner, half, math.pi / 2), fill=background)
+    ]
+    if spec["value"] > 0:
+        sweep = math.pi * spec["value"] / 100
+        shapes.append(_shape("path", d=_arc_path(cx, cy, outer, inner, half, half + sweep),
+                             fill=foreground))
+    shapes.append(_shape("text", f"{int(spec['value'])}", x=cx, y=cy - 10, text_anchor="middle",
+                         font_size=48, font_weight="bold", fill=foreground))
+    shapes.append(_shape("text", spec["title"], x=cx, y=cy + 24, text_anchor="middle",
+                         font_size=14, fill=foreground))
+    return {"width": 400, "height": 210, "shapes": shapes}
+
+
+_SVG_BUILDERS = {
+    "radar": _radar_svg,
+    "horizontal_bar": _horizontal_bar_svg,
+    "vertical_bar": _vertical_bar_svg,
+    "comparison_bar": _vertical_bar_svg,
+    "donut": _donut_svg,
+    "gauge": _gauge_svg,
+}
+
+
+def chart_svg(spec, theme):
+    """Viewbox size and SVG shapes ({tag, attrs, text}) for a chart spec."""
+    return _SVG_BUILDERS[spec["kind"]](spec, theme)
+
+
+@functools.lru_cache(maxsize=None)
+def _logo_data_uri(tenant_id):
+    logo = pdf_service.brand_kit(tenant_id).logo
+    mime = "image/jpeg" if logo[:3] == b"\xff\xd8\xff" else "image/png"
+    return f"data:{mime};base64,{base64.b64encode(logo).decode('ascii')}"
+
+
+metrics.mirror_lru_cache("preview_logo", _logo_data_uri)
+
+
+def render_preview_html(preview, pdf_url=None):
+    """Render a preview_report() dict as a standalone HTML page."""
+    theme = dict(preview["brand"]["colors"])
+    sections = [
+        dict(section, svg=chart_svg(section["chart"], theme)) if section["kind"] == "chart" else section
+        for section in preview["sections"]
+    ]
+    return _env.get_template("report_preview.html").render(
+        report=preview,
+        sections=sections,
+        brand=preview["brand"],
+        logo=_logo_data_uri(preview["tenant"]),
+        pdf_url=pdf_url,
+    )
@@ -0,0 +1,180 @@
+"""
+File-backed store for generated report JSON.
+
+Each report is kept as one JSON record under REPORT_STORE_DIR/<user_id>/<report_id>.json
+holding the validated model output, the PDF template version it was rendered
+with and the uploaded URL. Two small indexes sit next to the records:
+_keys/ maps request idempotency keys to reports and _uploads/ maps PDF
+content hashes to the URL they were uploaded to. Writes go to a temp file
+first and are swapped in with os.replace, so concurrent workers never see a
+half-written record. Updates read, merge and rewrite a record under a
+per-user file lock, so two updates of one report (e.g. the render's digest
+and a background upload's URL) cannot drop each other's fields.
+"""
+import fcntl
+import json
+import os
+import re
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def make_user_id(name):
+    """Derive the storage key for a user from the intake name."""
+    user_id = _UNSAFE_CHARS.sub("_", (name or "").strip().replace(" ", "_"))
+    # Leading "_" is reserved for the index directories.
+    return user_id.strip(".").lstrip("_") or "anonymous"
+
+
+def _record_path(user_id, report_id):
+    user_id = make_user_id(user_id)
+    if not re.fullmatch(r"[0-9a-f]{32}", report_id or ""):
+        raise ValueError(f"Invalid report id: {report_id!r}")
+    return os.path.join(settings.REPORT_STORE_DIR, user_id, f"{report_id}.json")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _write_atomic(path, record):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_report(
+    user_id,
+    data,
+    template_version,
+    person_name=None,
+    generated_by=None,
+    report_name=None,
+    template=None,
+    tenant=None,
+):
+    """Persist a freshly generated report and return its record (including the new report_id)."""
+    user_id = make_user_id(user_id)
+    timestamp = _now()
+    record = {
+        "report_id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "person_name": person_name,
+        "generated_by": generated_by,
+        "report_name": report_name,
+        "template": template,
+        "tenant": tenant,
+        "template_version": template_version,
+        "uploaded_url": None,
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "report": data,
+    }
+    _write_atomic(_record_path(user_id, record["report_id"]), record)
+    return record
+
+
+def get_report(user_id, report_id):
+    """Return the stored record, or None if it does not exist."""
+    try:
+        path = _record_path(user_id, report_id)
+    except ValueError:
+        return None
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def _locked(path):
+    # One lock per user directory; "." names never collide with records
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def update_report(user_id, report_id, **fields):
+    """Merge `fields` into an existing record (e.g. uploaded_url, template_version)."""
+    path = _record_path(user_id, report_id)
+    with _locked(path):
+        record = get_report(user_id, report_id)
+        if record is None:
+            raise KeyError(f"Report {report_id} not found for user {user_id}")
+        record.update(fields)
+        record["updated_at"] = _now()
+        _write_atomic(path, record)
+    return record
+
+
+def list_reports(user_id):
+    """Report ids stored for a user, oldest first."""
+    directory = os.path.join(settings.REPORT_STORE_DIR, make_user_id(user_id))
+    if not os.path.isdir(directory):
+        return []
+    entries = [e for e in os.scandir(directory) if e.name.endswith(".json")]
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    return [e.name[: -len(".json")] for e in entries]
+
+
+def _index_path(index, key):
+    if not re.fullmatch(r"[0-9a-f]{64}", key or ""):
+        raise ValueError(f"Invalid index key: {key!r}")
+    return os.path.join(settings.REPORT_STORE_DIR, index, f"{key}.json")
+
+
+def _read_index(index, key):
+    path = _index_path(index, key)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def link_idempotency_key(key, record):
+    """Remember which report a request key produced."""
+    _write_atomic(
+        _index_path("_keys", key),
+        {"user_id": record["user_id"], "report_id": record["report_id"]},
+    )
+
+
+def find_by_idempotency_key(key):
+    """Return the report record produced for a request key, if any."""
+    entry = _read_index("_keys", key)
+    if entry is None:
+        return None
+    return get_report(entry["user_id"], entry["report_id"])
+
+
+def record_upload(pdf_sha256, uploaded_url):
+    """Remember where PDF bytes with this hash were uploaded."""
+    _write_atomic(
+        _index_path("_uploads", pdf_sha256),
+        {"uploaded_url": uploaded_url, "uploaded_at": _now()},
+    )
+
+
+def find_upload(pdf_sha256):
+    """URL of an earlier upload of identical PDF bytes, or None."""
+    entry = _read_index("_uploads", pdf_sha256)
+    return entry.get("uploaded_url") if entry else None
@@ -0,0 +1,431 @@
+"""
+Declarative report templates.
+
+A template describes which sections a report has, where each chart's data
+lives in the model output, and all of its static text. Templates are plain
+dicts; register_template validates one once and compiles it into a
+ReportTemplate with precomputed data accessors, so rendering a report only
+binds data to an already-checked structure.
+
+Several templates can be registered side by side; a report picks one by id
+(get_template), falling back to DEFAULT_TEMPLATE.
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+DEFAULT_TEMPLATE = "personality"
+
+# Section kinds a template can list in "sections", in render order.
+SECTION_KINDS = ("cover", "static", "breakdown", "charts", "closing")
+
+# Chart kinds understood by pdf_service (see CHART_CREATORS there).
+CHART_KINDS = ("radar", "horizontal_bar", "vertical_bar", "comparison_bar", "donut", "gauge")
+
+
+class TemplateError(ValueError):
+    """A template is malformed, or no template is registered under the requested id."""
+
+
+def is_nonempty_list(x):
+    return isinstance(x, list) and len(x) > 0
+
+
+def is_valid_number(x):
+    try:
+        if x is None:
+            return False
+        float(x)
+        return True
+    except Exception:
+        return False
+
+
+VALIDATORS = {"nonempty_list": is_nonempty_list, "number": is_valid_number}
+
+
+def compile_path(path):
+    """Accessor for a dotted path such as "sections.charts.radarChart" (split once, not per call)."""
+    if not isinstance(path, str) or not path or "" in path.split("."):
+        raise TemplateError(f"Invalid data path: {path!r}")
+    keys = tuple(path.split("."))
+
+    def get(obj, default=None):
+        for key in keys:
+            if isinstance(obj, dict) and key in obj:
+                obj = obj[key]
+            else:
+                return default
+        return obj
+
+    return get
+
+
+@dataclass(frozen=True)
+class ChartSection:
+    name: str
+    page_title: str
+    kind: str
+    path: str
+    value_key: str
+    args: dict
+    w: float
+    h: float
+    guide: tuple
+    get_meta: Callable
+    is_valid: Callable
+
+    def bind(self, data):
+        """(chart_meta, chart_value) if the chart's data is present and valid, else None."""
+        chart_meta = self.get_meta(data)
+        if not isinstance(chart_meta, dict):
+            return None
+        chart_value = chart_meta.get(self.value_key)
+        if chart_meta and self.is_valid(chart_value):
+            return chart_meta, chart_value
+        return None
+
+
+@dataclass(frozen=True)
+class ReportTemplate:
+    id: str
+    description: str
+    sections: tuple
+    cover_subtitle: str
+    toc: tuple
+    overview: Optional[dict]
+    how_to_read: Optional[dict]
+    breakdown: Optional[dict]
+    get_breakdown: Optional[Callable]
+    cognitive_intro: Optional[dict]
+    charts: tuple
+    recommendations: Optional[dict]
+    next_steps: Optional[dict]
+
+
+# ---------------------------
+# Validation / compilation
+# ---------------------------
+
+def _require(spec, key, kind, where):
+    value = spec.get(key)
+    if not isinstance(value, kind):
+        raise TemplateError(f"{where}: '{key}' must be {getattr(kind, '__name__', kind)}")
+    return value
+
+
+def _text_block(spec, key, where, fields=("title", "text")):
+    block = spec.get(key)
+    if block is None:
+        return None
+    if not isinstance(block, dict):
+        raise TemplateError(f"{where}: '{key}' must be a dict")
+    for field in fields:
+        _require(block, field, str, f"{where}.{key}")
+    return block
+
+
+def _list_block(spec, key, where):
+    block = _text_block(spec, key, where)
+    if block is not None:
+        items = _require(block, "items", list, f"{where}.{key}")
+        if not all(isinstance(item, str) for item in items):
+            raise TemplateError(f"{where}.{key}: 'items' must be strings")
+    return block
+
+
+def _compile_chart(spec, where):
+    name = _require(spec, "name", str, where)
+    where = f"{where} '{name}'"
+    kind = _require(spec, "kind", str, where)
+    if kind not in CHART_KINDS:
+        raise TemplateError(f"{where}: unknown chart kind {kind!r}")
+    validate = spec.get("validate", "nonempty_list")
+    if validate not in VALIDATORS:
+        raise TemplateError(f"{where}: unknown validator {validate!r}")
+    size = _require(spec, "size_cm", (list, tuple), where)
+    if len(size) != 2 or not all(
+        isinstance(n, (int, float)) and not isinstance(n, bool) and n > 0 for n in size
+    ):
+        raise TemplateError(f"{where}: 'size_cm' must be two positive numbers [width, height]")
+    w, h = size
+    guide = _require(spec, "guide", list, where)
+    if not all(isinstance(row, (list, tuple)) and len(row) == 2 for row in guide):
+        raise TemplateError(f"{where}: 'guide' rows must be [element, description]")
+    path = _require(spec, "path", str, where)
+    return ChartSection(
+        name=name,
+        page_title=_require(spec, "page_title", str, where),
+        kind=kind,
+        path=path,
+        value_key=spec.get("value_key", "data"),
+        args=dict(spec.get("args") or {}),
+        w=float(w),
+        h=float(h),
+        guide=tuple((str(a), str(b)) for a, b in guide),
+        get_meta=compile_path(path),
+        is_valid=VALIDATORS[validate],
+    )
+
+
+def compile_template(spec):
+    """Validate a template dict and return its ReportTemplate. Raises TemplateError."""
+    template_id = _require(spec, "id", str, "template")
+    where = f"template '{template_id}'"
+
+    sections = tuple(_require(spec, "sections", list, where))
+    unknown = [s for s in sections if s not in SECTION_KINDS]
+    if unknown or not sections:
+        raise TemplateError(f"{where}: unknown or empty sections {unknown}")
+    if list(sections) != sorted(sections, key=SECTION_KINDS.index):
+        raise TemplateError(f"{where}: sections must follow the order {SECTION_KINDS}")
+
+    toc = spec.get("toc") or []
+    if not all(isinstance(t, (list, tuple)) and len(t) == 2 and isinstance(t[1], int) for t in toc):
+        raise TemplateError(f"{where}: 'toc' entries must be [title, page]")
+
+    breakdown = _text_block(spec, "breakdown", where, fields=("title", "path", "empty_text"))
+    charts = tuple(
+        _compile_chart(chart, f"{where} chart") for chart in spec.get("charts") or []
+    )
+    template = ReportTemplate(
+        id=template_id,
+        description=spec.get("description", ""),
+        sections=sections,
+        cover_subtitle=spec.get("cover_subtitle", ""),
+        toc=tuple((str(title), page) for title, page in toc),
+        overview=_list_block(spec, "overview", where),
+        how_to_read=_text_block(spec, "how_to_read", where),
+        breakdown=breakdown,
+        get_breakdown=compile_path(breakdown["path"]) if breakdown else None,
+        cognitive_intro=_text_block(spec, "cognitive_intro", where),
+        charts=charts,
+        recommendations=_list_block(spec, "recommendations", where),
+        next_steps=_list_block(spec, "next_steps", where),
+    )
+
+    # Every listed section needs its content
+    needs = {
+        "static": template.overview and template.how_to_read,
+        "breakdown": template.breakdown,
+        "charts": template.charts,
+        "closing": template.recommendations or template.next_steps,
+    }
+    for section in sections:
+        if section in needs and not needs[section]:
+            raise TemplateError(f"{where}: section '{section}' has no content")
+    return template
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+
+_templates = {}
+
+
+def register_template(spec):
+    """Compile and register a template; its id must be new."""
+    template = compile_template(spec)
+    if template.id in _templates:
+        raise TemplateError(f"Template '{template.id}' is already registered")
+    _templates[template.id] = template
+    return template
+
+
+def get_template(template_id=None):
+    template_id = template_id or DEFAULT_TEMPLATE
+    try:
+        return _templates[template_id]
+    except KeyError:
+        raise TemplateError(
+            f"Unknown report template '{template_id}' (available: {', '.join(sorted(_templates))})"
+        ) from None
+
+
+def list_templates():
+    return [{"id": t.id, "description": t.description} for t in _templates.values()]
+
+
+# ---------------------------
+# Built-in templates
+# ---------------------------
+
+_SCORE_SCALE = {
+    "title": "2. How to Read This Report",
+    "text": "Each score reflects the intensity of the corresponding trait, interpreted along a standardized 1–10 scale.",
+    "table_title": "Score Interpretation (1–10 Scale)",
+    "col_widths": [70, 100, 300],
+    "table": [
+        ["Score Range", "Interpretation", "Meaning"],
+        ["1–3", "Low", "Trait is less dominant."],
+        ["4–6", "Balanced", "Represents flexibility."],
+        ["7–10", "High", "Trait strongly defines behavior."],
+    ],
+}
+
+_RADAR = {
+    "name": "Radar Chart",
+    "page_title": "5. Radar Chart of Traits",
+    "path": "sections.charts.radarChart",
+    "kind": "radar",
+    "size_cm": [12, 12],
+    "guide": [
+        ["Axes", "Each axis represents a different personality trait."],
+        ["Value", "The further the point is from the center, the higher the score."],
+    ],
+}
+
+_CORE_BARS = {
+    "name": "Bar Chart",
+    "page_title": "6. Bar Chart Summary (Core Attributes)",
+    "path": "sections.charts.barChart",
+    "kind": "horizontal_bar",
+    "args": {"title": "Core Attribute Summary"},
+    "size_cm": [14, 7],
+    "guide": [
+        ["Bars", "Each horizontal bar represents a core attribute."],
+        ["Length", "The length of the bar corresponds to your score (0-100)."],
+    ],
+}
+
+_GAUGE = {
+    "name": "Gauge Chart",
+    "page_title": "10. Gauge Chart: Risk Profile",
+    "path": "sections.charts.gaugeChart",
+    "value_key": "value",
+    "validate": "number",
+    "kind": "gauge",
+    "args": {"title": "Risk Profile"},
+    "size_cm": [12, 7],
+    "guide": [
+        ["Value", "The value represents the risk profile score."],
+        ["Color", "The color of the gauge indicates the level of risk."],
+    ],
+}
+
+PERSONALITY = {
+    "id": "personality",
+    "description": "Full personality & cognitive profile",
+    "sections": ["cover", "static", "breakdown", "charts", "closing"],
+    "cover_subtitle": "Comprehensive Personality & Cognitive Profile",
+    "toc": [
+        ["Report Overview", 3],
+        ["How to Read This Report", 4],
+        ["Personality Breakdown", 5],
+        ["Cognitive Profile", 6],
+        ["Radar Chart", 7],
+        ["Bar Chart", 8],
+        ["Comparison Chart", 9],
+        ["Donut Chart", 10],
+        ["Gauge Chart", 11],
+        ["Recommendations", 12],
+        ["Next Steps", 13],
+    ],
+    "overview": {
+        "title": "1. Report Overview",
+        "text": "This <b>confidential report</b> summarizes your core personality, cognitive style, and motivational drivers. "
+        "It is structured to provide an easy-to-digest profile for both personal growth and professional development.",
+        "items_title": "Key Components:",
+        "items": ["Trait Breakdown", "Graphical Summaries", "Recommendations"],
+    },
+    "how_to_read": _SCORE_SCALE,
+    "breakdown": {
+        "title": "3. Personality Breakdown",
+        "path": "sections.report",
+        "empty_text": "No personality breakdown data available.",
+    },
+    "cognitive_intro": {
+        "title": "4. Cognitive Profile Overview",
+        "text": "This section details your cognitive functioning. The following chart visualizes your performance across core cognitive domains.",
+    },
+    "charts": [
+        _RADAR,
+        _CORE_BARS,
+        {
+            "name": "Cognitive Chart",
+            "page_title": "7. Cognitive Score Chart",
+            "path": "sections.barChart",  # Note: Different path from other charts
+            "kind": "vertical_bar",
+            "args": {"title": "Cognitive Score Summary"},
+            "size_cm": [14, 7],
+            "guide": [
+                ["Bars", "Each vertical bar represents a cognitive ability."],
+                ["Height", "The height of the bar shows your score."],
+            ],
+        },
+        {
+            "name": "Comparison Chart",
+            "page_title": "8. Trait Comparison Chart",
+            "path": "sections.charts.comparisonTable",
+            "kind": "comparison_bar",
+            "size_cm": [16, 8],
+            "guide": [
+                ["Your Score", "The dark bar representing your score."],
+                [
+                    "Benchmark",
+                    "The lighter bar representing the median score of everyone assessed "
+                    "so far (50 until enough reports exist).",
+                ],
+            ],
+        },
+        {
+            "name": "Donut Chart",
+            "page_title": "9. Donut Chart of Strengths",
+            "path": "sections.charts.donutChart",
+            "kind": "donut",
+            "size_cm": [12, 12],
+            "guide": [
+                ["Slices", "Each slice represents a different strength."],
+                ["Size", "The size of the slice corresponds to the score."],
+            ],
+        },
+        _GAUGE,
+    ],
+    "recommendations": {
+        "title": "11. Career Fit Recommendations",
+        "text": "These recommendations suggest environments and roles where you are likely to thrive.",
+        "items": [
+            "<b>Strengths Leverage:</b> Utilize high openness and strong logical reasoning in roles requiring creativity and analytical problem-solving.",
+            "<b>Growth Areas Focus:</b> Target spontaneous engagement and social energy development through varied networking opportunities.",
+            "<b>Optimal Career Fit:</b> Analytical and structured roles (e.g., data analysis, engineering) are best suited.",
+            "<b>Ideal Environment:</b> Seek environments that provide clear goals and autonomy.",
+        ],
+    },
+    "next_steps": {
+        "title": "12. Next Steps",
+        "text": "Use these steps to integrate your profile results into your development goals.",
+        "items": [
+            "<b>Discuss & Validate</b>: Share this report with a trusted mentor or coach.",
+            "<b>Set a SMART Goal</b>: Choose one 'Growth Area' and set a specific, measurable goal for the next 90 days.",
+            "<b>Track Success</b>: Document instances where your strengths helped you succeed.",
+            "<b>Revisit in Six Months</b>: Personal development is cyclical. Revisit this report to measure growth.",
+        ],
+    },
+}
+
+# Short variant: breakdown plus the three headline charts, no static pages
+PERSONALITY_SUMMARY = {
+    "id": "personality_summary",
+    "description": "Personality breakdown with the headline charts only",
+    "sections": ["cover", "breakdown", "charts"],
+    "cover_subtitle": "Personality Profile Summary",
+    "toc": [
+        ["Personality Breakdown", 3],
+        ["Radar Chart", 5],
+        ["Bar Chart", 6],
+        ["Gauge Chart", 7],
+    ],
+    "breakdown": {
+        "title": "1. Personality Breakdown",
+        "path": "sections.report",
+        "empty_text": "No personality breakdown data available.",
+    },
+    "charts": [
+        dict(_RADAR, page_title="2. Radar Chart of Traits"),
+        dict(_CORE_BARS, page_title="3. Bar Chart Summary (Core Attributes)"),
+        dict(_GAUGE, page_title="4. Gauge Chart: Risk Profile"),
+    ],
+}
+
+register_template(PERSONALITY)
+register_template(PERSONALITY_SUMMARY)
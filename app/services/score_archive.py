@@ -0,0 +1,324 @@
+"""
+Columnar archive of report scores for cohort analytics.
+
+Every generated report appends one row: when it was created, who it was for,
+its tenant and template, and every chart score it contains (radar, bar,
+comparison and donut entries, the gauge value). Each column is a flat binary
+file of fixed-width values under SCORE_ARCHIVE_DIR, read back as a numpy
+memmap, so cohort queries are vectorized numpy over the columns they touch
+and never parse report JSON.
+
+Layout:
+    created.i64                 creation time (unix seconds); its length is the row count
+    user.i32 tenant.i32 template.i32
+                                codes into users.txt / tenants.txt / templates.txt
+                                (append-only, one value per line)
+    c<N>.f32                    one score column per chart entry, NaN where a
+                                report has no such score; names in columns.json,
+                                e.g. "sections.charts.radarChart/curiosity"
+
+Appends hold an exclusive file lock; queries take none. A new score column's
+file is created and padded before columns.json names it, and created.i64 is
+written last, so a crash mid-append leaves longer columns that the next
+append truncates again, and a query never sees a column shorter than the
+row count. The dictionaries are read incrementally and cached per process.
+"""
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.benchmarks import trait_key
+from app.services.report_templates import get_template, is_valid_number
+
+FIXED_COLUMNS = {"created": np.int64, "user": np.int32, "tenant": np.int32, "template": np.int32}
+SCORE_DTYPE = np.float32
+GROUP_BY = ("tenant", "template", "user", "month")
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+# dictionary path -> {"offset": bytes read, "values": [...], "codes": {value: code}}
+_dictionaries = {}
+_dictionaries_lock = threading.Lock()
+
+
+def _dir():
+    return settings.SCORE_ARCHIVE_DIR or os.path.join(settings.REPORT_STORE_DIR, "_scores")
+
+
+def _fixed_path(name):
+    suffix = "i64" if FIXED_COLUMNS[name] is np.int64 else "i32"
+    return os.path.join(_dir(), f"{name}.{suffix}")
+
+
+def _score_path(file_id):
+    return os.path.join(_dir(), f"{file_id}.f32")
+
+
+def report_scores(data, template_id=None, labels=None):
+    """
+    {column name: score} for every chart score in a report's model output;
+    `labels`, if given, is filled with {column name: field as written}.
+    """
+    scores = {}
+    for chart in get_template(template_id).charts:
+        chart_input = chart.bind(data)
+        if chart_input is None:
+            continue
+        value = chart_input[1]
+        if chart.kind == "gauge":
+            scores[chart.path] = float(value)
+            if labels is not None:
+                labels.setdefault(chart.path, chart.args.get("title", chart.name))
+            continue
+        for entry in value:
+            if isinstance(entry, dict) and "field" in entry and is_valid_number(entry.get("value")):
+                column = f"{chart.path}/{trait_key(entry['field'])}"
+                scores[column] = float(entry["value"])
+                if labels is not None:
+                    labels.setdefault(column, str(entry["field"]))
+    return scores
+
+
+# ---------------------------
+# Appending
+# ---------------------------
+@contextmanager
+def _locked():
+    os.makedirs(_dir(), exist_ok=True)
+    with open(os.path.join(_dir(), ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write_json(path, value):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _dictionary(name):
+    """
+    The cached entry for users.txt / tenants.txt / templates.txt, first
+    brought up to date by reading whatever was appended since the last call.
+    """
+    path = os.path.join(_dir(), f"{name}s.txt")
+    with _dictionaries_lock:
+        entry = _dictionaries.get(path)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if entry is None or size < entry["offset"]:
+            # First use, or the archive was replaced
+            entry = _dictionaries[path] = {"offset": 0, "values": [], "codes": {}}
+        if size > entry["offset"]:
+            with open(path, "rb") as f:
+                f.seek(entry["offset"])
+                chunk = f.read(size - entry["offset"])
+            chunk = chunk[: chunk.rfind(b"\n") + 1]  # a line still being written is read next time
+            for value in chunk.decode("utf-8").split("\n")[:-1]:
+                entry["codes"].setdefault(value, len(entry["values"]))
+                entry["values"].append(value)
+            entry["offset"] += len(chunk)
+        return entry
+
+
+def _code(name, value):
+    # Caller holds the archive lock, so no other process appends in between
+    value = " ".join(str(value or "").split())
+    code = _dictionary(name)["codes"].get(value)
+    if code is None:
+        with open(os.path.join(_dir(), f"{name}s.txt"), "a", encoding="utf-8") as f:
+            f.write(value + "\n")
+        code = _dictionary(name)["codes"][value]
+    return code
+
+
+def _fit(path, dtype, rows, fill):
+    """Make a column file exactly `rows` long (drop a torn append / pad a new column)."""
+    itemsize = np.dtype(dtype).itemsize
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size > rows * itemsize:
+        with open(path, "r+b") as f:
+            f.truncate(rows * itemsize)
+    elif size < rows * itemsize:
+        with open(path, "ab") as f:
+            f.truncate(size - size % itemsize)
+            f.seek(0, os.SEEK_END)
+            np.full(rows - (size // itemsize), fill, dtype=dtype).tofile(f)
+
+
+def _append(path, dtype, value):
+    with open(path, "ab") as f:
+        np.asarray([value], dtype=dtype).tofile(f)
+
+
+def append_report(record):
+    """Append one stored report (report_store record) to the archive; returns the row index."""
+    template = get_template(record.get("template"))
+    scores = report_scores(record["report"], template.id)
+    created = record.get("created_at")
+    created = datetime.fromisoformat(created) if created else datetime.now(timezone.utc)
+
+    with _locked():
+        columns_path = os.path.join(_dir(), "columns.json")
+        columns = _read_json(columns_path, {})
+        created_path = _fixed_path("created")
+        rows = os.path.getsize(created_path) // 8 if os.path.exists(created_path) else 0
+
+        new_columns = [name for name in scores if name not in columns]
+        for name in new_columns:
+            columns[name] = f"c{len(columns)}"
+
+        for name, file_id in columns.items():
+            path = _score_path(file_id)
+            _fit(path, SCORE_DTYPE, rows, np.nan)
+            _append(path, SCORE_DTYPE, scores.get(name, np.nan))
+
+        for name in ("user", "tenant", "template"):
+            path = _fixed_path(name)
+            _fit(path, FIXED_COLUMNS[name], rows, -1)
+            value = {"user": record.get("user_id"), "tenant": record.get("tenant"), "template": template.id}[name]
+            _append(path, FIXED_COLUMNS[name], _code(name, value))
+
+        # New columns are published once their files cover every row
+        if new_columns:
+            _write_json(columns_path, columns)
+        # Written last: this is what makes the row visible
+        _append(created_path, np.int64, int(created.timestamp()))
+    return rows
+
+
+# ---------------------------
+# Querying
+# ---------------------------
+def _rows():
+    path = _fixed_path("created")
+    return os.path.getsize(path) // 8 if os.path.exists(path) else 0
+
+
+def _column(path, dtype, rows):
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+
+def _summary(values, percentiles, bins):
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {"count": 0}
+    histogram, _ = np.histogram(values, bins=bins, range=(0, 100))
+    return {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std(ddof=1)), 2) if len(values) > 1 else 0.0,
+        "percentiles": {
+            f"p{p}": round(float(v), 2)
+            for p, v in zip(percentiles, np.percentile(values, percentiles))
+        },
+        "histogram": histogram.tolist(),
+    }
+
+
+def cohort_stats(
+    tenant=None,
+    template=None,
+    user=None,
+    since=None,
+    until=None,
+    traits=None,
+    group_by=None,
+    percentiles=DEFAULT_PERCENTILES,
+    bins=10,
+):
+    """
+    Count, mean, std, percentiles and a histogram (`bins` equal bins over
+    0-100) per score column for the reports matching the filters, optionally
+    per tenant / template / user / month. `traits` limits the columns (full
+    names, or substrings such as "radarChart" or "curiosity"); since / until
+    are datetimes.
+    """
+    if group_by is not None and group_by not in GROUP_BY:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+    rows = _rows()
+    # An append may be under way: skip columns whose file does not cover `rows` yet
+    columns = {
+        name: file_id
+        for name, file_id in _read_json(os.path.join(_dir(), "columns.json"), {}).items()
+        if os.path.exists(_score_path(file_id))
+        and os.path.getsize(_score_path(file_id)) >= rows * np.dtype(SCORE_DTYPE).itemsize
+    }
+    if traits:
+        columns = {
+            name: file_id
+            for name, file_id in columns.items()
+            if any(t == name or t.lower() in name.lower() for t in traits)
+        }
+
+    mask = np.ones(rows, dtype=bool)
+    created = _column(_fixed_path("created"), np.int64, rows)
+    if since is not None:
+        mask &= created >= int(since.timestamp())
+    if until is not None:
+        mask &= created < int(until.timestamp())
+    codes = {}
+    for name, value in (("tenant", tenant), ("template", template), ("user", user)):
+        if value is None and group_by != name:
+            continue
+        codes[name] = _column(_fixed_path(name), np.int32, rows)
+        if value is not None:
+            mask &= codes[name] == _dictionary(name)["codes"].get(value, -2)
+
+    groups = {None: mask}
+    if group_by == "month":
+        months = created.astype("datetime64[s]").astype("datetime64[M]")
+        groups = {str(m): mask & (months == m) for m in np.unique(months[mask])}
+    elif group_by is not None:
+        dictionary = _dictionary(group_by)["values"]
+        # -1 is _fit's padding, not a dictionary entry
+        groups = {
+            dictionary[code]: mask & (codes[group_by] == code)
+            for code in np.unique(codes[group_by][mask])
+            if 0 <= code < len(dictionary)
+        }
+
+    result = {}
+    for group, group_mask in groups.items():
+        result[group] = {
+            "reports": int(group_mask.sum()),
+            "traits": {
+                name: _summary(
+                    np.asarray(_column(_score_path(file_id), SCORE_DTYPE, rows)[group_mask]),
+                    percentiles,
+                    bins,
+                )
+                for name, file_id in columns.items()
+            },
+        }
+    return result[None] if group_by is None else result
+
+
+def archive_stats():
+    """Row and column counts and the archive's size on disk."""
+    size = 0
+    if os.path.isdir(_dir()):
+        size = sum(entry.stat().st_size for entry in os.scandir(_dir()) if entry.is_file())
+    return {
+        "rows": _rows(),
+        "columns": len(_read_json(os.path.join(_dir(), "columns.json"), {})),
+        "bytes": size,
+    }
@@ -0,0 +1,176 @@
+"""
+Upload client for the external report storage (PDF_STORAGE_PATH).
+
+One httpx.AsyncClient is shared per process so connections are kept alive
+between uploads. Every attempt has connect/read timeouts; transport errors,
+429 and 5xx responses are retried with exponential backoff. The multipart
+body is streamed in chunks from the in-memory PDF.
+
+Reports are always kept in the local content store first; replicating them
+here can run inline ("sync") or as a background task ("async"), see
+REPORT_REPLICATION.
+"""
+import asyncio
+import io
+import random
+import threading
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.services import report_store
+from app.utils import metrics
+from app.utils.timing import stage
+
+_client = None
+_background = set()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "uploads": 0,
+    "failures": 0,
+    "retries": 0,
+    "bytes": 0,
+    "latency_seconds_total": 0.0,
+    "latency_seconds_max": 0.0,
+}
+
+
+class UploadError(RuntimeError):
+    """The report could not be uploaded after all retries."""
+
+
+def get_client():
+    """Shared keep-alive client, created on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=settings.UPLOAD_CONNECT_TIMEOUT,
+                read=settings.UPLOAD_READ_TIMEOUT,
+                write=settings.UPLOAD_READ_TIMEOUT,
+                pool=settings.UPLOAD_CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.UPLOAD_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.UPLOAD_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _background:
+        # Give in-flight replications a chance to finish before dropping connections
+        await asyncio.wait(list(_background), timeout=settings.UPLOAD_READ_TIMEOUT)
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _is_retryable(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+async def upload_report(pdf_bytes, filename):
+    """Upload PDF bytes to PDF_STORAGE_PATH and return the public URL from the response."""
+    upload_url = settings.PDF_STORAGE_PATH
+    if not upload_url:
+        raise ValueError("PDF_STORAGE_PATH environment variable is not set")
+
+    attempts = settings.UPLOAD_MAX_RETRIES + 1
+    start = time.monotonic()
+    last_error = None
+
+    for attempt in range(attempts):
+        if attempt:
+            with _stats_lock:
+                _stats["retries"] += 1
+            delay = settings.UPLOAD_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+        # A fresh stream per attempt: a failed attempt may have read part of the last one
+        stream = io.BytesIO(pdf_bytes)
+        try:
+            response = await get_client().post(
+                upload_url,
+                files={"report": (filename, stream, "application/pdf")},
+            )
+        except httpx.TransportError as e:
+            last_error = e
+            continue
+
+        if _is_retryable(response.status_code):
+            last_error = UploadError(f"Storage responded {response.status_code}")
+            continue
+        if response.status_code >= 400:
+            last_error = UploadError(f"Storage rejected upload ({response.status_code}): {response.text[:200]}")
+            break
+
+        # EXPECTED: server returns PUBLIC URL like {"path": "https://..."}
+        try:
+            payload = response.json()
+        except ValueError:
+            last_error = UploadError(f"Upload response is not JSON: {response.text[:200]}")
+            break
+        uploaded_url = payload.get("path") if isinstance(payload, dict) else None
+        if uploaded_url is None:
+            last_error = UploadError("Upload response missing 'path' field.")
+            break
+
+        elapsed = time.monotonic() - start
+        with _stats_lock:
+            _stats["uploads"] += 1
+            _stats["bytes"] += len(pdf_bytes)
+            _stats["latency_seconds_total"] += elapsed
+            _stats["latency_seconds_max"] = max(_stats["latency_seconds_max"], elapsed)
+        metrics.UPLOAD_DURATION.observe(elapsed, outcome="ok")
+        return uploaded_url
+
+    with _stats_lock:
+        _stats["failures"] += 1
+    metrics.UPLOAD_DURATION.observe(time.monotonic() - start, outcome="error")
+    print(f"[UPLOAD ERROR] {filename}: {last_error}")
+    raise UploadError(f"Report upload failed: {last_error}") from last_error
+
+
+async def replicate_report(pdf_bytes, pdf_sha256, filename):
+    """Upload unless identical bytes were already uploaded; return the public URL."""
+    uploaded_url = report_store.find_upload(pdf_sha256)
+    metrics.count_cache("uploads", uploaded_url is not None)
+    if uploaded_url:
+        print(f"[UPLOAD] Skipped, identical PDF already at {uploaded_url}")
+        return uploaded_url
+    with stage("upload"):
+        uploaded_url = await upload_report(pdf_bytes, filename)
+    report_store.record_upload(pdf_sha256, uploaded_url)
+    return uploaded_url
+
+
+def replicate_in_background(pdf_bytes, pdf_sha256, filename, on_uploaded=None):
+    """Start replicate_report as a task; `on_uploaded(url)` runs (in a thread) once it succeeds."""
+
+    async def task():
+        try:
+            uploaded_url = await replicate_report(pdf_bytes, pdf_sha256, filename)
+            if on_uploaded is not None:
+                await asyncio.to_thread(on_uploaded, uploaded_url)
+        except Exception as e:
+            print(f"[REPLICATION ERROR] {filename}: {e}")
+
+    pending = asyncio.get_running_loop().create_task(task())
+    _background.add(pending)
+    pending.add_done_callback(_background.discard)
+    return pending
+
+
+def upload_stats():
+    """Snapshot of upload counts, bytes, retries and latency."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+metrics.mirror_stats(
+    "upload", upload_stats, totals=("uploads", "failures", "retries", "bytes", "latency_seconds_total")
+)
@@ -0,0 +1,473 @@
+"""
+In-process metrics registry with a Prometheus text exposition (GET /metrics).
+
+Counters, gauges and histograms are plain dicts of label values behind one
+lock; recording is a lock and a dict update. The metrics themselves are
+declared at the bottom of this module and recorded where the work happens
+(MetricsMiddleware for HTTP, ai_service, pdf_service, storage_service,
+the PsyPack proxy, ...).
+
+Across processes (gunicorn workers, render pool workers): every process
+writes a snapshot of its values to METRICS_DIR/<pid>-<start>.json, from a
+daemon thread every METRICS_FLUSH_SECONDS (render pool workers after every
+job) and on shutdown. /metrics, served by whichever worker gets the
+request, adds up the snapshots of all processes:
+
+- counters and histograms from every process, alive or not. Snapshots of
+  exited processes are folded into METRICS_DIR/_exited.json under a file
+  lock, so totals never go backwards when a worker is recycled;
+- gauges from live processes only.
+
+A snapshot counts as live only while its PID runs a process that started
+before the snapshot's writer did, so files left by a previous container or
+service run (whose PIDs get reused) are folded, not read as live gauges.
+Values of other processes are up to METRICS_FLUSH_SECONDS old.
+Without METRICS_DIR only the serving process is reported.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from app.core.config import settings
+
+PREFIX = "psymitrix_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = (25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+EXITED_FILE = "_exited.json"
+
+_lock = threading.Lock()
+_metrics = {}
+_collectors = []
+_flusher = None
+_stop = threading.Event()
+_started = time.time_ns()
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        _metrics[self.name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+        _ensure_flusher()
+
+    def set_total(self, value, **labels):
+        """Mirror a cumulative count kept elsewhere (e.g. lru_cache's cache_info)."""
+        with _lock:
+            self.values[self._key(labels)] = float(value)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with _lock:
+            self.values[self._key(labels)] = float(value)
+        _ensure_flusher()
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+        _ensure_flusher()
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # Per-bucket (not cumulative) counts, then sum and count
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+        _ensure_flusher()
+
+
+def collector(fn):
+    """Register `fn()` to run before every snapshot, to set values read from elsewhere (pools, caches)."""
+    _collectors.append(fn)
+    return fn
+
+
+# ---------------------------
+# Snapshots (per process)
+# ---------------------------
+def snapshot():
+    """{metric name: [[label values, value], ...]} of this process."""
+    for fn in _collectors:
+        try:
+            fn()
+        except Exception as e:
+            print(f"[METRICS ERROR] Collector {fn.__name__} failed: {e}")
+    with _lock:
+        return {
+            name: [[list(key), list(value) if isinstance(value, list) else value] for key, value in metric.values.items()]
+            for name, metric in _metrics.items()
+            if metric.values
+        }
+
+
+def _directory():
+    return settings.METRICS_DIR if settings.METRICS_ENABLED and settings.METRICS_DIR else None
+
+
+def _own_file(directory):
+    return os.path.join(directory, f"{os.getpid()}-{_started}.json")
+
+
+def _write_json(path, data):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def flush():
+    """Write this process's snapshot to METRICS_DIR (no-op without one)."""
+    directory = _directory()
+    if directory is None:
+        return
+    data = snapshot()
+    if not data:
+        return  # nothing recorded here (e.g. the forkserver)
+    os.makedirs(directory, exist_ok=True)
+    _write_json(_own_file(directory), data)
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None or _directory() is None:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    while not _stop.wait(settings.METRICS_FLUSH_SECONDS):
+        try:
+            flush()
+        except Exception as e:
+            print(f"[METRICS ERROR] Flush failed: {e}")
+
+
+def shutdown():
+    _stop.set()
+    flush()
+
+
+def _after_fork():
+    # A forked child starts from zero; its parent's values stay the parent's.
+    # The lock may have been held by another thread at fork time.
+    global _lock, _flusher, _stop, _started
+    _lock = threading.Lock()
+    for metric in _metrics.values():
+        metric.values = {}
+    _flusher, _stop, _started = None, threading.Event(), time.time_ns()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+# Only processes that recorded something (not the render pool's forkserver)
+atexit.register(lambda: _flusher is not None and flush())
+
+
+# ---------------------------
+# Aggregation (/metrics)
+# ---------------------------
+_boot_time = None
+
+
+def _process_start(pid):
+    """Wall-clock start time of a process in seconds (Linux /proc), or None if unknown."""
+    global _boot_time
+    try:
+        if _boot_time is None:
+            with open("/proc/stat", "r") as f:
+                _boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime "))
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # Field 22, counted after the parenthesised command name (which may hold spaces)
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+    return _boot_time + ticks / os.sysconf("SC_CLK_TCK")
+
+
+def _alive(pid, started_ns):
+    """
+    Whether the process that wrote a snapshot is still running. A PID alone
+    is not enough: after a restart (fresh container, new systemd unit) PIDs
+    are reused, so the running process must also have started before the
+    snapshot's writer recorded its start (1 s slack: btime is whole seconds).
+    """
+    started = _process_start(pid)
+    if started is not None:
+        return started <= started_ns / 1e9 + 1
+    if os.path.isdir("/proc"):
+        return os.path.exists(f"/proc/{pid}")
+    # No /proc (e.g. macOS): the PID alone
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _add(totals, data, kinds):
+    for name, series in data.items():
+        metric = _metrics.get(name)
+        if metric is None or metric.kind not in kinds:
+            continue
+        values = totals.setdefault(name, {})
+        for key, value in series:
+            key = tuple(key)
+            if isinstance(value, list):
+                current = values.get(key)
+                values[key] = value if current is None or len(current) != len(value) else [a + b for a, b in zip(current, value)]
+            else:
+                values[key] = values.get(key, 0.0) + value
+
+
+def _fold_exited(directory, exited):
+    """Add the counters and histograms of exited processes to _exited.json and remove their files."""
+    with open(os.path.join(directory, EXITED_FILE + ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            path = os.path.join(directory, EXITED_FILE)
+            totals = {}
+            _add(totals, _read_json(path) or {}, ("counter", "histogram"))
+            folded = []
+            for file in exited:
+                if not os.path.exists(file):
+                    continue  # another worker folded it first
+                _add(totals, _read_json(file) or {}, ("counter", "histogram"))
+                folded.append(file)
+            _write_json(path, {name: [[list(k), v] for k, v in values.items()] for name, values in totals.items()})
+            for file in folded:
+                os.remove(file)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def collect_all():
+    """{metric name: {label values: value}} over all processes (just this one without METRICS_DIR)."""
+    directory = _directory()
+    if directory is None:
+        totals = {}
+        _add(totals, snapshot(), ("counter", "gauge", "histogram"))
+        return totals
+
+    flush()
+    files = glob.glob(os.path.join(directory, "*-*.json"))
+    exited = []
+    for file in files:
+        pid, started_ns = os.path.basename(file)[: -len(".json")].split("-", 1)
+        if not _alive(int(pid), int(started_ns)):
+            exited.append(file)
+    if exited:
+        _fold_exited(directory, exited)
+    totals = {}
+    _add(totals, _read_json(os.path.join(directory, EXITED_FILE)) or {}, ("counter", "histogram"))
+    for file in files:
+        if file not in exited:
+            _add(totals, _read_json(file) or {}, ("counter", "gauge", "histogram"))
+    return totals
+
+
+def _format_labels(metric, key, extra=None):
+    pairs = list(zip(metric.labels, key)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def exposition():
+    """All metrics in the Prometheus text format (version 0.0.4)."""
+    totals = collect_all()
+    lines = []
+    for name, metric in _metrics.items():
+        values = totals.get(name)
+        if not values:
+            continue
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for key, value in sorted(values.items()):
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_format_labels(metric, key)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*metric.buckets, math.inf), value):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else _format_value(bound)
+                lines.append(f"{name}_bucket{_format_labels(metric, key, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(metric, key)} {_format_value(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(metric, key)} {int(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# HTTP middleware
+# ---------------------------
+def _route_template(scope):
+    """The matched route's path template, e.g. /report/{pdf_sha256}; "unmatched" for 404s."""
+    route = scope.get("route")  # set by the router
+    regex = getattr(route, "path_regex", None)
+    if regex is None:
+        return "unmatched"
+    # Routes of included routers may only know their path below the include
+    # prefix (FastAPI >= 0.14x); take the prefix from the request path
+    path = scope["path"]
+    for i, char in enumerate(path):
+        if char == "/" and regex.match(path[i:]):
+            return path[:i] + route.path
+    return route.path
+
+
+class MetricsMiddleware:
+    """Request count, latency (per route template, e.g. /report/{pdf_sha256}) and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            path = _route_template(scope)
+            HTTP_REQUESTS.inc(method=scope["method"], route=path, status=status)
+            HTTP_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=path)
+
+
+# ---------------------------
+# Metrics
+# ---------------------------
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency until the response is complete.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+LLM_DURATION = Histogram("llm_request_duration_seconds", "Chat completion latency (excluding rate governor waits).", ("model", "call", "outcome"))
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used by chat completions.", ("model", "type"))
+
+CHART_DURATION = Histogram("chart_render_duration_seconds", "Chart rendering time per chart type (\"sprite\": all charts of a report at once).", ("kind",))
+PDF_DURATION = Histogram("pdf_render_duration_seconds", "Report PDF rendering time, including render pool queueing.", ("mode",))
+PDF_BYTES = Histogram("pdf_size_bytes", "Size of rendered report PDFs.", ("mode",), buckets=BYTES_BUCKETS)
+
+UPLOAD_DURATION = Histogram("upload_duration_seconds", "Report storage upload latency, retries included.", ("outcome",))
+PSYPACK_DURATION = Histogram("psypack_request_duration_seconds", "PsyPack upstream latency.", ("endpoint", "status"))
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result (hit or miss).", ("cache", "result"))
+CACHE_ENTRIES = Gauge("cache_entries", "Entries currently held by a cache.", ("cache",))
+POOL_STATS = Gauge("pool_stats", "Connection and LLM pool usage (current values, summed over live processes).", ("pool", "stat"))
+POOL_TOTALS = Counter("pool_stats_total", "Cumulative connection, render, upload and LLM pool counts.", ("pool", "stat"))
+
+
+def count_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def mirror_lru_cache(cache, fn):
+    """Report a functools.lru_cache's hits, misses and size under `cache`."""
+
+    @collector
+    def _collect():
+        info = fn.cache_info()
+        CACHE_REQUESTS.set_total(info.hits, cache=cache, result="hit")
+        CACHE_REQUESTS.set_total(info.misses, cache=cache, result="miss")
+        CACHE_ENTRIES.set(info.currsize, cache=cache)
+
+    _collect.__name__ = f"lru_cache:{cache}"
+    return fn
+
+
+def mirror_stats(pool, stats, totals=(), gauges=()):
+    """
+    Report values of a `stats()` dict (render_pool.pool_stats, ...) under
+    `pool`: the cumulative counts named in `totals` as pool_stats_total,
+    which keep counting after their process exits, and the current values
+    named in `gauges` as pool_stats. Other keys (maxima, last values,
+    settings) are not exported: added up across workers they mean nothing.
+    """
+
+    @collector
+    def _collect():
+        values = stats()
+        for stat in totals:
+            POOL_TOTALS.set_total(values[stat], pool=pool, stat=stat)
+        for stat in gauges:
+            POOL_STATS.set(values[stat], pool=pool, stat=stat)
+
+    _collect.__name__ = f"stats:{pool}"
+    return stats
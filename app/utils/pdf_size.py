@@ -0,0 +1,72 @@
+# utils/pdf_size.py
+
+import io
+
+try:
+    from pypdf import PdfReader
+    from pypdf.generic import IndirectObject
+except ImportError:  # optional dependency
+    PdfReader = None
+
+
+def _stored_size(ref):
+    # Length of the stream as stored in the file (i.e. after compression)
+    return len(ref.get_object()._data)
+
+
+def _walk_resources(resources, seen, breakdown):
+    resources = resources.get_object() if resources is not None else {}
+
+    for ref in (resources.get("/XObject") or {}).values():
+        if not isinstance(ref, IndirectObject) or ref.idnum in seen:
+            continue
+        seen.add(ref.idnum)
+        xobject = ref.get_object()
+        if xobject.get("/Subtype") == "/Image":
+            breakdown["images"] += _stored_size(ref)
+            breakdown["image_count"] += 1
+            smask = xobject.get("/SMask")
+            if isinstance(smask, IndirectObject) and smask.idnum not in seen:
+                seen.add(smask.idnum)
+                breakdown["images"] += _stored_size(smask)
+        else:
+            breakdown["forms"] += _stored_size(ref)
+            _walk_resources(xobject.get("/Resources"), seen, breakdown)
+
+    for ref in (resources.get("/Font") or {}).values():
+        descriptor = ref.get_object().get("/FontDescriptor")
+        if descriptor is None:
+            continue  # standard 14 font, nothing embedded
+        for key in ("/FontFile", "/FontFile2", "/FontFile3"):
+            font_file = descriptor.get_object().get(key)
+            if isinstance(font_file, IndirectObject) and font_file.idnum not in seen:
+                seen.add(font_file.idnum)
+                breakdown["fonts"] += _stored_size(font_file)
+
+
+def pdf_size_breakdown(pdf_bytes):
+    """
+    Where a PDF's bytes go: stored (compressed) size of images (incl. alpha
+    masks), embedded fonts, form XObjects and page content streams; the rest
+    (object table, dictionaries, metadata) is "other".
+    Returns None when pypdf is not installed.
+    """
+    if PdfReader is None:
+        return None
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    breakdown = {"images": 0, "image_count": 0, "fonts": 0, "forms": 0, "content": 0}
+    seen = set()
+    for page in reader.pages:
+        contents = page.get("/Contents")
+        for ref in contents if isinstance(contents, list) else [contents]:
+            if isinstance(ref, IndirectObject) and ref.idnum not in seen:
+                seen.add(ref.idnum)
+                breakdown["content"] += _stored_size(ref)
+        _walk_resources(page.get("/Resources"), seen, breakdown)
+
+    sized = breakdown["images"] + breakdown["fonts"] + breakdown["forms"] + breakdown["content"]
+    breakdown["other"] = len(pdf_bytes) - sized
+    breakdown["total"] = len(pdf_bytes)
+    breakdown["pages"] = len(reader.pages)
+    return breakdown
@@ -0,0 +1,75 @@
+"""
+Per-request stage timings as a Server-Timing header and a log line.
+
+Every HTTP request runs inside timing.collect(), so the stages it passes
+through (llm, llm_wait, chart_<kind>, story, build, render, store, upload,
+psypack, ...) are recorded, and the response gets
+
+    Server-Timing: llm;dur=2310.4, chart_radar;dur=180.2, build;dur=702.9, total;dur=3390.1
+
+(exclusive milliseconds, see app/utils/timing.py; "total" is the time to
+the response headers). When the request has finished, including a streamed
+body, one JSON record is printed:
+
+    [TIMING] {"method": "POST", "path": "/report/", "status": 200, "total_ms": 3391.0, "stages": {...}}
+
+A plain ASGI middleware: no extra task per request, and streamed responses
+pass through untouched. SERVER_TIMING_ENABLED turns both off. Only requests
+of at least SERVER_TIMING_LOG_MIN_MS (1 s by default) are logged, and never
+the health check or metrics scrapes, so the log stays quiet in production.
+"""
+import json
+import time
+
+from app.core.config import settings
+from app.utils.timing import collect
+
+# Polled by load balancers and Prometheus: header only, no log line
+UNLOGGED_PATHS = frozenset({"/health", "/metrics"})
+
+
+def header_value(timings, total_seconds):
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items() if seconds > 0]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SERVER_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = None
+
+        with collect() as timings:
+
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    value = header_value(timings, time.perf_counter() - started)
+                    message = dict(message, headers=[*message.get("headers", []), (b"server-timing", value.encode("latin-1"))])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                total_ms = (time.perf_counter() - started) * 1000
+                if (
+                    settings.SERVER_TIMING_LOG
+                    and total_ms >= settings.SERVER_TIMING_LOG_MIN_MS
+                    and scope["path"] not in UNLOGGED_PATHS
+                ):
+                    record = {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "total_ms": round(total_ms, 1),
+                        "stages": {name: round(seconds * 1000, 1) for name, seconds in timings.items()},
+                    }
+                    print(f"[TIMING] {json.dumps(record)}")
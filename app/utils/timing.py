@@ -0,0 +1,83 @@
+"""
+Per-stage wall-clock timings.
+
+Code marks its stages with `with stage("charts"):`; a caller that wants the
+numbers wraps the work in `with collect() as timings:` and gets
+{stage: seconds} afterwards. Stage times are exclusive: a stage nested in
+another is subtracted from its parent, so the values add up to the total.
+Outside collect() a stage costs one context-variable lookup.
+
+The collector and the enclosing stage live in ContextVars, so they follow
+the work into asyncio tasks and asyncio.to_thread calls started inside
+collect(); work running concurrently under one collector (a bulk batch)
+adds up, so stage times can exceed the wall-clock time. Stages measured in
+another process are added with merge() (see render_pool).
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("timings", default=None)
+_parent = contextvars.ContextVar("timing_stage", default=None)
+
+
+class Timings(dict):
+    """{stage: seconds}; add() is safe from several threads at once."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self[name] = self.get(name, 0.0) + seconds
+
+
+@contextmanager
+def collect():
+    """Collect the stages run inside the block into a Timings dict."""
+    timings = Timings()
+    token = _current.set(timings)
+    parent_token = _parent.set(None)
+    try:
+        yield timings
+    finally:
+        _parent.reset(parent_token)
+        _current.reset(token)
+
+
+def active():
+    """True inside collect()."""
+    return _current.get() is not None
+
+
+@contextmanager
+def stage(name):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    parent = _parent.get()
+    token = _parent.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _parent.reset(token)
+        timings.add(name, elapsed)
+        if parent is not None:
+            timings.add(parent, -elapsed)
+
+
+def merge(timings):
+    """Add {stage: seconds} measured elsewhere (e.g. a worker process) as if run in the current stage."""
+    current = _current.get()
+    if current is None or not timings:
+        return
+    for name, seconds in timings.items():
+        current.add(name, seconds)
+    parent = _parent.get()
+    if parent is not None:
+        current.add(parent, -sum(timings.values()))
@@ -0,0 +1,485 @@
+"""
+End-to-end load test of the API.
+
+    python -m benchmarks.loadtest run --spawn --workers 2 --concurrency 16 --rate 8 --duration 60
+    python -m benchmarks.loadtest run --target http://localhost:8001 --server-pid 1234
+    python -m benchmarks.loadtest compare before.json after.json
+
+--spawn starts everything locally: the stand-in upstreams
+(app.cli.standin, with --upstream-latency-ms / --upstream-jitter-ms /
+--upstream-error-rate) and the app under uvicorn or gunicorn, pointed at
+them with its own report store, content store and metrics directory in a
+temporary directory.
+Otherwise --target is an app that is already running.
+
+Requests are drawn from --mix (weights per endpoint, see ENDPOINTS). With
+--rate they arrive open-loop (Poisson, --seed) and at most --concurrency are
+in flight; latency is counted from the scheduled arrival, so time spent
+queueing behind a saturated server shows up in the percentiles. Without
+--rate, --concurrency clients send back to back (closed loop).
+
+The result file (--out, default benchmarks/results/<time>.json) holds the
+settings, p50/p95/p99 latency, throughput, status codes and error rate per
+endpoint and overall, and the peak RSS of every server process (sampled
+from /proc). "compare" prints the change between two result files.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+PERCENTILES = (50, 95, 99)
+
+
+# ---------------------------
+# Workload
+# ---------------------------
+def _intake(i):
+    return {
+        # A distinct name per request, so report idempotency does not turn the
+        # run into cache hits
+        "params": {"Name": f"Load Test {i}", "Gender": "Female", "Occupation": "Engineer"},
+        "questionList": {
+            "questions": [
+                {"question": "How do you recharge?", "question_type": "simple_q_and_a", "answer": "A long walk, alone."}
+            ],
+        },
+    }
+
+
+# name: (method, path, request kwargs for request i, expected content type)
+ENDPOINTS = {
+    "questions": lambda i: ("POST", "/questions/", {"json": _intake(i)}, "application/json"),
+    "report": lambda i: ("POST", "/report/", {"json": _intake(i)}, "application/json"),
+    "psy_list": lambda i: ("GET", "/psy/assessments/list", {}, "application/json"),
+    "psy_initiate": lambda i: (
+        "POST",
+        "/psy/assessments/initiate",
+        {"params": {"assessment_id": "stand-in-big5"}, "json": {"name": f"Load Test {i}", "email": f"load{i}@example.com"}},
+        "application/json",
+    ),
+    "psy_status": lambda i: (
+        "GET",
+        "/psy/assessments/status/",
+        {"params": {"user_assessment_id": f"load-{i}"}},
+        "application/json",
+    ),
+    "psy_report": lambda i: (
+        "POST",
+        "/psy/assessments/generate-report",
+        {"params": {"report_id": f"load-{i}"}, "json": {"sections": ["all"]}},
+        "application/pdf",
+    ),
+}
+DEFAULT_MIX = "questions=3,report=1,psy_list=2,psy_initiate=1,psy_status=2,psy_report=1"
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r} in --mix (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ---------------------------
+# Local servers
+# ---------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"[LOADTEST ERROR] {url} exited with {process.returncode} during startup")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise SystemExit(f"[LOADTEST ERROR] {url} not ready after {timeout}s")
+
+
+class LocalStack:
+    """The stand-in upstreams plus the app, started for one run and torn down after it."""
+
+    def __init__(self, args):
+        self.args = args
+        self.processes = []
+        self.workdir = tempfile.mkdtemp(prefix="loadtest-")
+
+    def _start(self, command, env=None):
+        log = open(os.path.join(self.workdir, f"{len(self.processes)}.log"), "w")
+        process = subprocess.Popen(
+            command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+        self.processes.append(process)
+        return process
+
+    def start(self):
+        args = self.args
+        standin_port, app_port = _free_port(), _free_port()
+        standin = self._start(
+            [
+                sys.executable, "-m", "app.cli.standin", "--port", str(standin_port),
+                "--latency-ms", str(args.upstream_latency_ms),
+                "--jitter-ms", str(args.upstream_jitter_ms),
+                "--error-rate", str(args.upstream_error_rate),
+                "--seed", str(args.seed),
+            ]
+        )
+        upstream = f"http://127.0.0.1:{standin_port}"
+        _wait_ready(f"{upstream}/stats", standin)
+
+        env = dict(os.environ)
+        env.update(
+            OPENAI_BASE_URL=f"{upstream}/v1",
+            PSYPACK_BASE_URL=f"{upstream}/api",
+            PDF_STORAGE_PATH=f"{upstream}/upload",
+            REPORT_STORE_DIR=os.path.join(self.workdir, "report_store"),
+            CONTENT_STORE_DIR=os.path.join(self.workdir, "report_files"),
+            # Snapshots of this run only, not mixed into the repository's metrics/
+            METRICS_DIR=os.path.join(self.workdir, "metrics"),
+        )
+        # Required settings the routes under test never use
+        for name in ("OPEN_AI_API", "SQL_HOST", "SQL_USER", "SQL_PASSWORD", "SQL_DATABASE"):
+            env.setdefault(name, "stand-in")
+        if args.server == "gunicorn":
+            if shutil.which("gunicorn") is None:
+                raise SystemExit("[LOADTEST ERROR] gunicorn is not installed")
+            command = [
+                "gunicorn", "app.main:app", "-k", "uvicorn.workers.UvicornWorker",
+                "-w", str(args.workers), "-b", f"127.0.0.1:{app_port}",
+            ]
+        else:
+            command = [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--port", str(app_port), "--workers", str(args.workers), "--log-level", "warning",
+            ]
+        self.app = self._start(command, env)
+        self.url = f"http://127.0.0.1:{app_port}"
+        _wait_ready(f"{self.url}/health", self.app)
+        return self
+
+    def stop(self):
+        for process in reversed(self.processes):
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGTERM)
+                try:
+                    process.wait(timeout=20)
+                except subprocess.TimeoutExpired:
+                    os.killpg(process.pid, signal.SIGKILL)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+# ---------------------------
+# Worker memory
+# ---------------------------
+def _process_tree(pid):
+    pids, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        pids.append(current)
+        try:
+            for tid in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{tid}/children") as f:
+                    todo.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _cmdline(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace").strip()[:120]
+    except OSError:
+        return ""
+
+
+async def sample_rss(pid, processes, totals, interval=0.5):
+    """Record the peak and last RSS of `pid` and its descendants until cancelled."""
+    while True:
+        total = 0.0
+        for child in _process_tree(pid):
+            rss = _rss_mb(child)
+            if rss is None:
+                continue
+            total += rss
+            entry = processes.setdefault(str(child), {"cmd": _cmdline(child), "peak_mb": 0.0})
+            entry["peak_mb"] = round(max(entry["peak_mb"], rss), 1)
+            entry["last_mb"] = round(rss, 1)
+        totals.append(total)
+        await asyncio.sleep(interval)
+
+
+# ---------------------------
+# Load
+# ---------------------------
+async def _send(client, name, i, scheduled, samples, warmup_until):
+    method, path, kwargs, expected = ENDPOINTS[name](i)
+    sample = {"endpoint": name, "start": scheduled}
+    try:
+        response = await client.request(method, path, **kwargs)
+        await response.aread()
+        sample["status"] = response.status_code
+        content_type = response.headers.get("content-type", "")
+        sample["ok"] = response.status_code < 400 and content_type.startswith(expected)
+    except httpx.HTTPError as e:
+        sample.update(status=type(e).__name__, ok=False)
+    sample["latency"] = time.perf_counter() - scheduled
+    if scheduled >= warmup_until:
+        samples.append(sample)
+
+
+async def run_load(url, args, mix):
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    samples = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    started = time.perf_counter()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.duration
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        if args.rate:
+            slots = asyncio.Semaphore(args.concurrency)
+            tasks = set()
+
+            async def arrival(name, i, scheduled):
+                async with slots:
+                    await _send(client, name, i, scheduled, samples, warmup_until)
+
+            i, scheduled = 0, started
+            while scheduled < deadline:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(arrival(rng.choices(names, weights)[0], i, scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                i += 1
+                scheduled += rng.expovariate(args.rate)
+            if tasks:
+                await asyncio.wait(tasks)
+        else:
+            counter = iter(range(sys.maxsize))
+
+            async def client_loop():
+                while time.perf_counter() < deadline:
+                    await _send(client, rng.choices(names, weights)[0], next(counter), time.perf_counter(), samples, warmup_until)
+
+            await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+    return samples, time.perf_counter() - warmup_until
+
+
+def summarize(samples, seconds):
+    def stats(group):
+        latencies = np.array([s["latency"] for s in group]) * 1000
+        statuses = {}
+        for s in group:
+            statuses[str(s["status"])] = statuses.get(str(s["status"]), 0) + 1
+        errors = sum(not s["ok"] for s in group)
+        result = {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4) if group else 0.0,
+            "throughput_rps": round(len(group) / seconds, 2) if seconds else 0.0,
+            "status": statuses,
+        }
+        if len(latencies):
+            result["mean_ms"] = round(float(latencies.mean()), 1)
+            result["max_ms"] = round(float(latencies.max()), 1)
+            for p in PERCENTILES:
+                result[f"p{p}_ms"] = round(float(np.percentile(latencies, p)), 1)
+        return result
+
+    endpoints = {}
+    for name in ENDPOINTS:
+        group = [s for s in samples if s["endpoint"] == name]
+        if group:
+            endpoints[name] = stats(group)
+    return stats(samples), endpoints
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _measure(url, server_pid, args, mix):
+    processes, totals = {}, []
+    sampler = asyncio.create_task(sample_rss(server_pid, processes, totals)) if server_pid else None
+    try:
+        samples, seconds = await run_load(url, args, mix)
+    finally:
+        if sampler:
+            sampler.cancel()
+    rss = None
+    if sampler:
+        rss = {"peak_total_mb": round(max(totals, default=0.0), 1), "processes": processes}
+    return samples, seconds, rss
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    stack = None
+    if args.spawn:
+        print(f"[LOADTEST] Starting stand-ins and {args.workers} {args.server} worker(s)")
+        stack = LocalStack(args).start()
+        url, server_pid = stack.url, stack.app.pid
+    elif args.target:
+        url, server_pid = args.target.rstrip("/"), args.server_pid
+    else:
+        raise SystemExit("[LOADTEST ERROR] pass --spawn or --target")
+
+    load = f"{args.rate}/s open loop" if args.rate else "closed loop"
+    print(f"[LOADTEST] {url}: {load}, concurrency {args.concurrency}, {args.warmup}s warmup + {args.duration}s")
+    try:
+        samples, seconds, rss = asyncio.run(_measure(url, server_pid, args, mix))
+    finally:
+        if stack:
+            stack.stop()
+
+    overall, endpoints = summarize(samples, seconds)
+    result = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "target": None if args.spawn else url,
+            "settings": {
+                key: value for key, value in vars(args).items() if key not in ("func", "out", "raw")
+            },
+        },
+        "summary": dict(overall, seconds=round(seconds, 2)),
+        "endpoints": endpoints,
+        "rss": rss,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    if args.raw:
+        with open(args.raw, "w", encoding="utf-8") as f:
+            for sample in samples:
+                f.write(json.dumps(dict(sample, start=round(sample["start"], 4), latency=round(sample["latency"], 4))) + "\n")
+
+    print_table({"all": overall, **endpoints})
+    if rss:
+        print(f"[LOADTEST] Peak server RSS: {rss['peak_total_mb']} MB over {len(rss['processes'])} processes")
+    print(f"[LOADTEST] Results written to {out}")
+    return 1 if not samples else 0
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+COLUMNS = ("requests", "throughput_rps", "error_rate", "p50_ms", "p95_ms", "p99_ms")
+
+
+def print_table(rows):
+    print(f"{'endpoint':<14}" + "".join(f"{c:>16}" for c in COLUMNS))
+    for name, row in rows.items():
+        print(f"{name:<14}" + "".join(f"{row.get(c, '-'):>16}" for c in COLUMNS))
+
+
+def compare(args):
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    def cell(old, new):
+        if old is None or new is None:
+            return f"{'-':>30}"
+        change = f" ({(new - old) / old:+.0%})" if old else ""
+        return f"{f'{old} -> {new}{change}':>30}"
+
+    before_rows = {"all": before["summary"], **before["endpoints"]}
+    after_rows = {"all": after["summary"], **after["endpoints"]}
+    print(f"{'endpoint':<14}" + "".join(f"{c:>30}" for c in COLUMNS[1:]))
+    for name in dict.fromkeys([*before_rows, *after_rows]):
+        old, new = before_rows.get(name, {}), after_rows.get(name, {})
+        print(f"{name:<14}" + "".join(cell(old.get(c), new.get(c)) for c in COLUMNS[1:]))
+    if before.get("rss") and after.get("rss"):
+        print(f"{'peak RSS MB':<14}{cell(before['rss']['peak_total_mb'], after['rss']['peak_total_mb'])}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Load test the API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a load test")
+    run_parser.add_argument("--spawn", action="store_true", help="start stand-in upstreams and the app locally")
+    run_parser.add_argument("--target", help="base URL of an app that is already running")
+    run_parser.add_argument("--server-pid", type=int, help="with --target: sample RSS of this process and its children")
+    run_parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    run_parser.add_argument("--workers", type=int, default=1, help="with --spawn: app worker processes")
+    run_parser.add_argument("--concurrency", type=int, default=8, help="requests in flight (closed loop: clients)")
+    run_parser.add_argument("--rate", type=float, default=0, help="arrivals per second (0 = closed loop)")
+    run_parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    run_parser.add_argument("--timeout", type=float, default=120, help="per-request timeout (seconds)")
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint weights, e.g. 'report=1,questions=2'")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--upstream-latency-ms", type=float, default=300, help="with --spawn: stand-in latency")
+    run_parser.add_argument("--upstream-jitter-ms", type=float, default=100)
+    run_parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    run_parser.add_argument("--out", help="result JSON (default: benchmarks/results/<time>.json)")
+    run_parser.add_argument("--raw", help="also write every request as a JSONL line here")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(func=compare)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Stage-level benchmark of the PDF pipeline (app/services/pdf_service.py).
+
+    python -m benchmarks.pdf_pipeline
+    python -m benchmarks.pdf_pipeline --baseline benchmarks/pdf_baseline.json
+    python -m benchmarks.pdf_pipeline --set PDF_OUTPUT_MODE=compact --out compact.json
+    python -m benchmarks.pdf_pipeline --save-baseline
+
+Fixtures are the two sample reports in the repo root (question_report_data,
+new_response_data) plus synthetic reports of increasing size (small, medium,
+large: more report sections, longer paragraphs, more chart entries), all
+generated from a fixed seed.
+
+Every fixture is rendered --warmup times untimed, then --repeat times. Each
+run times every chart creator on its own (chart.<name>), then a full
+generate_personality_pdf broken into its stages (stage.brand, stage.charts,
+stage.story, stage.build and a stage.chart_<kind> per chart creator; see
+app/utils/timing.py) and the total. Each metric is reported as min / median
+/ mean / stdev in milliseconds, along with the output size and where its
+bytes go.
+
+With --baseline, medians and sizes are compared against a saved result and
+changes beyond --threshold are flagged (--fail-on-regression exits 1 on a
+slowdown). --save-baseline writes the result to benchmarks/pdf_baseline.json.
+Baselines are only comparable on the same machine and settings; both are
+recorded in the file.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(REPO_ROOT, "benchmarks", "pdf_baseline.json")
+STAGES = ("brand", "charts", "story", "build")
+# Settings that change what the pipeline does; recorded with every result
+PIPELINE_SETTINGS = (
+    "PDF_CHART_RENDER",
+    "PDF_CHART_LAYOUT",
+    "PDF_OUTPUT_MODE",
+    "PDF_COMPACT_DPI",
+    "PDF_COMPACT_COLORS",
+)
+# Synthetic report sizes: (report sections, words per paragraph, entries per chart).
+# Chart explanations stay at EXPLANATION_WORDS: a chart page is a single page.
+SYNTHETIC_SIZES = {
+    "small": (4, 60, 4),
+    "medium": (8, 150, 6),
+    "large": (24, 400, 12),
+}
+EXPLANATION_WORDS = 60
+
+
+# ---------------------------
+# Fixtures
+# ---------------------------
+def _load(name):
+    with open(os.path.join(REPO_ROOT, name), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    # new_response_data.json holds the model output as a JSON string
+    return json.loads(data) if isinstance(data, str) else data
+
+
+def synthetic_report(size, sample, seed=0):
+    """A report shaped like `sample` with SYNTHETIC_SIZES[size] sections, paragraph words and chart entries."""
+    sections, words_per_paragraph, entries = SYNTHETIC_SIZES[size]
+    rng = random.Random(f"{seed}:{size}")
+    words = " ".join(sample["sections"]["report"].values()).split()
+    fields = sorted({e["field"] for chart in sample["sections"]["charts"].values() for e in chart.get("data", [])})
+
+    def paragraph(length=words_per_paragraph):
+        start = rng.randrange(len(words))
+        return " ".join(words[(start + i) % len(words)] for i in range(length))
+
+    def entries_for(total=None):
+        picked = [fields[i % len(fields)] + ("" if i < len(fields) else f" {i // len(fields) + 1}") for i in range(entries)]
+        values = [rng.randint(40, 95) for _ in picked]
+        if total:
+            # Donut slices are shares of a whole
+            values = [round(total * v / sum(values)) for v in values]
+        return [{"field": f, "value": v} for f, v in zip(picked, values)]
+
+    report = {}
+    for i, title in enumerate(sample["sections"]["report"]):
+        if i < sections:
+            report[title] = paragraph()
+    for i in range(len(report), sections):
+        report[f"Trait {i + 1}"] = paragraph()
+
+    charts = {}
+    for key, chart in sample["sections"]["charts"].items():
+        charts[key] = dict(chart, explanation=paragraph(EXPLANATION_WORDS))
+        if "data" in chart:
+            charts[key]["data"] = entries_for(100 if key == "donutChart" else None)
+        else:
+            charts[key]["value"] = rng.randint(40, 95)
+    return {"sections": {"report": report, "charts": charts}}
+
+
+def load_fixtures(names=None):
+    """{name: report data} for the requested fixture names (all when None)."""
+    sample = _load("new_response_data.json")
+    fixtures = {
+        "question_report_data": lambda: _load("question_report_data.json"),
+        "new_response_data": lambda: sample,
+    }
+    for size in SYNTHETIC_SIZES:
+        fixtures[f"synthetic_{size}"] = lambda size=size: synthetic_report(size, sample)
+    unknown = set(names or ()) - set(fixtures)
+    if unknown:
+        raise SystemExit(f"Unknown fixture(s) {', '.join(sorted(unknown))} (choose from {', '.join(fixtures)})")
+    return {name: load() for name, load in fixtures.items() if not names or name in names}
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+def _summary(seconds):
+    ms = [s * 1000 for s in seconds]
+    return {
+        "runs": len(ms),
+        "min_ms": round(min(ms), 2),
+        "median_ms": round(statistics.median(ms), 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+        "stdev_ms": round(statistics.stdev(ms), 2) if len(ms) > 1 else 0.0,
+    }
+
+
+def bench_fixture(data, repeat, warmup, template_id=None, tenant_id=None):
+    from app.services.pdf_service import CHART_CREATORS, brand_kit, generate_personality_pdf
+    from app.services.report_templates import get_template
+    from app.utils.pdf_size import pdf_size_breakdown
+    from app.utils.timing import collect
+
+    template = get_template(template_id)
+    theme = brand_kit(tenant_id).chart_theme
+    charts = [(chart, chart.bind(data)) for chart in template.charts]
+    samples = {}
+
+    def record(metric, seconds, timed):
+        if timed:
+            samples.setdefault(metric, []).append(seconds)
+
+    pdf = b""
+    for run in range(warmup + repeat):
+        timed = run >= warmup
+        gc.collect()
+        for chart, bound in charts:
+            if bound is None:
+                continue
+            started = time.perf_counter()
+            CHART_CREATORS[chart.kind](bound[1], placed_width_cm=chart.w, theme=theme, **chart.args)
+            record(f"chart.{chart.name}", time.perf_counter() - started, timed)
+
+        gc.collect()
+        buffer = io.BytesIO()
+        started = time.perf_counter()
+        with collect() as timings:
+            generate_personality_pdf(
+                buffer, data, person_name="Benchmark Person", generated_by="Benchmark",
+                template_id=template_id, tenant_id=tenant_id,
+            )
+        record("total", time.perf_counter() - started, timed)
+        for name in (*STAGES, *sorted(set(timings) - set(STAGES))):
+            record(f"stage.{name}", timings.get(name, 0.0), timed)
+        pdf = buffer.getvalue()
+
+    output = {"bytes": len(pdf)}
+    breakdown = pdf_size_breakdown(pdf)
+    if breakdown:
+        output.update(breakdown)
+    return {"timings": {metric: _summary(seconds) for metric, seconds in samples.items()}, "output": output}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _apply_overrides(pairs):
+    from app.core.config import settings
+
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        if name not in PIPELINE_SETTINGS:
+            raise SystemExit(f"--set supports {', '.join(PIPELINE_SETTINGS)}")
+        # Coerce to the type of the current value (ints stay ints)
+        setattr(settings, name, type(getattr(settings, name))(value))
+
+
+def run(args):
+    _apply_overrides(args.set)
+    from app.core.config import settings
+
+    fixtures = load_fixtures(args.fixtures)
+    result = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": f"{platform.machine()} {platform.processor() or ''}".strip(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "template": args.template,
+            "tenant": args.tenant,
+            "settings": {name: getattr(settings, name) for name in PIPELINE_SETTINGS},
+        },
+        "fixtures": {},
+    }
+    for name, data in fixtures.items():
+        print(f"[PDFBENCH] {name}: {args.warmup} warmup + {args.repeat} runs", file=sys.stderr)
+        result["fixtures"][name] = bench_fixture(data, args.repeat, args.warmup, args.template, args.tenant)
+    return result
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def print_result(result):
+    for name, fixture in result["fixtures"].items():
+        output = fixture["output"]
+        print(f"\n{name}  ({output['bytes'] / 1024:.1f} KB)")
+        print(f"  {'metric':<28}{'min':>10}{'median':>10}{'mean':>10}{'stdev':>10}")
+        for metric, stats in fixture["timings"].items():
+            print(
+                f"  {metric:<28}{stats['min_ms']:>10}{stats['median_ms']:>10}"
+                f"{stats['mean_ms']:>10}{stats['stdev_ms']:>10}"
+            )
+
+
+def compare(result, baseline, threshold):
+    """Print median and size changes against `baseline`; returns the metrics that got slower beyond `threshold`."""
+    if baseline["meta"].get("settings") != result["meta"]["settings"]:
+        print(f"\n[PDFBENCH] Settings differ from the baseline: {baseline['meta'].get('settings')}")
+    regressions = []
+    for name, fixture in result["fixtures"].items():
+        old = baseline["fixtures"].get(name)
+        if old is None:
+            continue
+        print(f"\n{name} vs baseline ({baseline['meta'].get('git_commit')})")
+        rows = [
+            (metric, old["timings"][metric]["median_ms"], stats["median_ms"], stats["stdev_ms"])
+            for metric, stats in fixture["timings"].items()
+            if metric in old["timings"]
+        ]
+        rows.append(("bytes", old["output"]["bytes"], fixture["output"]["bytes"], 0))
+        for metric, before, after, stdev in rows:
+            change = (after - before) / before if before else 0.0
+            # Beyond the threshold and beyond this run's own noise
+            flagged = abs(change) > threshold and abs(after - before) > 2 * stdev
+            worse, better = ("LARGER", "smaller") if metric == "bytes" else ("SLOWER", "faster")
+            mark = (worse if change > 0 else better) if flagged else ""
+            if flagged and change > 0:
+                regressions.append(f"{name}:{metric}")
+            print(f"  {metric:<28}{before:>12}{after:>12}{change:>+9.1%}  {mark}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pdf_pipeline", description="Benchmark the PDF pipeline stage by stage.")
+    parser.add_argument("--fixtures", nargs="+", help="fixture names (default: all)")
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per fixture")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per fixture first")
+    parser.add_argument("--template", help="report template id (default template when omitted)")
+    parser.add_argument("--tenant", help="branding profile id")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a PDF setting, e.g. PDF_OUTPUT_MODE=compact")
+    parser.add_argument("--out", help="write the result JSON here")
+    parser.add_argument("--baseline", help="compare against this result file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the result to {os.path.relpath(BASELINE_FILE, REPO_ROOT)}")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change flagged in the comparison")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 when a metric got slower than the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Render from the repo root, where the fixtures and templates are
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+    result = run(args)
+    print_result(result)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+    for path in filter(None, [args.out, BASELINE_FILE if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"\n[PDFBENCH] Result written to {path}")
+    if regressions:
+        print(f"[PDFBENCH] Slower than baseline: {', '.join(regressions)}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+Shared test setup.
+
+Settings requires the database and OpenAI variables; the tests never reach
+MySQL or OpenAI, so placeholders are enough (a real .env still wins).
+Metrics stay in memory instead of writing snapshots into the repository.
+"""
+import os
+
+for name in ("SQL_HOST", "SQL_USER", "SQL_PASSWORD", "SQL_DATABASE", "OPEN_AI_API"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("METRICS_DIR", "")
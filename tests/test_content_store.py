@@ -0,0 +1,85 @@
+"""
+The content store with two gunicorn workers, i.e. two janitors over one
+directory: a report served by one worker must survive the other worker's
+original deletion time, and the byte cap applies to the directory.
+"""
+import os
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import cleanup_service, content_store
+from app.services.cleanup_service import FileJanitor
+
+TTL = 1
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_STORE_DIR", str(tmp_path / "report_files"))
+    monkeypatch.setattr(settings, "CONTENT_STORE_TTL_SECONDS", TTL)
+    monkeypatch.setattr(cleanup_service, "CAP_CHECK_INTERVAL", 0.1)
+    janitors = {"a": FileJanitor(), "b": FileJanitor()}
+
+    def on(worker):
+        monkeypatch.setattr(content_store, "janitor", janitors[worker])
+        return content_store
+
+    return on
+
+
+def _pdf(n, size=1000):
+    return bytes([n]) * size
+
+
+def _store_bytes():
+    total = 0
+    for root, _, files in os.walk(settings.CONTENT_STORE_DIR):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files if not f.startswith("."))
+    return total
+
+
+def test_file_served_by_another_worker_is_not_deleted(workers):
+    digest = workers("a").put_bytes(_pdf(1))
+    workers("b").sweep()  # worker b started with the file already on disk
+    path = workers("a").get_path(digest, touch=False)
+
+    time.sleep(0.5)
+    assert workers("b").get_path(digest) == path  # served by b: expires at ~1.5 s
+
+    time.sleep(0.8)  # past the due time both workers scheduled first
+    assert os.path.exists(path)
+    assert workers("a").exists(digest)
+
+    time.sleep(1.0)
+    assert not os.path.exists(path)
+
+
+def test_storing_again_in_another_worker_renews_the_file(workers):
+    digest = workers("a").put_bytes(_pdf(2))
+    path = workers("a").get_path(digest, touch=False)
+
+    time.sleep(0.5)
+    assert workers("b").put_bytes(_pdf(2)) == digest
+
+    time.sleep(0.8)
+    assert os.path.exists(path)
+
+
+def test_byte_cap_covers_files_of_both_workers(workers, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_STORE_TTL_SECONDS", 60)
+    monkeypatch.setattr(settings, "CONTENT_STORE_MAX_BYTES", 2500)
+    workers("a").sweep()
+    workers("b").sweep()
+
+    digests = []
+    for n in range(6):
+        digests.append(workers("ab"[n % 2]).put_bytes(_pdf(n)))
+        time.sleep(0.05)  # distinct mtimes, so the oldest files go first
+    time.sleep(0.5)
+
+    # Each worker alone holds 3000 bytes, over the cap; the directory holds 6000
+    assert _store_bytes() <= 2500
+    assert workers("a").exists(digests[-1]) and workers("b").exists(digests[-2])
+    assert not workers("a").exists(digests[0])
@@ -0,0 +1,28 @@
+"""
+Concurrent updates of one stored report, as with REPORT_REPLICATION=async:
+the background upload's URL and the render's digest must both survive.
+"""
+import threading
+
+from app.core.config import settings
+from app.services import report_store
+
+
+def test_concurrent_updates_keep_every_field(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_STORE_DIR", str(tmp_path))
+    record = report_store.save_report("Race Test", {"report": "text"}, "v1")
+    user_id, report_id = record["user_id"], record["report_id"]
+
+    def update(field):
+        for n in range(100):
+            report_store.update_report(user_id, report_id, **{field: n})
+
+    threads = [threading.Thread(target=update, args=(f"field{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored = report_store.get_report(user_id, report_id)
+    assert [stored[f"field{i}"] for i in range(4)] == [99] * 4
+    assert stored["report"] == {"report": "text"}
@@ -0,0 +1,159 @@
+"""
+Report uploads against the local storage stand-in (app/cli/standin.py):
+retries on 429/5xx, timeouts, rejected and malformed answers, and skipping
+uploads of bytes that were already uploaded.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from fastapi.responses import HTMLResponse
+
+from app.cli import standin
+from app.core.config import settings
+from app.services import storage_service
+from app.services.storage_service import UploadError
+
+PDF = b"%PDF-1.4 stand-in report"
+
+
+class ScriptedFaults(standin.Faults):
+    """Faults that answer the next requests with the statuses in `script` (None = no fault)."""
+
+    def __init__(self):
+        super().__init__()
+        self.script = []
+
+    def fails(self):
+        if not self.script:
+            return False
+        status = self.script.pop(0)
+        if status is None:
+            return False
+        self.error_status = status
+        return True
+
+
+@pytest.fixture(scope="module")
+def server():
+    faults = ScriptedFaults()
+    app = standin.create_app(faults, report_completion="{}", pdf_bytes=PDF)
+
+    @app.post("/not-json")
+    async def not_json():
+        return HTMLResponse("<html>ok</html>")
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    uv = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=uv.run, daemon=True)
+    thread.start()
+    while not uv.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}", faults
+    uv.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def storage(server, tmp_path, monkeypatch):
+    base_url, faults = server
+    faults.script, faults.latency = [], 0
+    monkeypatch.setattr(settings, "PDF_STORAGE_PATH", f"{base_url}/upload")
+    monkeypatch.setattr(settings, "REPORT_STORE_DIR", str(tmp_path / "report_store"))
+    monkeypatch.setattr(settings, "UPLOAD_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "UPLOAD_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "UPLOAD_READ_TIMEOUT", 0.3)
+    return base_url, faults
+
+
+def run(coro):
+    """Run with a fresh shared client (it belongs to one event loop)."""
+
+    async def main():
+        storage_service._client = None
+        try:
+            return await coro
+        finally:
+            await storage_service.close_client()
+
+    return asyncio.run(main())
+
+
+def _uploads(base_url):
+    return httpx.get(f"{base_url}/stats").json().get("upload", 0)
+
+
+def test_upload_returns_the_storage_url(storage):
+    base_url, _ = storage
+    url = run(storage_service.upload_report(PDF, "report.pdf"))
+    assert url.startswith(f"{base_url}/files/")
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_upload_retries_rate_limits_and_server_errors(storage, status):
+    base_url, faults = storage
+    faults.script = [status, status]
+    before = storage_service.upload_stats()["retries"]
+    assert run(storage_service.upload_report(PDF, "report.pdf"))
+    assert storage_service.upload_stats()["retries"] - before == 2
+
+
+def test_upload_gives_up_after_the_last_retry(storage):
+    base_url, faults = storage
+    faults.script = [503, 503, 503, 503]
+    before = _uploads(base_url)
+    with pytest.raises(UploadError, match="503"):
+        run(storage_service.upload_report(PDF, "report.pdf"))
+    assert _uploads(base_url) - before == 3  # UPLOAD_MAX_RETRIES + 1 attempts
+    assert faults.script == [503]
+
+
+def test_upload_does_not_retry_a_rejected_upload(storage):
+    base_url, faults = storage
+    faults.script = [413]
+    before = _uploads(base_url)
+    with pytest.raises(UploadError, match="rejected"):
+        run(storage_service.upload_report(PDF, "report.pdf"))
+    assert _uploads(base_url) - before == 1
+
+
+def test_upload_retries_a_timeout(storage, monkeypatch):
+    base_url, faults = storage
+    monkeypatch.setattr(settings, "UPLOAD_MAX_RETRIES", 1)
+    faults.latency = 1.0  # beyond UPLOAD_READ_TIMEOUT
+    started = time.monotonic()
+    with pytest.raises(UploadError) as failure:
+        run(storage_service.upload_report(PDF, "report.pdf"))
+    assert isinstance(failure.value.__cause__, httpx.ReadTimeout)
+    assert time.monotonic() - started < 1.5  # two timed-out attempts, not two full answers
+
+
+def test_upload_rejects_a_response_that_is_not_json(storage, monkeypatch):
+    base_url, _ = storage
+    monkeypatch.setattr(settings, "PDF_STORAGE_PATH", f"{base_url}/not-json")
+    failures = storage_service.upload_stats()["failures"]
+    with pytest.raises(UploadError, match="not JSON"):
+        run(storage_service.upload_report(PDF, "report.pdf"))
+    assert storage_service.upload_stats()["failures"] == failures + 1
+
+
+def test_replicate_uploads_identical_bytes_once(storage):
+    base_url, _ = storage
+    before = _uploads(base_url)
+    first = run(storage_service.replicate_report(PDF, "a" * 64, "report.pdf"))
+    second = run(storage_service.replicate_report(PDF, "a" * 64, "copy.pdf"))
+    assert first == second
+    assert _uploads(base_url) - before == 1
+
+
+def test_uploaded_url_serves_the_uploaded_bytes(storage):
+    url = run(storage_service.upload_report(PDF, "report.pdf"))
+    response = httpx.get(url)
+    assert response.status_code == 200
+    assert response.content == PDF